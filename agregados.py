@@ -0,0 +1,126 @@
+# agregados.py
+"""
+Resumen materializado de los KPIs del dashboard. Se calcula una sola vez por versión
+de los datos con un único groupby (segmento TRL x nivel de inglés) y los endpoints lo
+leen sin volver a recorrer el DataFrame.
+
+Para agregar un KPI se declara en KPIS como función de la tabla agrupada; si necesita
+otra columna agregada, se suma una entrada en AGREGACIONES.
+"""
+import pandas as pd
+
+from metricas import cronometrar
+
+SEGMENTOS = ["TRL 1-3", "TRL 4-7", "TRL 8-9"]
+COLUMNAS_PUNTAJE = ["Puntaje TRL 1-3", "Puntaje TRL 4-7", "Puntaje TRL 8-9", "Puntaje Total"]
+
+# Agregaciones de la única pasada: nombre -> (columna de la tabla base, función)
+AGREGACIONES = {
+    "proyectos": ("Puntaje Total", "size"),
+    "aprobados": ("aprobado", "sum"),
+    "con_docente": ("Docente Acompañante", "sum"),
+    "trl_max": ("Nivel TRL", "max"),
+    "puntaje_max": ("Puntaje Total", "max"),
+    # Posición de la primera fila con el puntaje máximo del grupo (como idxmax)
+    "posicion_max": ("Puntaje Total", "idxmax"),
+    **{f"suma {col}": (col, "sum") for col in COLUMNAS_PUNTAJE},
+}
+
+
+class Agrupado:
+    """Tabla agrupada (pocas filas) con ayudas para combinar los grupos."""
+
+    def __init__(self, grupos: pd.DataFrame, nombres: pd.Series, top: pd.DataFrame):
+        self.grupos = grupos
+        self.nombres = nombres
+        self.top = top
+
+    def total(self, agregado):
+        return self.grupos[agregado].sum()
+
+    def por(self, nivel, agregado):
+        return self.grupos.groupby(level=nivel, sort=False, dropna=False)[agregado].sum()
+
+    def mejor_por_segmento(self):
+        """Nombre del proyecto con mayor puntaje de cada segmento (el primero si hay empate)."""
+        mejores = {}
+        por_segmento = self.grupos.groupby(level="Segmento TRL", sort=False, dropna=False)
+        for segmento, grupo in por_segmento:
+            if segmento not in SEGMENTOS:
+                continue
+            candidatos = grupo[grupo["puntaje_max"] == grupo["puntaje_max"].max()]
+            mejores[segmento] = self.nombres.iloc[int(candidatos["posicion_max"].min())]
+        return {segmento: mejores[segmento] for segmento in SEGMENTOS if segmento in mejores}
+
+
+def _moda(conteos: pd.Series, defecto):
+    # Igual que Series.mode().iloc[0]: el valor más frecuente y, si empatan, el menor
+    conteos = conteos[conteos.index.notna() & (conteos > 0)]
+    if conteos.empty:
+        return defecto
+    return min(conteos.index[conteos == conteos.max()])
+
+
+def _distribucion(conteos: pd.Series):
+    # Mismo orden que value_counts: de mayor a menor y, si empatan, por orden de aparición
+    conteos = conteos[conteos > 0].sort_values(ascending=False, kind="stable")
+    return {str(k): int(v) for k, v in conteos.items()}
+
+
+def _entero(valor):
+    return int(valor) if pd.notna(valor) else 0
+
+
+def _promedio(a, columna):
+    proyectos = a.total("proyectos")
+    return round(a.total(f"suma {columna}") / proyectos, 1) if proyectos else float("nan")
+
+
+# KPIs del resumen: nombre -> función de la tabla agrupada
+KPIS = {
+    "formularios": lambda a: int(a.total("proyectos")),
+    "aprobados": lambda a: int(a.total("aprobados")),
+    "docente_si": lambda a: int(a.total("con_docente")),
+    "docente_no": lambda a: int(a.total("proyectos") - a.total("con_docente")),
+    "trl_max": lambda a: _entero(a.grupos["trl_max"].max()),
+    "puntaje_maximo": lambda a: round(a.grupos["puntaje_max"].max(), 1) if len(a.grupos) else 0.0,
+    "top_proyectos_trl": lambda a: a.mejor_por_segmento(),
+    "nivel_ingles_mas_comun": lambda a: _moda(a.por("Nivel de Inglés", "proyectos"), "No especificado"),
+    "distribucion_trl": lambda a: _distribucion(a.por("Segmento TRL", "proyectos")),
+    "promedios": lambda a: {
+        "TRL 1-3": _promedio(a, "Puntaje TRL 1-3"),
+        "TRL 4-7": _promedio(a, "Puntaje TRL 4-7"),
+        "TRL 8-9": _promedio(a, "Puntaje TRL 8-9"),
+        "Total": _promedio(a, "Puntaje Total"),
+    },
+    "top_proyectos": lambda a: [
+        {"Nombre del Proyecto": str(fila["Nombre del Proyecto"]), "Puntaje Total": round(float(fila["Puntaje Total"]), 1)}
+        for fila in a.top.to_dict("records")
+    ],
+}
+
+
+def agrupar(df: pd.DataFrame, top=3) -> Agrupado:
+    """La única pasada sobre las filas: un groupby con todas las AGREGACIONES."""
+    # Tabla base con índice posicional: idxmax devuelve directamente la posición de la fila
+    base = pd.DataFrame({
+        "Segmento TRL": df["Segmento TRL"].to_numpy(),
+        "Nivel de Inglés": df["Nivel de Inglés"].to_numpy(),
+        "aprobado": (df["Aprobado"] == "Sí").to_numpy(),
+        "Docente Acompañante": df["Docente Acompañante"].astype(bool).to_numpy(),
+        "Nivel TRL": df["Nivel TRL"].to_numpy(),
+        **{col: df[col].to_numpy() for col in COLUMNAS_PUNTAJE},
+    })
+    grupos = base.groupby(["Segmento TRL", "Nivel de Inglés"], sort=False, dropna=False).agg(**AGREGACIONES)
+    return Agrupado(
+        grupos,
+        df["Nombre del Proyecto"],
+        df.nlargest(top, "Puntaje Total", keep="first")[["Nombre del Proyecto", "Puntaje Total"]],
+    )
+
+
+@cronometrar("resumen")
+def construir_resumen(df: pd.DataFrame) -> dict:
+    """Todos los KPIs de una versión de los datos."""
+    agrupado = agrupar(df)
+    return {nombre: kpi(agrupado) for nombre, kpi in KPIS.items()}
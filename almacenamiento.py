@@ -0,0 +1,200 @@
+# almacenamiento.py
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from bloqueo import BloqueoArchivo
+from metricas import cronometrar
+from puntajes import MatrizRespuestas
+
+ARCHIVO_CRUDO = "datos_formularios.parquet"
+ARCHIVO_PROCESADO = "datos_procesados.parquet"
+ARCHIVO_CSV = "datos_formularios.csv"
+# Matriz de respuestas (MatrizRespuestas) del snapshot procesado
+ARCHIVO_MATRIZ = "datos_respuestas.npz"
+# Contador que aumenta con cada snapshot procesado nuevo; los workers lo vigilan
+ARCHIVO_VERSION = "datos_version.txt"
+
+# Serializa entre workers la escritura de los datos locales y el re-puntaje
+bloqueo_datos = BloqueoArchivo("datos.lock")
+
+# Exportar también el CSV de siempre (p. ej. para abrirlo en Excel o para el dashboard de Streamlit)
+EXPORTAR_CSV = os.getenv("EXPORTAR_CSV", "").strip().lower() in ("1", "true", "si", "sí")
+
+# Se incrementa cuando cambian las columnas del procesado; invalida los snapshots guardados antes
+VERSION_PROCESADO = "3"
+
+# Ids de Gravity Forms: enteros, como los devolvía pd.read_csv (y la API en sus respuestas)
+COLUMNAS_ENTERAS = ("id", "form_id")
+
+# Tipos de las columnas que agrega el procesamiento; el resto de columnas son texto
+ESQUEMA_PROCESADO = {
+    "Nivel TRL": pa.float64(),
+    "Segmento TRL": pa.string(),
+    "Puntaje TRL 1-3": pa.float64(),
+    "Puntaje TRL 4-7": pa.float64(),
+    "Puntaje TRL 8-9": pa.float64(),
+    "Puntaje Total": pa.float64(),
+    "Aprobado": pa.string(),
+    "Docente Acompañante": pa.bool_(),
+    **{col: pa.int64() for col in COLUMNAS_ENTERAS},
+}
+
+
+def normalizar_crudo(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Esquema fijo de las entradas crudas: columnas y respuestas como texto y vacíos como
+    nulos, salvo los ids (COLUMNAS_ENTERAS), que son enteros. Así "14" sigue siendo "14"
+    sin importar qué otros valores tenga la columna.
+    """
+    df = df.rename(columns=str).astype("string").replace("", pd.NA)
+    return _a_objetos(_enteros(df))
+
+
+def _enteros(df: pd.DataFrame) -> pd.DataFrame:
+    for col in COLUMNAS_ENTERAS:
+        if col in df.columns and not pd.api.types.is_integer_dtype(df[col].dtype):
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("Int64")
+    return df
+
+
+def _a_objetos(df: pd.DataFrame) -> pd.DataFrame:
+    # Trabajamos con columnas object y NaN como nulo, igual que devuelve pd.read_csv
+    df = df.astype({col: object for col in df.columns if not _es_numerica_o_bool(df[col])})
+    return df.where(df.notna(), np.nan)
+
+
+def _es_numerica_o_bool(serie):
+    return pd.api.types.is_numeric_dtype(serie.dtype) or pd.api.types.is_bool_dtype(serie.dtype)
+
+
+def _escribir(tabla: pa.Table, ruta):
+    # Escritura atómica: los lectores nunca ven un archivo a medio escribir
+    temporal = f"{ruta}.tmp"
+    pq.write_table(tabla, temporal)
+    os.replace(temporal, ruta)
+
+
+def _leer(ruta, columnas=None) -> pd.DataFrame:
+    tabla = pq.read_table(ruta, columns=columnas, memory_map=True)
+    df = _a_objetos(tabla.to_pandas())
+    # Arrow devuelve las listas como arrays de NumPy; la API y Jinja esperan listas
+    for campo in tabla.schema:
+        if pa.types.is_list(campo.type):
+            df[campo.name] = tabla.column(campo.name).to_pylist()
+    return df
+
+
+# --- DATOS CRUDOS (entradas de Gravity Forms) ---
+
+def existe_crudo():
+    return os.path.exists(ARCHIVO_CRUDO) or os.path.exists(ARCHIVO_CSV)
+
+
+def guardar_crudo(df: pd.DataFrame):
+    df = normalizar_crudo(df)
+    esquema = pa.schema([(col, pa.int64() if col in COLUMNAS_ENTERAS else pa.string()) for col in df.columns])
+    with bloqueo_datos:
+        _escribir(pa.Table.from_pandas(df, schema=esquema, preserve_index=False), ARCHIVO_CRUDO)
+    if EXPORTAR_CSV:
+        exportar_csv(df)
+
+
+@cronometrar("lectura_crudo")
+def leer_crudo(columnas=None) -> pd.DataFrame:
+    """Lee las entradas crudas; si solo existe el CSV antiguo, lo migra a Parquet."""
+    if not os.path.exists(ARCHIVO_CRUDO) and os.path.exists(ARCHIVO_CSV):
+        guardar_crudo(pd.read_csv(ARCHIVO_CSV, dtype=str))
+    # Los Parquet guardados antes de COLUMNAS_ENTERAS tienen los ids como texto
+    return _enteros(_leer(ARCHIVO_CRUDO, columnas))
+
+
+def exportar_csv(df: pd.DataFrame, ruta=ARCHIVO_CSV):
+    temporal = f"{ruta}.tmp"
+    df.to_csv(temporal, index=False)
+    os.replace(temporal, ruta)
+
+
+# --- DATOS PROCESADOS (puntajes y columnas derivadas) ---
+
+def guardar_procesado(df: pd.DataFrame, origen, matriz=None):
+    """
+    Guarda el DataFrame procesado junto con la huella de los archivos de los que salió
+    y, si viene, su MatrizRespuestas (marcada con la misma versión).
+    """
+    esquema = pa.schema([(col, ESQUEMA_PROCESADO.get(col, pa.string())) for col in df.columns])
+    esquema = esquema.with_metadata({"origen": json.dumps(origen), "version": VERSION_PROCESADO})
+    with bloqueo_datos:
+        version = version_datos() + 1
+        _escribir(pa.Table.from_pandas(df, schema=esquema, preserve_index=False), ARCHIVO_PROCESADO)
+        if matriz is not None:
+            _escribir_matriz(matriz, version)
+        _escribir_texto(str(version), ARCHIVO_VERSION)
+
+
+def _escribir_matriz(matriz: MatrizRespuestas, version):
+    temporal = f"{ARCHIVO_MATRIZ}.tmp"
+    with open(temporal, "wb") as f:
+        np.savez(
+            f, version=version, indptr=matriz.indptr, indices=matriz.indices, conteos=matriz.conteos,
+            bonos=matriz.bonos, pesos=matriz.pesos,
+            campos=np.array([campo for campo, _ in matriz.claves], dtype=str),
+            respuestas=np.array([respuesta for _, respuesta in matriz.claves], dtype=str),
+        )
+    os.replace(temporal, ARCHIVO_MATRIZ)
+
+
+def leer_matriz(version):
+    """MatrizRespuestas guardada con la versión `version` del procesado, o None."""
+    try:
+        with np.load(ARCHIVO_MATRIZ) as datos:
+            if int(datos["version"]) != version:
+                return None
+            claves = list(zip(datos["campos"].tolist(), datos["respuestas"].tolist()))
+            return MatrizRespuestas(
+                claves, datos["indptr"], datos["indices"], datos["conteos"], datos["bonos"], datos["pesos"]
+            )
+    except FileNotFoundError:
+        return None
+
+
+def version_datos():
+    """Versión del snapshot procesado en disco (0 si todavía no hay ninguno)."""
+    try:
+        with open(ARCHIVO_VERSION, "r", encoding="utf-8") as f:
+            return int(f.read().strip() or 0)
+    except FileNotFoundError:
+        return 0
+
+
+def _escribir_texto(texto, ruta):
+    temporal = f"{ruta}.tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        f.write(texto)
+    os.replace(temporal, ruta)
+
+
+def origen_procesado():
+    """Huella guardada con el snapshot procesado, o None si no existe."""
+    if not os.path.exists(ARCHIVO_PROCESADO):
+        return None
+    metadata = pq.read_schema(ARCHIVO_PROCESADO).metadata or {}
+    if metadata.get(b"version", b"").decode() != VERSION_PROCESADO:
+        return None
+    origen = metadata.get(b"origen")
+    return json.loads(origen) if origen else None
+
+
+def procesado_vigente(origen):
+    """True si el snapshot procesado en disco salió exactamente de `origen`."""
+    return origen_procesado() == json.loads(json.dumps(origen))
+
+
+@cronometrar("lectura_procesado")
+def leer_procesado(columnas=None) -> pd.DataFrame:
+    """Lee el snapshot procesado (memory-mapped), opcionalmente solo algunas columnas."""
+    return _leer(ARCHIVO_PROCESADO, columnas)
@@ -1,25 +1,117 @@
 # auth.py
+import json
+import math
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
+from urllib3.util.retry import Retry
 import pandas as pd
-import streamlit as st
 
-def obtener_todas_las_entradas(usuario, clave_app, url_base):
-    print(f"Credenciales recibidas - Usuario: {usuario}, Clave: {clave_app}")
-    all_entries = []
+from metricas import cronometrar
+
+TAMANO_PAGINA = 100
+MAX_DESCARGAS_SIMULTANEAS = 8
+TIMEOUT = (5, 60)  # (conexión, lectura) en segundos
+
+class ErrorGravityForms(Exception):
+    """La API de Gravity Forms respondió con error o no se pudo conectar. Cada interfaz decide cómo mostrarlo."""
+
+def _verificar(response):
+    if response.status_code != 200:
+        raise ErrorGravityForms(f"Error {response.status_code}: {response.text}")
+
+def crear_sesion(usuario, clave_app, max_conexiones=MAX_DESCARGAS_SIMULTANEAS):
+    """Sesión con keep-alive, pool de conexiones y reintentos con backoff ante 5xx y timeouts."""
+    sesion = requests.Session()
+    sesion.auth = HTTPBasicAuth(usuario, clave_app)
+    reintentos = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=("GET",),
+        raise_on_status=False,
+    )
+    adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=max_conexiones, max_retries=reintentos)
+    sesion.mount("https://", adaptador)
+    sesion.mount("http://", adaptador)
+    return sesion
+
+def _pedir_pagina(sesion, url_base, page, params_extra):
+    params = {"paging[page_size]": TAMANO_PAGINA, "paging[current_page]": page}
+    params.update(params_extra or {})
+    return sesion.get(url_base, params=params, timeout=TIMEOUT)
+
+def _descargar_paginas(usuario, clave_app, url_base, params_extra=None):
+    """
+    Lee total_count de la primera página y descarga el resto en paralelo sobre la misma
+    sesión. Las páginas se vuelven a unir en orden. Lanza ErrorGravityForms si alguna falla.
+    """
+    with crear_sesion(usuario, clave_app) as sesion:
+        try:
+            primera = _pedir_pagina(sesion, url_base, 1, params_extra)
+            _verificar(primera)
+            data = primera.json()
+            all_entries = data.get("entries", [])
+            if "total_count" not in data:
+                return _descargar_secuencial(sesion, url_base, params_extra, all_entries)
+
+            paginas = math.ceil(int(data["total_count"]) / TAMANO_PAGINA)
+            if paginas <= 1:
+                return all_entries
+
+            with ThreadPoolExecutor(max_workers=min(MAX_DESCARGAS_SIMULTANEAS, paginas - 1)) as ejecutor:
+                respuestas = list(ejecutor.map(
+                    lambda page: _pedir_pagina(sesion, url_base, page, params_extra),
+                    range(2, paginas + 1),
+                ))
+        except requests.RequestException as e:
+            raise ErrorGravityForms(f"Error de conexión con Gravity Forms: {e}") from e
+
+    for response in respuestas:
+        _verificar(response)
+        all_entries.extend(response.json().get("entries", []))
+    return all_entries
+
+def _descargar_secuencial(sesion, url_base, params_extra, all_entries):
+    # Respaldo para respuestas sin total_count: página a página hasta una incompleta
+    entries = all_entries
     page = 1
-    while True:
-        params = {"paging[page_size]": 100, "paging[current_page]": page}
-        response = requests.get(url_base, auth=HTTPBasicAuth(usuario, clave_app), params=params)
-        if response.status_code != 200:
-            st.error(f"Error {response.status_code}: {response.text}")
-            return pd.DataFrame()
-        data = response.json()
-        entries = data.get("entries", [])
-        if not entries:
-            break
-        all_entries.extend(entries)
-        if len(entries) < 100:
-            break
+    while len(entries) == TAMANO_PAGINA:
         page += 1
+        response = _pedir_pagina(sesion, url_base, page, params_extra)
+        _verificar(response)
+        entries = response.json().get("entries", [])
+        all_entries = all_entries + entries
+    return all_entries
+
+@cronometrar("descarga_entradas")
+def obtener_todas_las_entradas(usuario, clave_app, url_base):
+    all_entries = _descargar_paginas(usuario, clave_app, url_base)
+    return pd.DataFrame(all_entries)
+
+def obtener_formulario(usuario, clave_app, url_formulario):
+    """Esquema del formulario (campos, ids, etiquetas y opciones) desde GET /forms/{id}."""
+    with crear_sesion(usuario, clave_app, max_conexiones=1) as sesion:
+        try:
+            response = sesion.get(url_formulario, timeout=TIMEOUT)
+        except requests.RequestException as e:
+            raise ErrorGravityForms(f"Error de conexión con Gravity Forms: {e}") from e
+    _verificar(response)
+    return response.json()
+
+@cronometrar("descarga_incremental")
+def obtener_entradas_actualizadas(usuario, clave_app, url_base, desde):
+    """
+    Descarga solo las entradas creadas o modificadas desde `desde` (date_updated, UTC).
+    Si la API responde con error lanza ErrorGravityForms, para distinguirlo de "sin cambios".
+    """
+    params = {
+        "search": json.dumps({
+            "field_filters": [{"key": "date_updated", "operator": ">=", "value": desde}]
+        }),
+        "sorting[key]": "date_updated",
+        "sorting[direction]": "ASC",
+    }
+    all_entries = _descargar_paginas(usuario, clave_app, url_base, params)
     return pd.DataFrame(all_entries)
@@ -1,30 +1,78 @@
-from datetime import datetime
 from fastapi import FastAPI, HTTPException, Request, Header, Query
-from fastapi.responses import FileResponse, HTMLResponse, StreamingResponse
+from fastapi.responses import FileResponse, HTMLResponse, PlainTextResponse, StreamingResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.templating import Jinja2Templates
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.encoders import jsonable_encoder
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 import pandas as pd
 import base64
 import numpy as np
-from auth import obtener_todas_las_entradas
-from funciones import segmento_trl, calcular_puntajes_por_segmento, generar_insights, generar_excel_aprobados
-from data_loader import cargar_diccionario
-from visualizaciones import graficos_generales
-from urllib.parse import unquote
+from auth import obtener_todas_las_entradas, obtener_entradas_actualizadas, obtener_formulario, ErrorGravityForms
+from funciones import (
+    exportar_excel_aprobados, iterar_archivo, iterar_csv_aprobados, iterar_ndjson_aprobados
+)
+from insights import CacheLRU, con_insights, obtener_insights, bloques_con_insights
+from nucleo import procesar_con_matriz, repuntuar
+from agregados import construir_resumen
+from reportes_html import (
+    PLANTILLA_PROYECTO, PLANTILLA_TOP10, renderizar, contexto_reporte_proyecto, contexto_top10,
+    fecha_reporte, iterar_zip_reportes,
+)
+from data_loader import ARCHIVO_FORMULARIO, cargar_diccionario, cargar_tabla_puntajes, guardar_formulario, leer_formulario
+from puntajes import (
+    BONO_DOCENTE, BONO_INGLES, SEGMENTOS, UMBRAL_APROBACION, MatrizRespuestas, etiquetas_respuestas, valores_bonos,
+)
+from simulacion import simular
+from cache_datos import CacheDatos, firma_archivo
+from ejecucion import ejecutar, ejecutar_en_proceso, iterar_en_hilo
+import metricas
+from metricas import etapa, perfilando, reporte_perfil
+from indice_nombres import indice_desde_serie
+from base_datos import ARCHIVO_BASE, BaseDatos
+from sincronizacion import (
+    Sincronizador, leer_marca, guardar_marca, calcular_marca, descartar_ya_vistas, combinar_entradas,
+)
+from almacenamiento import (
+    ARCHIVO_CRUDO, ARCHIVO_VERSION, bloqueo_datos, existe_crudo, guardar_crudo, leer_crudo,
+    normalizar_crudo, guardar_procesado, leer_procesado, procesado_vigente, version_datos,
+    origen_procesado, leer_matriz,
+)
+from urllib.parse import parse_qs, unquote
 import os
 import io
-import re
+import json
+import hashlib
+import sqlite3
+import threading
+import time
+from contextlib import asynccontextmanager
+from email.utils import formatdate, parsedate_to_datetime
 from dotenv import load_dotenv
 
 # Cargar .env
 load_dotenv()
 APP_PASSWORD = os.getenv("APP_PASSWORD", "").strip()
 
-app = FastAPI()
+ARCHIVO_DICCIONARIO = "diccionario.csv"
+USUARIO_GF = "multimediafalab"
+URL_FORMULARIO_GF = "https://fablab.ucontinental.edu.pe/wp-json/gf/v2/forms/9"
+URL_ENTRADAS_GF = f"{URL_FORMULARIO_GF}/entries"
+
+# Sincronización periódica con Gravity Forms (0 = solo cuando se pide)
+SYNC_INTERVALO_MINUTOS = float(os.getenv("SYNC_INTERVALO_MINUTOS", "15"))
+
+@asynccontextmanager
+async def ciclo_de_vida(app):
+    sincronizador.iniciar()
+    # Primer arranque sin datos: los descarga un solo worker, en segundo plano
+    if not existe_crudo() and sincronizador.es_lider():
+        sincronizador.encolar("completo", origen="inicio")
+    yield
+    sincronizador.detener()
+
+app = FastAPI(lifespan=ciclo_de_vida)
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 templates_dir = os.path.join(current_dir, "templates")
@@ -38,8 +86,6 @@ app.mount("/assets", StaticFiles(directory="templates/static"), name="assets")
 async def serve_spa():
     return FileResponse("templates/static/index.html")
 
-templates = Jinja2Templates(directory=templates_dir)
-
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173", "http://localhost:8000"],
@@ -47,6 +93,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Comprime las respuestas JSON grandes (listados, gráficos, reportes) si el cliente acepta gzip
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 # Validación de autorización básica
 def validar_contraseña(authorization: str = Header(...)):
@@ -65,118 +113,488 @@ def validar_contraseña(authorization: str = Header(...)):
     except Exception as e:
         raise HTTPException(status_code=401, detail="Error en autenticación")
 
+# Los reportes HTML se abren como enlaces, así que la autorización llega en ?auth=
+def validar_auth_reporte(auth: str):
+    try:
+        decoded = base64.b64decode(auth).decode("utf-8")
+        _, password = decoded.split(":", 1)
+
+        password_limpia = password.strip().replace("\u00A0", " ").replace("\u200B", "")
+        esperado = APP_PASSWORD.replace("\u00A0", " ").replace("\u200B", "")
+
+        if password_limpia != esperado:
+            raise HTTPException(status_code=401, detail="Credenciales inválidas")
+    except Exception:
+        raise HTTPException(status_code=401, detail="Error en autenticación")
+
+
+class MedirPeticiones:
+    """
+    Middleware ASGI: registra la duración de cada petición (hasta el último byte) por
+    ruta para /metrics. Con ?profile=1 y credenciales válidas responde, en lugar del
+    resultado, el perfil (cProfile) del trabajo que la petición hizo en hilos.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        if pide_perfil(scope):
+            return await self.perfilar(scope, receive, send)
+
+        inicio = time.perf_counter()
+        estado = 500
+
+        async def enviar(mensaje):
+            nonlocal estado
+            if mensaje["type"] == "http.response.start":
+                estado = mensaje["status"]
+            await send(mensaje)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            # La plantilla de la ruta (/reporte-proyecto/{nombre}), no la URL: una serie por endpoint
+            ruta = getattr(scope.get("route"), "path", "otra")
+            metricas.duracion_peticiones.observar(time.perf_counter() - inicio, scope["method"], ruta)
+            metricas.peticiones.sumar(scope["method"], ruta, str(estado))
+
+    async def perfilar(self, scope, receive, send):
+        estado = 500
+
+        async def descartar(mensaje):
+            nonlocal estado
+            if mensaje["type"] == "http.response.start":
+                estado = mensaje["status"]
+
+        inicio = time.perf_counter()
+        with perfilando() as perfiles:
+            await self.app(scope, receive, descartar)
+        reporte = f"{scope['method']} {scope['path']} -> {estado}\n" + reporte_perfil(perfiles, time.perf_counter() - inicio)
+        await PlainTextResponse(reporte)(scope, receive, send)
+
+
+def pide_perfil(scope):
+    """?profile=1 de un usuario autorizado (header Authorization o ?auth= como los reportes)."""
+    parametros = parse_qs(scope["query_string"].decode("latin-1"))
+    if parametros.get("profile") != ["1"]:
+        return False
+    authorization = dict(scope["headers"]).get(b"authorization")
+    try:
+        if authorization:
+            validar_contraseña(authorization.decode("latin-1"))
+        else:
+            validar_auth_reporte(parametros.get("auth", [""])[0])
+    except HTTPException:
+        return False
+    return True
+
+
+# Último en agregarse = el más externo: mide también la compresión
+app.add_middleware(MedirPeticiones)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def exponer_metricas():
+    """Métricas en formato Prometheus (solo duraciones y conteos, sin datos de proyectos)."""
+    return PlainTextResponse(metricas.exponer(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 class ProjectRequest(BaseModel):
     nombre: str
+    limite: int = Field(50, ge=1, le=500)
+    offset: int = Field(0, ge=0)
+
+def guardar_datos(df):
+    # Crudo y marca juntos: otro worker no debe ver uno sin el otro
+    with bloqueo_datos:
+        guardar_crudo(df)
+        marca = calcular_marca(df)
+        if marca is not None:
+            guardar_marca(marca)
 
 def obtener_y_guardar_datos():
     df = obtener_todas_las_entradas(
-        usuario="multimediafalab",
+        usuario=USUARIO_GF,
         clave_app=APP_PASSWORD,
-        url_base="https://fablab.ucontinental.edu.pe/wp-json/gf/v2/forms/9/entries"
+        url_base=URL_ENTRADAS_GF
     )
     if not df.empty:
-        df.to_csv("datos_formularios.csv", index=False)
+        guardar_datos(df)
+    actualizar_formulario()
     return df
 
+def actualizar_formulario():
+    """Descarga el esquema del formulario; sin él el diccionario puntúa en cualquier columna."""
+    try:
+        formulario = obtener_formulario(USUARIO_GF, APP_PASSWORD, URL_FORMULARIO_GF)
+    except ErrorGravityForms as e:
+        print(f"No se pudo actualizar el esquema del formulario: {e}")
+        return
+    with bloqueo_datos:
+        guardar_formulario(formulario)
+
+def sincronizar_incremental():
+    """
+    Descarga solo las entradas nuevas o modificadas desde la última marca, las
+    integra por id en el almacenamiento local y re-puntúa únicamente esas filas.
+    Devuelve la cantidad de entradas recibidas.
+    """
+    if not existe_crudo():
+        return len(recargar_completo())
+
+    marca = leer_marca() or calcular_marca(leer_crudo(columnas=["id", "date_updated"]))
+    if marca is None:
+        return len(recargar_completo())
+
+    nuevas = obtener_entradas_actualizadas(USUARIO_GF, APP_PASSWORD, URL_ENTRADAS_GF, desde=marca["date_updated"])
+    nuevas = descartar_ya_vistas(nuevas, marca)
+    if nuevas.empty:
+        return 0
+    nuevas = normalizar_crudo(nuevas)
+
+    def integrar(df_actual):
+        guardar_datos(combinar_entradas(leer_crudo(), nuevas))
+        procesadas, matriz_nuevas = procesar_con_matriz(nuevas, cargar_tabla_puntajes(ARCHIVO_DICCIONARIO))
+        df = combinar_entradas(df_actual, procesadas)
+        matriz = combinar_matriz(matriz_respuestas(cache_datos.vigente()), matriz_nuevas, nuevas, df)
+        guardar_procesado(df, origen_datos(), matriz)
+        # Solo las filas recibidas, en una transacción
+        actualizar_base(nuevas, df)
+        return df
+
+    cache_datos.aplicar(integrar)
+    return len(nuevas)
+
+def combinar_matriz(matriz, matriz_nuevas, nuevas, df):
+    """Matriz de respuestas de `df` (ya combinado) a partir de la vigente y la de las filas nuevas."""
+    ids = nuevas["id"].astype(str)
+    # combinar_entradas se queda con la última aparición de cada id
+    ultimas = np.flatnonzero(~ids.duplicated(keep="last").to_numpy())
+    posicion_por_id = {id_: pos for pos, id_ in enumerate(df["id"].astype(str))}
+    posiciones = [posicion_por_id[id_] for id_ in ids.iloc[ultimas]]
+    try:
+        return matriz.combinar(matriz_nuevas.seleccionar(ultimas), posiciones, len(df))
+    except ValueError:
+        # Sin matriz guardada se vuelve a armar del DataFrame cuando se necesite
+        return None
+
 
-def cargar_y_procesar_datos():
-    if not os.path.exists("datos_formularios.csv"):
-        df = obtener_y_guardar_datos()
-    else:
-        df = pd.read_csv("datos_formularios.csv")
+def origen_datos():
+    """Huella de los archivos fuente de los que sale el snapshot procesado."""
+    return [firma_archivo(ARCHIVO_CRUDO), firma_archivo(ARCHIVO_DICCIONARIO), firma_archivo(ARCHIVO_FORMULARIO)]
 
-    diccionario = cargar_diccionario("diccionario.csv")
-    return procesar_datos_completos(df, diccionario)
 
-def procesar_datos_completos(df, diccionario):
-    df = df.rename(columns={
-        "1": "Nombre del Proyecto",
-        "14": "Nivel TRL",
-        "15": "Docente Acompañante",
-        "17": "Nivel de Inglés",
-        "30": "Ubicación",
-        "3": "Industria"
-    })
+class DatosNoDisponibles(HTTPException):
+    """Todavía no hay datos locales: la primera descarga corre en segundo plano."""
 
-    df["Nivel TRL"] = pd.to_numeric(df["Nivel TRL"], errors="coerce").fillna(0)
-    df["Segmento TRL"] = df["Nivel TRL"].apply(segmento_trl)
+    def __init__(self):
+        super().__init__(
+            status_code=503,
+            detail="Los datos se están descargando de Gravity Forms; intenta de nuevo en unos segundos.",
+            headers={"Retry-After": "10"},
+        )
 
-    for segmento in ["TRL 1-3", "TRL 4-7", "TRL 8-9"]:
-        df[f"Puntaje {segmento}"] = 0.0
-    df["Aprobado"] = "No"
+def cargar_y_procesar_datos():
+    # Nunca se descarga dentro de una petición: de eso se encarga el sincronizador
+    if not existe_crudo():
+        raise DatosNoDisponibles()
+    if procesado_vigente(origen_datos()):
+        # El snapshot procesado en disco salió de estos mismos archivos: no hace falta re-puntuar
+        df = leer_procesado()
+        programar_base()
+        return df
+    repuntuado = repuntuar_diccionario()
+    if repuntuado is None:
+        repuntuado = procesar_con_matriz(leer_crudo(), cargar_tabla_puntajes(ARCHIVO_DICCIONARIO))
+    df, matriz = repuntuado
+    guardar_procesado(df, origen_datos(), matriz)
+    programar_base()
+    return df
 
-    for idx, row in df.iterrows():
-        puntajes = calcular_puntajes_por_segmento(row, diccionario)
-        extra = 0
+def repuntuar_diccionario():
+    """
+    Si desde el último procesado solo cambió diccionario.csv, ajusta sus puntajes con la
+    matriz de respuestas guardada (solo las respuestas cuyo puntaje cambió) en lugar de
+    volver a puntuar todas las entradas. None si no se puede.
+    """
+    previo, actual = origen_procesado(), json.loads(json.dumps(origen_datos()))
+    if previo is None or (previo[0], previo[2]) != (actual[0], actual[2]):
+        return None
+    matriz = leer_matriz(version_datos())
+    if matriz is None:
+        return None
+    try:
+        return repuntuar(leer_procesado(), matriz, cargar_tabla_puntajes(ARCHIVO_DICCIONARIO))
+    except ValueError:
+        # El diccionario tiene respuestas nuevas: hay que buscarlas en las entradas
+        return None
+
+
+# Base SQLite con índices para búsquedas, filtros y top N (vacío en BASE_DATOS la desactiva)
+base_sql = BaseDatos(ARCHIVO_BASE) if ARCHIVO_BASE else None
+_base_pendiente = threading.Event()
+_lock_base = threading.Lock()
+
+def programar_base():
+    """
+    Pone la base SQL al día con los datos en disco en un hilo aparte, para no sumar la
+    reescritura a la carga. Mientras tanto las consultas usan el DataFrame.
+    """
+    if base_sql is None:
+        return
+    _base_pendiente.set()
+    if _lock_base.acquire(blocking=False):
+        threading.Thread(target=_poner_al_dia_base, name="base-sql", daemon=True).start()
+
+def _poner_al_dia_base():
+    try:
+        while _base_pendiente.is_set():
+            _base_pendiente.clear()
+            # Crudo, procesado y versión se leen juntos; la escritura no bloquea a los demás workers
+            with bloqueo_datos:
+                version = version_datos()
+                if base_sql.version() == version or not existe_crudo():
+                    continue
+                crudo, df = leer_crudo(), leer_procesado()
+            base_sql.reemplazar(crudo, df, version)
+    except (sqlite3.Error, OSError) as e:
+        print(f"No se pudo actualizar {ARCHIVO_BASE}: {e}")
+    finally:
+        _lock_base.release()
+    # Un pedido que llegó justo al terminar no se pierde
+    if _base_pendiente.is_set():
+        programar_base()
+
+def actualizar_base(nuevas, df):
+    """Upsert de las entradas sincronizadas (bajo bloqueo_datos, recién guardado el procesado)."""
+    if base_sql is None:
+        return
+    try:
+        if base_sql.actualizar(nuevas, df, version_datos()):
+            return
+    except sqlite3.Error as e:
+        print(f"No se pudo actualizar {ARCHIVO_BASE}: {e}")
+    # La base no estaba en la versión anterior: se reescribe completa
+    programar_base()
+
+def consultar_base(snapshot, consulta, *args):
+    """Resultado de `consulta` en la base SQL para este snapshot, o None si hay que usar el DataFrame."""
+    if base_sql is None:
+        return None
+    try:
+        return getattr(base_sql, consulta)(version_en_disco(snapshot), *args)
+    except sqlite3.Error as e:
+        print(f"Consulta en {ARCHIVO_BASE} fallida: {e}")
+        return None
+
+
+# Con varios workers, el que actualiza los datos sube ARCHIVO_VERSION y los demás recargan
+# el snapshot procesado de disco en lugar de volver a puntuar
+cache_datos = CacheDatos(
+    cargar_y_procesar_datos,
+    [ARCHIVO_VERSION, ARCHIVO_CRUDO, ARCHIVO_DICCIONARIO, ARCHIVO_FORMULARIO],
+    bloqueo=bloqueo_datos,
+)
+
+
+def obtener_datos():
+    """DataFrame procesado compartido entre peticiones. Es de solo lectura."""
+    return cache_datos.obtener().df
+
+
+@cache_datos.al_publicar
+def version_en_disco(snapshot):
+    """Versión de datos_version.txt de la que salió el snapshot (se publica bajo bloqueo_datos)."""
+    return snapshot.derivado("version_disco", lambda df: version_datos())
+
+
+_indice_anterior = None
+
+@cache_datos.al_publicar
+def construir_indice_nombres(snapshot):
+    """Índice de nombres de cada versión; parte del anterior y solo re-indexa las filas cambiadas."""
+    def construir(df):
+        global _indice_anterior
+        _indice_anterior = indice_desde_serie(df["Nombre del Proyecto"], _indice_anterior)
+        return _indice_anterior
+
+    if "Nombre del Proyecto" in snapshot.df.columns:
+        return snapshot.derivado("indice_nombres", construir)
+
+def buscar_en_datos(nombre, difuso=True):
+    """DataFrame vigente y posiciones de las filas cuyo nombre coincide, ordenadas por relevancia."""
+    snapshot = cache_datos.obtener()
+    indice = construir_indice_nombres(snapshot)
+    return snapshot.df, indice.buscar(nombre, difuso=difuso)
+
+
+def respuesta_condicional(request: Request, cuerpo: bytes, etag: str, media_type="application/json",
+                          ultima_modificacion=None):
+    """
+    Responde 304 si el navegador ya tiene esta versión y el cuerpo completo si no.
+    Se valida con If-None-Match y, si no viene, con If-Modified-Since (segundos epoch
+    en `ultima_modificacion`).
+    """
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if ultima_modificacion is not None:
+        headers["Last-Modified"] = formatdate(ultima_modificacion, usegmt=True)
+    if no_modificado(request, etag, ultima_modificacion):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cuerpo, media_type=media_type, headers=headers)
+
+def no_modificado(request: Request, etag, ultima_modificacion):
+    if "if-none-match" in request.headers:
+        etags_cliente = [e.strip().removeprefix("W/") for e in request.headers["if-none-match"].split(",")]
+        return etag in etags_cliente or "*" in etags_cliente
+    if ultima_modificacion is None or "if-modified-since" not in request.headers:
+        return False
+    try:
+        desde = parsedate_to_datetime(request.headers["if-modified-since"]).timestamp()
+    except (TypeError, ValueError):
+        return False
+    return int(ultima_modificacion) <= desde
+
+# --- REPORTES HTML RENDERIZADOS ---
+
+# Reportes HTML guardados por versión de los datos (se descartan los menos usados)
+MAX_REPORTES_EN_CACHE = int(os.getenv("MAX_REPORTES_EN_CACHE", "2000"))
+# Tras cada actualización se pre-renderizan el top 10, los N mejores proyectos y los aprobados (0 = no)
+PRERENDER_REPORTES = int(os.getenv("PRERENDER_REPORTES", "0"))
+
+def version_plantillas():
+    """Huella de las plantillas de reportes: editar cualquiera invalida los HTML ya renderizados."""
+    carpeta = os.path.join(templates_dir, "reports")
+    return tuple(sorted(
+        (nombre, firma_archivo(os.path.join(carpeta, nombre)))
+        for nombre in os.listdir(carpeta) if nombre.endswith(".html")
+    ))
+
+def url_relativa(nombre, **params):
+    # Sustituye al url_for de Starlette, que necesita la petición: el HTML guardado sirve para cualquier host
+    return app.url_path_for(nombre, **params)
+
+def renderizar_reporte(snapshot, clave, plantilla, construir_contexto):
+    """
+    HTML de un reporte para esta versión de los datos y de las plantillas. Se renderiza
+    una sola vez y se guarda en el snapshot. Devuelve (cuerpo, etag, última modificación).
+    El ETag sale de las huellas de los archivos, así que coincide entre workers.
+    """
+    version = version_plantillas()
+    cache = snapshot.derivado("reportes_html", lambda df: CacheLRU(MAX_REPORTES_EN_CACHE))
+    guardado = cache.obtener((clave, version))
+    if guardado is None:
+        huella = json.dumps([snapshot.huella, version, clave], default=str)
+        etag = f'"{hashlib.sha1(huella.encode()).hexdigest()}"'
+        firmas = [firma for firma in snapshot.huella if firma] + [firma for _, firma in version if firma]
+        modificado = max((firma[0] for firma in firmas), default=0) // 1_000_000_000
+
+        # La fecha del reporte es la de esta versión (la de Last-Modified), no la del primer render
+        contexto = dict(construir_contexto(snapshot.df), fecha_generacion=fecha_reporte(modificado))
+        cuerpo = renderizar(plantilla, contexto, url_relativa)
+        guardado = (cuerpo, etag, modificado)
+        cache.guardar((clave, version), guardado)
+    return guardado
+
+@cache_datos.al_publicar
+def prerenderizar_reportes(snapshot):
+    if PRERENDER_REPORTES > 0 and "Puntaje Total" in snapshot.df.columns:
+        threading.Thread(target=_prerenderizar, args=(snapshot,), name="prerender-reportes", daemon=True).start()
+
+def _prerenderizar(snapshot):
+    df = snapshot.df
+    mejores = np.argsort(-df["Puntaje Total"].to_numpy(), kind="stable")[:PRERENDER_REPORTES]
+    aprobados = np.flatnonzero((df["Aprobado"] == "Sí").to_numpy())
+    posiciones = list(dict.fromkeys([*mejores.tolist(), *aprobados.tolist()]))[:MAX_REPORTES_EN_CACHE]
+    try:
+        reporte_top10_html(snapshot)
+        for posicion in posiciones:
+            actual = cache_datos.vigente()
+            if actual is not None and actual.version > snapshot.version:
+                return  # Ya hay datos más nuevos: estos reportes no se van a pedir
+            html_reporte_proyecto(snapshot, posicion)
+    except Exception as e:
+        print(f"No se pudieron pre-renderizar los reportes: {e}")
 
-        nivel_ingles = str(row.get("Nivel de Inglés", "")).strip().lower()
-        if "intermedio" in nivel_ingles:
-            extra += 2
-        elif "avanzado" in nivel_ingles:
-            extra += 4
+def recargar_completo():
+    df = obtener_y_guardar_datos()
+    cache_datos.recargar()
+    return df
 
-        docente = str(row.get("Docente Acompañante", "")).strip().lower()
-        if docente == "si":
-            extra += 10
+def tarea_incremental():
+    return f"Datos sincronizados ({sincronizar_incremental()} registros nuevos o modificados)"
 
-        for segmento in puntajes:
-            df.at[idx, f"Puntaje {segmento}"] = puntajes[segmento] + extra
+def tarea_completa():
+    return f"Datos cargados ({len(recargar_completo())} registros)"
 
-        if any((puntajes[seg] + extra) >= 50 for seg in puntajes):
-            df.at[idx, "Aprobado"] = "Sí"
+sincronizador = Sincronizador(
+    {"incremental": tarea_incremental, "completo": tarea_completa},
+    intervalo=SYNC_INTERVALO_MINUTOS * 60,
+    jitter=float(os.getenv("SYNC_JITTER", "0.1")),
+    espera_maxima=float(os.getenv("SYNC_ESPERA_MAXIMA_MINUTOS", "120")) * 60,
+)
 
-    df["Docente Acompañante"] = df["Docente Acompañante"].astype(str).str.strip().str.upper() == "SI"
-    df["Nivel de Inglés"] = df["Nivel de Inglés"].fillna("No especificado").str.strip().str.capitalize()
-    df["Puntaje Total"] = df["Puntaje TRL 1-3"] + df["Puntaje TRL 4-7"] + df["Puntaje TRL 8-9"]
-    df["Insights"] = df.apply(lambda row: generar_insights(row, diccionario), axis=1)
+@app.post("/actualizar-datos", status_code=202)
+async def actualizar_datos(authorization: str = Header(...), modo: str = Query("incremental")):
+    """Encola la sincronización y responde enseguida; el avance se consulta en /actualizar-datos/{id}."""
+    validar_contraseña(authorization)
+    if modo not in ("incremental", "completo"):
+        raise HTTPException(status_code=400, detail="Modo inválido: usa 'incremental' o 'completo'")
+    trabajo = sincronizador.encolar(modo)
+    return {**trabajo, "mensaje": f"Sincronización {modo} encolada"}
 
-    return df
+@app.get("/actualizar-datos/{id_trabajo}")
+async def estado_trabajo(id_trabajo: str, authorization: str = Header(...)):
+    validar_contraseña(authorization)
+    trabajo = await ejecutar("consultas", sincronizador.trabajo, id_trabajo)
+    if trabajo is None:
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado")
+    return trabajo
 
-@app.post("/actualizar-datos")
-async def actualizar_datos(authorization: str = Header(...)):
+@app.get("/estado-sincronizacion")
+async def estado_sincronizacion(authorization: str = Header(...)):
     validar_contraseña(authorization)
-    try:
-        df = obtener_y_guardar_datos()
-        return {"mensaje": f"Datos cargados ({len(df)} registros)"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await ejecutar("consultas", sincronizador.estado)
 
 @app.get("/metricas-principales")
 async def obtener_metricas(authorization: str = Header(...)):
     validar_contraseña(authorization)
-    df = cargar_y_procesar_datos()
-
-    # Top proyecto por segmento TRL
-    top_proyectos_trl = {}
-    for segmento in ["TRL 1-3", "TRL 4-7", "TRL 8-9"]:
-        filtro = df[df["Segmento TRL"] == segmento]
-        if not filtro.empty:
-            top_row = filtro.loc[filtro["Puntaje Total"].idxmax()]
-            top_proyectos_trl[segmento] = top_row["Nombre del Proyecto"]
-
-    # Nivel de inglés más común
-    nivel_ingles_mas_comun = df["Nivel de Inglés"].mode().iloc[0] if not df["Nivel de Inglés"].empty else "No especificado"
+    return await ejecutar("consultas", calcular_metricas)
 
+def calcular_metricas():
+    resumen = resumen_datos()
     return {
-        "formularios": len(df),
-        "trl_max": int(df["Nivel TRL"].max()),
-        "aprobados": int((df["Aprobado"] == "Sí").sum()),
-        "docente_si": int(df["Docente Acompañante"].sum()),
-        "docente_no": len(df) - int(df["Docente Acompañante"].sum()),
-        "puntaje_maximo": round(df["Puntaje Total"].max(), 1),
-        "top_proyectos_trl": top_proyectos_trl,
-        "nivel_ingles_mas_comun": nivel_ingles_mas_comun
+        "formularios": resumen["formularios"],
+        "trl_max": resumen["trl_max"],
+        "aprobados": resumen["aprobados"],
+        "docente_si": resumen["docente_si"],
+        "docente_no": resumen["docente_no"],
+        "puntaje_maximo": resumen["puntaje_maximo"],
+        "top_proyectos_trl": resumen["top_proyectos_trl"],
+        "nivel_ingles_mas_comun": resumen["nivel_ingles_mas_comun"]
     }
 
-@app.get("/datos-graficos")
-async def obtener_datos_graficos(authorization: str = Header(...)):
-    validar_contraseña(authorization)
-    df = cargar_y_procesar_datos()
+@cache_datos.al_publicar
+def resumen_datos(snapshot=None):
+    """KPIs de la versión vigente: se calculan al publicarla, en una sola pasada (agregados.py)."""
+    snapshot = snapshot or cache_datos.obtener()
+    return snapshot.derivado("resumen", construir_resumen)
+
+def construir_payload_graficos(df):
+    """Serializa una sola vez los siete gráficos de una versión de los datos."""
+    # plotly es la importación más cara del backend: se carga con el primer gráfico, no al arrancar
+    from visualizaciones import graficos_generales
+
     fig1, fig2, fig3, fig4, fig5, fig6, fig7 = graficos_generales(
         df, "Industria", "Nivel de Inglés", "Ubicación"
     )
+    with etapa("graficos_json"):
+        return _serializar_graficos(fig1, fig2, fig3, fig4, fig5, fig6, fig7)
 
-    return {
+def _serializar_graficos(fig1, fig2, fig3, fig4, fig5, fig6, fig7):
+    contenido = {
         "graficos": {
             "grafico_1": fig1.to_json(),
             "grafico_2": fig2.to_json(),
@@ -187,35 +605,265 @@ async def obtener_datos_graficos(authorization: str = Header(...)):
             "grafico_7": fig7.to_json() if fig7 else None,
         }
     }
+    cuerpo = json.dumps(contenido, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return cuerpo, f'"{hashlib.sha1(cuerpo).hexdigest()}"'
+
+def payload_graficos():
+    return cache_datos.obtener().derivado("graficos", construir_payload_graficos)
+
+@app.get("/datos-graficos")
+async def obtener_datos_graficos(request: Request, authorization: str = Header(...)):
+    validar_contraseña(authorization)
+    cuerpo, etag = await ejecutar("graficos", payload_graficos)
+    return respuesta_condicional(request, cuerpo, etag)
 
 @app.post("/buscar-proyecto")
 async def buscar_proyecto(request: ProjectRequest, authorization: str = Header(...)):   
     validar_contraseña(authorization)
-    df = cargar_y_procesar_datos()
+    return await ejecutar("consultas", buscar_pagina, request)
 
-    if "Nombre del Proyecto" not in df.columns:
+def buscar_pagina(request: ProjectRequest):
+    snapshot = cache_datos.obtener()
+    if "Nombre del Proyecto" not in snapshot.df.columns:
         raise HTTPException(status_code=400, detail="Columna 'Nombre del Proyecto' no encontrada")
 
-    df = df.fillna("")
-    resultados = df[df["Nombre del Proyecto"].str.contains(request.nombre, case=False, na=False)]
+    encontrados = consultar_base(snapshot, "buscar_nombre", request.nombre, request.limite, request.offset)
+    if encontrados is not None and encontrados[1]:
+        df, (pagina, total) = snapshot.df, encontrados
+    else:
+        # Sin base o sin coincidencias: el índice en memoria también sugiere nombres parecidos
+        df, posiciones = buscar_en_datos(request.nombre)
+        if not posiciones:
+            raise HTTPException(status_code=404, detail="Proyecto no encontrado")
+        pagina, total = posiciones[request.offset:request.offset + request.limite], len(posiciones)
 
-    if resultados.empty:
-        raise HTTPException(status_code=404, detail="Proyecto no encontrado")
+    resultados = con_insights(df.iloc[pagina]).fillna("")
+    return {
+        "proyectos": resultados.replace({np.nan: None}).to_dict(orient="records"),
+        "total": total,
+        "offset": request.offset,
+        "limite": request.limite,
+    }
 
-    return {"proyectos": resultados.replace({np.nan: None}).to_dict(orient="records")}
+# Campos que devuelve /proyectos si no se piden otros
+CAMPOS_PROYECTOS = [
+    "Nombre del Proyecto", "Aprobado", "Puntaje TRL 1-3",
+    "Puntaje TRL 4-7", "Puntaje TRL 8-9", "Puntaje Total",
+    "Segmento TRL", "Industria", "Insights"
+]
+COLUMNAS_PUNTAJE = ["Puntaje TRL 1-3", "Puntaje TRL 4-7", "Puntaje TRL 8-9", "Puntaje Total"]
+# Parámetros de /proyectos cuando no se pide ni página, ni filtros, ni orden
+LISTADO_COMPLETO = (None, 0, None, None, None, None, None, "Puntaje Total", None, None)
+
+def filtrar_proyectos(df, segmento=None, aprobado=None, industria=None,
+                      puntaje="Puntaje Total", puntaje_min=None, puntaje_max=None):
+    """Máscara booleana con los filtros de /proyectos (los que vienen en None no filtran)."""
+    mascara = np.ones(len(df), dtype=bool)
+    if segmento:
+        mascara &= df["Segmento TRL"].isin(segmento).to_numpy()
+    if aprobado:
+        mascara &= (df["Aprobado"] == aprobado).to_numpy()
+    if industria:
+        mascara &= df["Industria"].isin(industria).to_numpy()
+    if puntaje_min is not None:
+        mascara &= (df[puntaje] >= puntaje_min).to_numpy()
+    if puntaje_max is not None:
+        mascara &= (df[puntaje] <= puntaje_max).to_numpy()
+    return mascara
+
+def posiciones_proyectos(df, limite, offset, orden, segmento, aprobado, industria,
+                         puntaje, puntaje_min, puntaje_max):
+    """(posiciones de la página, total) de /proyectos calculadas sobre el DataFrame."""
+    posiciones = np.flatnonzero(filtrar_proyectos(df, segmento, aprobado, industria, puntaje, puntaje_min, puntaje_max))
+    if orden:
+        # Orden estable: a igual valor se respeta el orden original; los vacíos al final
+        valores = df[orden.removeprefix("-")].iloc[posiciones].reset_index(drop=True)
+        orden_pos = valores.sort_values(ascending=not orden.startswith("-"), kind="stable").index.to_numpy()
+        posiciones = posiciones[orden_pos]
+
+    total = len(posiciones)
+    if limite is not None:
+        posiciones = posiciones[offset:offset + limite]
+    return posiciones, total
+
+def validar_campos(df, campos):
+    if not campos:
+        return CAMPOS_PROYECTOS
+    campos = [c.strip() for c in campos.split(",") if c.strip()]
+    invalidos = [c for c in campos if c != "Insights" and c not in df.columns]
+    if invalidos:
+        raise HTTPException(status_code=400, detail=f"Campos inválidos: {', '.join(invalidos)}")
+    return campos
 
 @app.get("/proyectos")
-async def obtener_proyectos(authorization: str = Header(...)):
+async def obtener_proyectos(
+    authorization: str = Header(...),
+    limite: int | None = Query(None, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    orden: str | None = Query(None, description="Columna; con '-' delante es descendente"),
+    campos: str | None = Query(None, description="Columnas separadas por coma"),
+    segmento: list[str] | None = Query(None),
+    aprobado: str | None = Query(None),
+    industria: list[str] | None = Query(None),
+    puntaje: str = Query("Puntaje Total"),
+    puntaje_min: float | None = Query(None),
+    puntaje_max: float | None = Query(None),
+):
+    """
+    Listado de proyectos. Sin `limite` devuelve todos (como antes); con `limite` pagina
+    por offset y `siguiente` indica el offset de la próxima página (None si no hay más).
+    """
     validar_contraseña(authorization)
-    df = cargar_y_procesar_datos()
+    cuerpo = await ejecutar(
+        "consultas", consultar_proyectos, limite, offset, orden, campos,
+        segmento, aprobado, industria, puntaje, puntaje_min, puntaje_max,
+    )
+    return Response(content=cuerpo, media_type="application/json")
+
+def consultar_proyectos(limite, offset, orden, campos, segmento, aprobado, industria,
+                        puntaje, puntaje_min, puntaje_max):
+    snapshot = cache_datos.obtener()
+    parametros = (limite, offset, orden, campos, segmento, aprobado, industria, puntaje, puntaje_min, puntaje_max)
+    if parametros == LISTADO_COMPLETO:
+        # El listado completo (lo que pide el dashboard) se serializa una vez por versión
+        return snapshot.derivado("listado_proyectos", lambda df: listar_proyectos(df, *LISTADO_COMPLETO))
+    return listar_proyectos(snapshot.df, *parametros, snapshot=snapshot)
+
+def listar_proyectos(df, limite, offset, orden, campos, segmento, aprobado, industria,
+                     puntaje, puntaje_min, puntaje_max, snapshot=None):
+    """Cuerpo JSON de /proyectos. Con `snapshot`, filtro, orden y página salen de la base SQL si está al día."""
+    campos = validar_campos(df, campos)
+    if puntaje not in COLUMNAS_PUNTAJE:
+        raise HTTPException(status_code=400, detail=f"Puntaje inválido: usa {', '.join(COLUMNAS_PUNTAJE)}")
+    if orden and orden.removeprefix("-") not in df.columns:
+        raise HTTPException(status_code=400, detail=f"Columna de orden inválida: {orden.removeprefix('-')}")
+
+    seleccion = None
+    if snapshot is not None:
+        seleccion = consultar_base(
+            snapshot, "listar", segmento, aprobado, industria, puntaje, puntaje_min, puntaje_max, orden, limite, offset
+        )
+    if seleccion is not None:
+        posiciones, total = seleccion
+    else:
+        posiciones, total = posiciones_proyectos(
+            df, limite, offset, orden, segmento, aprobado, industria, puntaje, puntaje_min, puntaje_max
+        )
+
+    # Solo se arma la página pedida y los insights solo si se piden
+    pagina = df.iloc[posiciones]
+    if "Insights" in campos:
+        pagina = con_insights(pagina)
+    pagina = pagina[campos]
+
+    siguiente = offset + limite if limite is not None and offset + limite < total else None
+    # to_json serializa directo desde las columnas (y convierte NaN en null)
+    cuerpo = (
+        f'{{"proyectos":{pagina.to_json(orient="records", force_ascii=False)},'
+        f'"total":{total},"offset":{offset},"limite":{json.dumps(limite)},"siguiente":{json.dumps(siguiente)}}}'
+    )
+    return cuerpo.encode("utf-8")
+
+
+class CambioPeso(BaseModel):
+    pregunta: str
+    respuesta: str
+    puntaje: float
+    segmento: str | None = None
+
+class EscenarioPuntaje(BaseModel):
+    nombre: str | None = None
+    umbral: float = UMBRAL_APROBACION
+    bono_ingles_intermedio: float = BONO_INGLES["intermedio"]
+    bono_ingles_avanzado: float = BONO_INGLES["avanzado"]
+    bono_docente: float = BONO_DOCENTE
+    pesos: list[CambioPeso] = []
+
+class SimulacionRequest(BaseModel):
+    escenarios: list[EscenarioPuntaje] = Field(..., min_length=1, max_length=50)
+    max_proyectos: int = Field(20, ge=0, le=1000)
+
+@app.post("/simular-puntajes")
+async def simular_puntajes(request: SimulacionRequest, authorization: str = Header(...)):
+    """
+    Aprobados bajo otros pesos del diccionario, umbral o bonificaciones, sin cambiar
+    los datos: por escenario, cuántos aprueban y qué proyectos cambian respecto del actual.
+    """
+    validar_contraseña(authorization)
+    return await ejecutar("reportes", simular_escenarios, request)
+
+def matriz_respuestas(snapshot):
+    """MatrizRespuestas de esta versión: la guardada con el procesado o, si no hay, armada del DataFrame."""
+    def construir(df):
+        matriz = leer_matriz(version_en_disco(snapshot))
+        if matriz is None:
+            # Aprobado lo agrega puntuar_dataframe después de puntuar: no es una respuesta
+            matriz = MatrizRespuestas.desde_dataframe(df, cargar_tabla_puntajes(ARCHIVO_DICCIONARIO), excluir={"Aprobado"})
+        return matriz
+    return snapshot.derivado("matriz_respuestas", construir)
+
+def aportes_proyecto(snapshot, posicion):
+    """Qué respuestas (y bonificaciones) sumaron cuánto en cada segmento del proyecto."""
+    return aportes_proyectos(snapshot, [posicion])[0]
+
+def aportes_proyectos(snapshot, posiciones):
+    """aportes_proyecto de varias filas, leyendo una sola vez las etiquetas del diccionario."""
+    matriz = matriz_respuestas(snapshot)
+    etiquetas = etiquetas_respuestas(cargar_diccionario(ARCHIVO_DICCIONARIO), leer_formulario())
+    # Las bonificaciones suman lo mismo en los tres segmentos
+    nombres_bonos = ["Nivel de inglés intermedio", "Nivel de inglés avanzado", "Docente acompañante"]
+    bonos = matriz.bonos[posiciones] * valores_bonos()
+    resultado = []
+    for posicion, bonos_fila in zip(posiciones, bonos.tolist()):
+        aportes = []
+        for clave, veces, puntos in matriz.aportes(posicion):
+            pregunta, respuesta = etiquetas.get(clave, ("", clave[1]))
+            for segmento, puntaje in zip(SEGMENTOS, puntos.tolist()):
+                if puntaje:
+                    aportes.append({
+                        "pregunta": pregunta, "respuesta": respuesta, "segmento": segmento,
+                        "veces": int(veces), "puntaje": puntaje,
+                    })
+        for nombre, puntaje in zip(nombres_bonos, bonos_fila):
+            if puntaje:
+                aportes.append({
+                    "pregunta": "Bonificación", "respuesta": nombre, "segmento": "Todos", "veces": 1, "puntaje": puntaje,
+                })
+        resultado.append(aportes)
+    return resultado
+
+@app.get("/aportes-proyecto/{id_entrada}")
+async def obtener_aportes_proyecto(id_entrada: str, authorization: str = Header(...)):
+    """Detalle del puntaje de un proyecto (por id de entrada): cada respuesta y lo que sumó."""
+    validar_contraseña(authorization)
+    return await ejecutar("consultas", detalle_puntaje, id_entrada)
+
+def detalle_puntaje(id_entrada):
+    snapshot = cache_datos.obtener()
+    posiciones = np.flatnonzero(snapshot.df["id"].astype(str).to_numpy() == id_entrada)
+    if not len(posiciones):
+        raise HTTPException(status_code=404, detail="Proyecto no encontrado")
+    posicion = int(posiciones[-1])
+    proyecto = snapshot.df.iloc[posicion]
     return {
-        "proyectos": df[[
-            "Nombre del Proyecto", "Aprobado", "Puntaje TRL 1-3",
-            "Puntaje TRL 4-7", "Puntaje TRL 8-9", "Puntaje Total",
-            "Segmento TRL", "Industria", "Insights"
-        ]].to_dict(orient="records")
+        "id": id_entrada,
+        "nombre": proyecto.get("Nombre del Proyecto"),
+        "puntajes": {segmento: float(proyecto[f"Puntaje {segmento}"]) for segmento in SEGMENTOS},
+        "aprobado": proyecto["Aprobado"],
+        "aportes": aportes_proyecto(snapshot, posicion),
     }
 
+def simular_escenarios(request: SimulacionRequest):
+    snapshot = cache_datos.obtener()
+    escenarios = [escenario.model_dump() for escenario in request.escenarios]
+    try:
+        return simular(
+            matriz_respuestas(snapshot), snapshot.df, cargar_diccionario(ARCHIVO_DICCIONARIO),
+            leer_formulario(), escenarios, request.max_proyectos,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 
 @app.get("/reporte-proyecto/{nombre}", response_class=HTMLResponse)
 async def generar_reporte_proyecto(
@@ -223,73 +871,39 @@ async def generar_reporte_proyecto(
     nombre: str,
     auth: str = Query(...)
 ):
-    try:
-        decoded = base64.b64decode(auth).decode("utf-8")
-        _, password = decoded.split(":", 1)
+    validar_auth_reporte(auth)
 
-        # Usar la misma lógica de limpieza que en los otros reportes
-        password_limpia = password.strip().replace("\u00A0", " ").replace("\u200B", "")
-        esperado = APP_PASSWORD.replace("\u00A0", " ").replace("\u200B", "")
-
-        if password_limpia != esperado:
-            raise HTTPException(status_code=401, detail="Credenciales inválidas")
-
-    except Exception as e:
-        raise HTTPException(status_code=401, detail="Error en autenticación")
+    cuerpo, etag, modificado = await ejecutar("consultas", reporte_proyecto_html, unquote(nombre))
+    return respuesta_condicional(request, cuerpo, etag, "text/html; charset=utf-8", modificado)
 
-    df = cargar_y_procesar_datos()
-    nombre_decodificado = unquote(nombre)
-
-    proyecto = df[df["Nombre del Proyecto"].str.contains(re.escape(nombre_decodificado), case=False, na=False)]
-    if proyecto.empty:
+def reporte_proyecto_html(nombre_decodificado):
+    snapshot = cache_datos.obtener()
+    posiciones = construir_indice_nombres(snapshot).buscar(nombre_decodificado, difuso=False)
+    if not posiciones:
         raise HTTPException(status_code=404, detail="Proyecto no encontrado")
+    return html_reporte_proyecto(snapshot, posiciones[0])
 
-    proyecto = proyecto.iloc[0]
-    insights = generar_insights(proyecto)
-
-    context = {
-        "request": request,
-        "fecha_generacion": datetime.now().strftime("%d/%m/%Y %H:%M"),
-        "nombre_proyecto": proyecto["Nombre del Proyecto"],
-        "aprobado": proyecto["Aprobado"],
-        "nivel_trl": proyecto["Nivel TRL"],
-        "segmento_trl": proyecto["Segmento TRL"],
-        "docente_acompanante": "Sí" if proyecto["Docente Acompañante"] else "No",
-        "ubicacion": proyecto.get("Ubicación", "No especificada"),
-        "nivel_ingles": proyecto.get("Nivel de Inglés", "No especificado"),
-        "trl_1_3": proyecto["Puntaje TRL 1-3"],
-        "trl_4_7": proyecto["Puntaje TRL 4-7"],
-        "trl_8_9": proyecto["Puntaje TRL 8-9"],
-        "insights": insights
-    }
-    return templates.TemplateResponse("reports/reporte_template.html", context)
+def html_reporte_proyecto(snapshot, posicion):
+    return renderizar_reporte(
+        snapshot, ("proyecto", posicion), PLANTILLA_PROYECTO,
+        lambda df: {**contexto_reporte_proyecto(df.iloc[posicion]), "aportes": aportes_proyecto(snapshot, posicion)},
+    )
 
 @app.get("/insights-generales")
 async def obtener_insights_generales(authorization: str = Header(...)):
     validar_contraseña(authorization)
+    return await ejecutar("consultas", calcular_insights_generales)
+
+def calcular_insights_generales():
+    resumen = resumen_datos()
     try:
-        df = cargar_y_procesar_datos()
-        df["Puntaje Total"] = df["Puntaje TRL 1-3"] + df["Puntaje TRL 4-7"] + df["Puntaje TRL 8-9"]
 
-        total = len(df)
-        aprobados = int((df["Aprobado"] == "Sí").sum())
+        total = resumen["formularios"]
+        aprobados = resumen["aprobados"]
         porcentaje = round((aprobados / total) * 100, 1) if total > 0 else 0.0
-
-        distribucion = df["Segmento TRL"].value_counts().to_dict()
-        distribucion = {str(k): int(v) for k, v in distribucion.items()}
-
-        promedios = {
-            "TRL 1-3": round(df["Puntaje TRL 1-3"].mean(), 1),
-            "TRL 4-7": round(df["Puntaje TRL 4-7"].mean(), 1),
-            "TRL 8-9": round(df["Puntaje TRL 8-9"].mean(), 1),
-            "Total": round(df["Puntaje Total"].mean(), 1)
-        }
-
-        top_rows = df.nlargest(3, "Puntaje Total")[["Nombre del Proyecto", "Puntaje Total"]]
-        top_proyectos = [
-            {"Nombre del Proyecto": str(row["Nombre del Proyecto"]), "Puntaje Total": round(float(row["Puntaje Total"]), 1)}
-            for _, row in top_rows.iterrows()
-        ]
+        distribucion = resumen["distribucion_trl"]
+        promedios = resumen["promedios"]
+        top_proyectos = resumen["top_proyectos"]
 
         insights = [
             f"📊 {aprobados} de {total} proyectos están aprobados ({porcentaje}%)",
@@ -313,60 +927,104 @@ async def obtener_insights_generales(authorization: str = Header(...)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al generar insights: {str(e)}")
 
+TIPOS_REPORTE = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+def proyectos_aprobados():
+    df = obtener_datos()
+    return df[df["Aprobado"] == "Sí"]
+
 @app.get("/reporte-aprobados", response_class=StreamingResponse)
-async def generar_reporte_aprobados():
-    df = cargar_y_procesar_datos()
-    aprobados = df[df["Aprobado"] == "Sí"]
+async def generar_reporte_aprobados(formato: str = Query("xlsx")):
+    if formato not in TIPOS_REPORTE:
+        raise HTTPException(status_code=400, detail="Formato inválido: usa 'xlsx', 'csv' o 'ndjson'")
+
+    aprobados = await ejecutar("reportes", proyectos_aprobados)
 
     if aprobados.empty:
         raise HTTPException(status_code=404, detail="No hay proyectos aprobados.")
 
-    excel_file = generar_excel_aprobados(aprobados)
+    if formato == "xlsx":
+        # openpyxl es Python puro y retiene el GIL: el libro se arma en otro proceso
+        # Lo que mide escribir_excel_aprobados queda en el proceso del pool: aquí se mide la espera
+        with etapa("excel_aprobados_proceso"):
+            ruta = await ejecutar_en_proceso("reportes", exportar_excel_aprobados)
+        contenido = iterar_archivo(ruta)
+    elif formato == "csv":
+        contenido = iterar_csv_aprobados(bloques_con_insights(aprobados))
+    else:
+        contenido = iterar_ndjson_aprobados(bloques_con_insights(aprobados))
 
+    # Cada trozo se lee o se genera en un hilo del cupo de reportes
     return StreamingResponse(
-        excel_file,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        iterar_en_hilo("reportes", contenido),
+        media_type=TIPOS_REPORTE[formato],
         headers={
-            "Content-Disposition": "attachment; filename=proyectos_aprobados.xlsx"
+            "Content-Disposition": f"attachment; filename=proyectos_aprobados.{formato}"
         }
     )
     
 @app.get("/reporte-top10", response_class=HTMLResponse)
 async def generar_reporte_top10(request: Request, auth: str = Query(...)):
-    try:
-        decoded = base64.b64decode(auth).decode("utf-8")
-        _, password = decoded.split(":", 1)
-
-        password_limpia = password.strip().replace("\u00A0", " ").replace("\u200B", "")
-        esperado = APP_PASSWORD.replace("\u00A0", " ").replace("\u200B", "")
+    validar_auth_reporte(auth)
+
+    cuerpo, etag, modificado = await ejecutar("consultas", reporte_top10_html)
+    return respuesta_condicional(request, cuerpo, etag, "text/html; charset=utf-8", modificado)
+
+def reporte_top10_html(snapshot=None):
+    snapshot = snapshot or cache_datos.obtener()
+    return renderizar_reporte(snapshot, ("top10",), PLANTILLA_TOP10, lambda df: contexto_top10(top_proyectos(snapshot, 10)))
+
+def top_proyectos(snapshot, n):
+    """Filas de los `n` mayores puntajes totales (de la base SQL si está al día)."""
+    posiciones = consultar_base(snapshot, "top", n)
+    if posiciones is None:
+        return snapshot.df
+    # contexto_top10 hace el nlargest sobre estas filas: el resultado es el mismo
+    return snapshot.df.iloc[posiciones]
+
+@app.get("/reportes-proyectos.zip", response_class=StreamingResponse)
+async def exportar_reportes_proyectos(
+    auth: str = Query(...),
+    segmento: list[str] | None = Query(None),
+    aprobado: str | None = Query("Sí", description="Vacío para incluir todos"),
+    industria: list[str] | None = Query(None),
+    puntaje: str = Query("Puntaje Total"),
+    puntaje_min: float | None = Query(None),
+    puntaje_max: float | None = Query(None),
+):
+    """
+    ZIP con el reporte HTML de cada proyecto que pasa los filtros (los mismos de
+    /proyectos; por defecto, los aprobados) y un index.html con enlaces a todos.
+    """
+    validar_auth_reporte(auth)
+    snapshot, posiciones = await ejecutar(
+        "reportes", seleccionar_proyectos, segmento, aprobado, industria, puntaje, puntaje_min, puntaje_max
+    )
+    if not len(posiciones):
+        raise HTTPException(status_code=404, detail="Ningún proyecto cumple los filtros.")
 
-        if password_limpia != esperado:
-            raise HTTPException(status_code=401, detail="Credenciales inválidas")
-    except:
-        raise HTTPException(status_code=401, detail="Error en autenticación")
+    # Los procesos del pool no tienen la matriz de respuestas: el detalle del puntaje va armado con cada lote
+    def aportes(inicio, fin):
+        return aportes_proyectos(snapshot, posiciones[inicio:fin])
 
-    df = cargar_y_procesar_datos()
-    top10 = df.sort_values(by="Puntaje Total", ascending=False).head(10)
-
-    proyectos_contexto = []
-    for _, proyecto in top10.iterrows():
-        proyectos_contexto.append({
-            "nombre_proyecto": proyecto["Nombre del Proyecto"],
-            "aprobado": proyecto["Aprobado"],
-            "nivel_trl": proyecto["Nivel TRL"],
-            "segmento_trl": proyecto["Segmento TRL"],
-            "docente_acompanante": "Sí" if proyecto["Docente Acompañante"] else "No",
-            "ubicacion": proyecto.get("Ubicación", "No especificada"),
-            "nivel_ingles": proyecto.get("Nivel de Inglés", "No especificado"),
-            "trl_1_3": proyecto["Puntaje TRL 1-3"],
-            "trl_4_7": proyecto["Puntaje TRL 4-7"],
-            "trl_8_9": proyecto["Puntaje TRL 8-9"],
-            "puntaje_total": proyecto["Puntaje Total"],
-            "insights": generar_insights(proyecto),
-        })
+    return StreamingResponse(
+        iterar_en_hilo("reportes", iterar_zip_reportes(snapshot.df.iloc[posiciones], aportes)),
+        media_type="application/zip",
+        headers={"Content-Disposition": "attachment; filename=reportes_proyectos.zip"},
+    )
 
-    return templates.TemplateResponse("reports/reporte_top10.html", {
-        "request": request,
-        "fecha_generacion": datetime.now().strftime("%d/%m/%Y %H:%M"),
-        "proyectos": proyectos_contexto
-    })
+def seleccionar_proyectos(segmento, aprobado, industria, puntaje, puntaje_min, puntaje_max):
+    if puntaje not in COLUMNAS_PUNTAJE:
+        raise HTTPException(status_code=400, detail=f"Puntaje inválido: usa {', '.join(COLUMNAS_PUNTAJE)}")
+    """(snapshot, posiciones de las filas que pasan los filtros de /proyectos)."""
+    snapshot = cache_datos.obtener()
+    seleccion = consultar_base(snapshot, "listar", segmento, aprobado, industria, puntaje, puntaje_min, puntaje_max)
+    if seleccion is not None:
+        return snapshot, list(seleccion[0])
+    df = snapshot.df
+    mascara = filtrar_proyectos(df, segmento, aprobado, industria, puntaje, puntaje_min, puntaje_max)
+    return snapshot, np.flatnonzero(np.asarray(mascara)).tolist()
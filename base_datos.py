@@ -0,0 +1,305 @@
+# base_datos.py
+"""
+Base SQLite local con las entradas, los puntajes y las dimensiones de cada proyecto,
+para resolver con índices las búsquedas por nombre, los filtros de /proyectos y el
+top N sin recorrer el DataFrame.
+
+- entradas: la entrada cruda de Gravity Forms (JSON) por id de entrada.
+- proyectos: una fila por proyecto con su posición en el snapshot procesado, los
+  puntajes por segmento, Aprobado y las dimensiones (industria, ubicación, inglés, docente).
+- nombres: índice FTS5 de trigramas sobre el nombre normalizado (búsqueda por subcadena).
+
+Guarda la versión de datos_version.txt a la que corresponde: las consultas reciben la
+versión del snapshot que atienden y devuelven None si la base no está en esa versión, para
+que el llamador use el DataFrame en memoria. Así la base puede ir un paso atrás (mientras se
+reescribe en segundo plano) sin devolver nunca filas de otra versión.
+"""
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from indice_nombres import normalizar_nombre
+from metricas import cronometrar
+
+ARCHIVO_BASE = os.getenv("BASE_DATOS", "datos.sqlite3")
+
+# Columna del DataFrame procesado -> columna de la tabla proyectos
+COLUMNAS = {
+    "Nombre del Proyecto": "nombre",
+    "Nivel TRL": "nivel_trl",
+    "Segmento TRL": "segmento",
+    "Industria": "industria",
+    "Ubicación": "ubicacion",
+    "Nivel de Inglés": "nivel_ingles",
+    "Docente Acompañante": "docente",
+    "Aprobado": "aprobado",
+    "Puntaje TRL 1-3": "puntaje_1_3",
+    "Puntaje TRL 4-7": "puntaje_4_7",
+    "Puntaje TRL 8-9": "puntaje_8_9",
+    "Puntaje Total": "puntaje_total",
+}
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS meta (clave TEXT PRIMARY KEY, valor TEXT);
+CREATE TABLE IF NOT EXISTS entradas (
+    id TEXT PRIMARY KEY,
+    date_updated TEXT,
+    datos TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS proyectos (
+    posicion INTEGER PRIMARY KEY,
+    id TEXT,
+    nombre TEXT,
+    nombre_normalizado TEXT,
+    nivel_trl REAL,
+    segmento TEXT,
+    industria TEXT,
+    ubicacion TEXT,
+    nivel_ingles TEXT,
+    docente INTEGER,
+    aprobado TEXT,
+    puntaje_1_3 REAL,
+    puntaje_4_7 REAL,
+    puntaje_8_9 REAL,
+    puntaje_total REAL
+);
+CREATE INDEX IF NOT EXISTS proyectos_id ON proyectos (id);
+CREATE INDEX IF NOT EXISTS proyectos_nombre ON proyectos (nombre_normalizado);
+CREATE INDEX IF NOT EXISTS proyectos_segmento ON proyectos (segmento);
+CREATE INDEX IF NOT EXISTS proyectos_aprobado ON proyectos (aprobado, puntaje_total);
+CREATE INDEX IF NOT EXISTS proyectos_puntaje ON proyectos (puntaje_total);
+CREATE VIRTUAL TABLE IF NOT EXISTS nombres USING fts5(nombre, tokenize='trigram');
+"""
+
+COLUMNAS_PROYECTOS = ["posicion", "id", *COLUMNAS.values()]
+COLUMNAS_PROYECTOS.insert(COLUMNAS_PROYECTOS.index("nombre") + 1, "nombre_normalizado")
+
+
+class BaseDatos:
+    """Conexión (una por hilo) a la base SQLite en modo WAL: varios lectores y un escritor a la vez."""
+
+    def __init__(self, ruta=ARCHIVO_BASE):
+        self.ruta = ruta
+        self._local = threading.local()
+
+    def _conexion(self):
+        conexion = getattr(self._local, "conexion", None)
+        if conexion is None:
+            conexion = sqlite3.connect(self.ruta, timeout=30, isolation_level=None, check_same_thread=False)
+            conexion.execute("PRAGMA journal_mode=WAL")
+            conexion.execute("PRAGMA synchronous=NORMAL")
+            conexion.executescript(ESQUEMA)
+            self._local.conexion = conexion
+        return conexion
+
+    @contextmanager
+    def _transaccion(self, escritura=False):
+        conexion = self._conexion()
+        # IMMEDIATE toma el lock de escritura al empezar; una lectura ve una versión fija de la base
+        conexion.execute("BEGIN IMMEDIATE" if escritura else "BEGIN")
+        try:
+            yield conexion
+        except BaseException:
+            conexion.execute("ROLLBACK")
+            raise
+        conexion.execute("COMMIT")
+
+    def _version(self, conexion):
+        fila = conexion.execute("SELECT valor FROM meta WHERE clave = 'version'").fetchone()
+        return int(fila[0]) if fila else None
+
+    def version(self):
+        return self._version(self._conexion())
+
+    # --- ESCRITURA ---
+
+    @cronometrar("base_datos_reemplazar")
+    def reemplazar(self, crudo, df, version):
+        """
+        Reescribe toda la base con las entradas `crudo` y su DataFrame procesado `df`
+        (mismas filas). No hace nada si la base ya tiene esa versión o una posterior.
+        """
+        proyectos = _filas_proyectos(df, np.arange(len(df)))
+        with self._transaccion(escritura=True) as conexion:
+            actual = self._version(conexion)
+            if actual is not None and actual >= version:
+                return
+            conexion.execute("DELETE FROM entradas")
+            conexion.execute("DELETE FROM proyectos")
+            conexion.execute("DELETE FROM nombres")
+            self._escribir(conexion, crudo, proyectos, version)
+            # Estadísticas para que el planificador no use un índice poco selectivo (p. ej. segmento)
+            conexion.execute("ANALYZE")
+
+    @cronometrar("base_datos_upsert")
+    def actualizar(self, nuevas, df, version):
+        """
+        Upsert en una transacción de las entradas `nuevas` (crudas), con sus filas del
+        DataFrame procesado `df` ya combinado (las existentes conservan su posición).
+        Solo aplica sobre la versión inmediatamente anterior; devuelve False si la base
+        estaba en otra y hay que reescribirla completa.
+        """
+        nuevas = nuevas.drop_duplicates(subset="id", keep="last")
+        posicion_por_id = {id_: pos for pos, id_ in enumerate(df["id"].astype(str))}
+        posiciones = np.array([posicion_por_id[id_] for id_ in nuevas["id"].astype(str)])
+        proyectos = _filas_proyectos(df, posiciones)
+        with self._transaccion(escritura=True) as conexion:
+            if self._version(conexion) != version - 1:
+                return False
+            conexion.executemany("DELETE FROM nombres WHERE rowid = ?", ((int(p),) for p in posiciones))
+            self._escribir(conexion, nuevas, proyectos, version)
+        return True
+
+    def _escribir(self, conexion, crudo, proyectos, version):
+        conexion.executemany(
+            "INSERT INTO entradas (id, date_updated, datos) VALUES (?, ?, ?) "
+            "ON CONFLICT (id) DO UPDATE SET date_updated = excluded.date_updated, datos = excluded.datos",
+            _filas_entradas(crudo),
+        )
+        marcadores = ", ".join("?" * len(COLUMNAS_PROYECTOS))
+        conexion.executemany(
+            f"INSERT OR REPLACE INTO proyectos ({', '.join(COLUMNAS_PROYECTOS)}) VALUES ({marcadores})", proyectos
+        )
+        indice_normalizado = COLUMNAS_PROYECTOS.index("nombre_normalizado")
+        conexion.executemany(
+            "INSERT INTO nombres (rowid, nombre) VALUES (?, ?)", ((fila[0], fila[indice_normalizado]) for fila in proyectos)
+        )
+        conexion.execute("INSERT OR REPLACE INTO meta (clave, valor) VALUES ('version', ?)", (str(version),))
+
+    # --- CONSULTAS ---
+
+    def _consultar(self, version, consultas):
+        """Corre `consultas(conexion)` en una lectura consistente si la base está en `version`."""
+        with self._transaccion() as conexion:
+            if self._version(conexion) != version:
+                return None
+            return consultas(conexion)
+
+    def listar(self, version, segmento=None, aprobado=None, industria=None, puntaje="Puntaje Total",
+               puntaje_min=None, puntaje_max=None, orden=None, limite=None, offset=0):
+        """
+        (posiciones, total) de los proyectos que pasan los filtros de /proyectos, en el
+        mismo orden que el listado en memoria. None si la base no está en `version` o si
+        se ordena por una columna que no está en la tabla.
+        """
+        columna_orden = None
+        if orden:
+            columna_orden = COLUMNAS.get(orden.removeprefix("-"))
+            if columna_orden is None:
+                return None
+
+        condiciones, parametros = [], []
+        if segmento:
+            condiciones.append(f"segmento IN ({', '.join('?' * len(segmento))})")
+            parametros += segmento
+        if aprobado:
+            condiciones.append("aprobado = ?")
+            parametros.append(aprobado)
+        if industria:
+            condiciones.append(f"industria IN ({', '.join('?' * len(industria))})")
+            parametros += industria
+        if puntaje_min is not None:
+            condiciones.append(f"{COLUMNAS[puntaje]} >= ?")
+            parametros.append(puntaje_min)
+        if puntaje_max is not None:
+            condiciones.append(f"{COLUMNAS[puntaje]} <= ?")
+            parametros.append(puntaje_max)
+        donde = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+
+        # Como el sort estable de pandas: los vacíos al final y, a igual valor, el orden original.
+        # En SQLite NULL es el menor valor, así que en DESC ya quedan al final y se usa el índice
+        if columna_orden:
+            sentido = "DESC" if orden.startswith("-") else "ASC NULLS LAST"
+            ordenar = f"ORDER BY {columna_orden} {sentido}, posicion"
+        else:
+            ordenar = "ORDER BY posicion"
+        pagina = "LIMIT ? OFFSET ?" if limite is not None else ""
+        parametros_pagina = [limite, offset] if limite is not None else []
+
+        def consultas(conexion):
+            filas = conexion.execute(
+                f"SELECT posicion FROM proyectos {donde} {ordenar} {pagina}", parametros + parametros_pagina
+            ).fetchall()
+            if limite is None:
+                total = len(filas)
+            else:
+                total = conexion.execute(f"SELECT COUNT(*) FROM proyectos {donde}", parametros).fetchone()[0]
+            return _posiciones(filas), total
+
+        return self._consultar(version, consultas)
+
+    def buscar_nombre(self, version, consulta, limite=None, offset=0):
+        """
+        (posiciones, total) de los proyectos cuyo nombre contiene `consulta`, ordenados
+        como IndiceNombres.buscar: nombre exacto, prefijo, inicio de palabra y el resto.
+        None con menos de 3 letras: sin trigramas no hay índice que usar.
+        """
+        consulta = normalizar_nombre(consulta)
+        if len(consulta) < 3:
+            return None
+        pagina = "LIMIT ? OFFSET ?" if limite is not None else ""
+        parametros_pagina = [limite, offset] if limite is not None else []
+        # Los trigramas dan los candidatos; instr confirma que la consulta aparece seguida
+        donde = "WHERE posicion IN (SELECT rowid FROM nombres WHERE nombres MATCH ?) AND instr(nombre_normalizado, ?) > 0"
+        parametros = ['"' + consulta.replace('"', '""') + '"', consulta]
+        ordenar = (
+            "ORDER BY CASE WHEN nombre_normalizado = ? THEN 0 "
+            "WHEN substr(nombre_normalizado, 1, length(?)) = ? THEN 1 "
+            "WHEN instr(nombre_normalizado, ?) > 0 THEN 2 ELSE 3 END, posicion"
+        )
+        parametros_orden = [consulta, consulta, consulta, f" {consulta}"]
+
+        def consultas(conexion):
+            filas = conexion.execute(
+                f"SELECT posicion FROM proyectos {donde} {ordenar} {pagina}",
+                parametros + parametros_orden + parametros_pagina,
+            ).fetchall()
+            total = conexion.execute(f"SELECT COUNT(*) FROM proyectos {donde}", parametros).fetchone()[0]
+            return _posiciones(filas), total
+
+        return self._consultar(version, consultas)
+
+    def top(self, version, n, puntaje="Puntaje Total"):
+        """Posiciones de los `n` mayores puntajes (a igual puntaje, el primero), como nlargest."""
+        columna = COLUMNAS[puntaje]
+        return self._consultar(version, lambda conexion: _posiciones(conexion.execute(
+            f"SELECT posicion FROM proyectos WHERE {columna} IS NOT NULL ORDER BY {columna} DESC, posicion LIMIT ?", (n,)
+        ).fetchall()))
+
+    def entrada(self, id_entrada):
+        """Entrada cruda de Gravity Forms (dict) por id, o None."""
+        fila = self._conexion().execute("SELECT datos FROM entradas WHERE id = ?", (str(id_entrada),)).fetchone()
+        return json.loads(fila[0]) if fila else None
+
+
+def _posiciones(filas):
+    return np.fromiter((fila[0] for fila in filas), dtype=np.int64, count=len(filas))
+
+
+def _filas_entradas(crudo):
+    # to_json serializa todas las filas de una vez; se separan por "\n" (dentro de los textos va escapado)
+    datos = crudo.to_json(orient="records", lines=True, force_ascii=False).split("\n")
+    actualizadas = crudo["date_updated"] if "date_updated" in crudo.columns else pd.Series(None, index=crudo.index)
+    return zip(crudo["id"].astype(str), actualizadas.astype(object).where(actualizadas.notna(), None), datos)
+
+
+def _filas_proyectos(df, posiciones):
+    """Tuplas (en el orden de COLUMNAS_PROYECTOS) de las filas `posiciones` de `df`."""
+    filas = df.iloc[posiciones]
+    columnas = {
+        "posicion": posiciones.tolist(),
+        "id": filas["id"].astype(str).tolist(),
+    }
+    for columna_df, columna in COLUMNAS.items():
+        if columna_df in filas.columns:
+            valores = filas[columna_df].astype(object)
+            columnas[columna] = valores.where(valores.notna(), None).tolist()
+        else:
+            columnas[columna] = [None] * len(filas)
+    columnas["nombre_normalizado"] = [normalizar_nombre(nombre) for nombre in columnas["nombre"]]
+    return list(zip(*(columnas[columna] for columna in COLUMNAS_PROYECTOS)))
@@ -0,0 +1,98 @@
+# carga.py
+"""
+Prueba de carga: mide la latencia de los endpoints baratos mientras hay peticiones
+pesadas en curso, para comprobar que el servidor sigue respondiendo.
+
+    APP_PASSWORD=... python benchmarks/carga.py --url http://localhost:8000 --pesadas 4 --segundos 20
+"""
+import argparse
+import base64
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+LIVIANOS = ["/metricas-principales", "/insights-generales", "/proyectos?limite=20"]
+PESADOS = ["/proyectos", "/reporte-aprobados?formato=xlsx", "/reporte-aprobados?formato=csv"]
+
+
+def percentil(valores, p):
+    if not valores:
+        return float("nan")
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+def medir(sesion, url, headers):
+    inicio = time.perf_counter()
+    respuesta = sesion.get(url, headers=headers)
+    respuesta.content
+    return (time.perf_counter() - inicio) * 1000, respuesta.status_code
+
+
+def trabajador(url_base, rutas, headers, hasta, resultados, errores):
+    with requests.Session() as sesion:
+        i = 0
+        while time.monotonic() < hasta:
+            ruta = rutas[i % len(rutas)]
+            i += 1
+            try:
+                ms, estado = medir(sesion, url_base + ruta, headers)
+            except requests.RequestException:
+                errores.append(ruta)
+                continue
+            if estado >= 400:
+                errores.append(ruta)
+            resultados.setdefault(ruta, []).append(ms)
+
+
+def ejecutar_escenario(url_base, headers, pesadas, livianas, segundos):
+    resultados_livianos, resultados_pesados, errores = {}, {}, []
+    hasta = time.monotonic() + segundos
+    with ThreadPoolExecutor(max_workers=pesadas + livianas) as ejecutor:
+        for _ in range(pesadas):
+            ejecutor.submit(trabajador, url_base, PESADOS, headers, hasta, resultados_pesados, errores)
+        for _ in range(livianas):
+            ejecutor.submit(trabajador, url_base, LIVIANOS, headers, hasta, resultados_livianos, errores)
+    return resultados_livianos, resultados_pesados, errores
+
+
+def imprimir(titulo, resultados):
+    print(f"\n{titulo}")
+    print(f"{'endpoint':45} {'n':>6} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    for ruta, tiempos in sorted(resultados.items()):
+        print(f"{ruta:45} {len(tiempos):6d} {statistics.median(tiempos):9.1f} "
+              f"{percentil(tiempos, 95):9.1f} {max(tiempos):9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--pesadas", type=int, default=4, help="clientes pidiendo endpoints pesados")
+    parser.add_argument("--livianas", type=int, default=4, help="clientes pidiendo endpoints baratos")
+    parser.add_argument("--segundos", type=float, default=20)
+    args = parser.parse_args()
+
+    clave = os.getenv("APP_PASSWORD", "")
+    headers = {"Authorization": "Basic " + base64.b64encode(f"usuario:{clave}".encode()).decode()}
+
+    # Calienta la cache de datos antes de medir
+    requests.get(args.url + "/metricas-principales", headers=headers).raise_for_status()
+
+    print(f"Solo endpoints baratos ({args.livianas} clientes)")
+    livianos, _, errores = ejecutar_escenario(args.url, headers, 0, args.livianas, args.segundos / 2)
+    imprimir("Sin carga pesada", livianos)
+
+    livianos, pesados, errores_carga = ejecutar_escenario(args.url, headers, args.pesadas, args.livianas, args.segundos)
+    imprimir(f"Con {args.pesadas} clientes pesados en paralelo", livianos)
+    imprimir("Endpoints pesados", pesados)
+
+    errores += errores_carga
+    if errores:
+        print(f"\n{len(errores)} peticiones con error")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# generar_datos.py
+"""
+Genera entradas sintéticas del formulario 9 de Gravity Forms con las respuestas de
+diccionario.csv: un campo por pregunta (40, 41, ...) y casillas 40.1, 40.2... en las
+preguntas de opción múltiple. También escribe el esquema (formulario.json) para que el
+puntaje use los ids de campo igual que en producción.
+
+    python benchmarks/generar_datos.py --filas 100000 --destino /tmp/bench
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PRIMER_CAMPO = 40
+
+NOMBRES = ["Proyecto Ñandú", "Robot Árbol", "EcoAgua", "Sensor solar", "Drone médico", "Biofiltro"]
+INDUSTRIAS = ["Salud", "Educación", "Energía", "Agroindustria", "Minería", None]
+NIVELES_TRL = ["1", "2", "3", "4", "5", "6", "7", "8", "9", None]
+DOCENTE = ["Si", "No", None]
+INGLES = ["Básico", "Intermedio", "Avanzado", None]
+UBICACIONES = ["Huancayo", "Lima", "Arequipa", "Cusco", None]
+
+
+def preguntas_del_diccionario(ruta=os.path.join(RAIZ, "diccionario.csv")):
+    """[(id de campo, pregunta, [respuestas])] en el orden de diccionario.csv."""
+    dic = pd.read_csv(ruta)
+    preguntas = list(dict.fromkeys(dic["Pregunta"].str.strip()))
+    return [
+        (str(PRIMER_CAMPO + i), pregunta, dic.loc[dic["Pregunta"].str.strip() == pregunta, "Respuesta"].str.strip().tolist())
+        for i, pregunta in enumerate(preguntas)
+    ]
+
+
+def _elegir(rng, opciones, filas):
+    return np.array(opciones, dtype=object)[rng.integers(0, len(opciones), filas)]
+
+
+def generar_entradas(filas, semilla=0, preguntas=None):
+    """DataFrame con `filas` entradas crudas, todas las columnas como texto (como las guarda la API)."""
+    rng = np.random.default_rng(semilla)
+    preguntas = preguntas or preguntas_del_diccionario()
+    ids = np.arange(1, filas + 1)
+    dias = rng.integers(0, 365, filas)
+    fechas = (np.datetime64("2024-01-01") + dias).astype(str)
+
+    columnas = {
+        "id": ids.astype(str),
+        "form_id": np.full(filas, "9", dtype=object),
+        "date_created": np.char.add(fechas, " 10:00:00"),
+        "date_updated": np.char.add(fechas, " 12:00:00"),
+        "1": [f"{nombre} {i}" for nombre, i in zip(_elegir(rng, NOMBRES, filas), ids)],
+        "3": _elegir(rng, INDUSTRIAS, filas),
+        "14": _elegir(rng, NIVELES_TRL, filas),
+        "15": _elegir(rng, DOCENTE, filas),
+        "17": _elegir(rng, INGLES, filas),
+        "30": _elegir(rng, UBICACIONES, filas),
+    }
+    for campo, pregunta, respuestas in preguntas:
+        if "Marca todas" in pregunta:
+            # Casillas: cada opción marcada con probabilidad 0.4; sin marcar llega vacía
+            for k, respuesta in enumerate(respuestas, start=1):
+                columnas[f"{campo}.{k}"] = np.where(rng.random(filas) < 0.4, respuesta, None)
+        else:
+            columnas[campo] = _elegir(rng, respuestas + [None], filas)
+    return pd.DataFrame(columnas).astype(object)
+
+
+def esquema_formulario(preguntas=None):
+    """Esquema mínimo de GET /forms/9 con un campo por pregunta del diccionario."""
+    preguntas = preguntas or preguntas_del_diccionario()
+    campos = []
+    for campo, pregunta, respuestas in preguntas:
+        casillas = "Marca todas" in pregunta
+        campos.append({
+            "id": int(campo),
+            "label": pregunta,
+            "type": "checkbox" if casillas else "radio",
+            "choices": [{"text": r, "value": r} for r in respuestas],
+            "inputs": [{"id": f"{campo}.{k}", "label": r} for k, r in enumerate(respuestas, start=1)] if casillas else None,
+        })
+    return {"id": "9", "title": "Evaluación TRL", "fields": campos}
+
+
+def escribir_dataset(destino, filas, semilla=0, esquema=True):
+    """Deja en `destino` un directorio de datos listo para la API: crudo, diccionario y esquema."""
+    # Importado aquí: almacenamiento escribe con el mismo formato y lock que la API
+    import shutil
+    from almacenamiento import ARCHIVO_CRUDO, _escribir
+    import pyarrow as pa
+
+    os.makedirs(destino, exist_ok=True)
+    shutil.copy(os.path.join(RAIZ, "diccionario.csv"), destino)
+    preguntas = preguntas_del_diccionario()
+    df = generar_entradas(filas, semilla, preguntas)
+    esquema_tabla = pa.schema([(col, pa.string()) for col in df.columns])
+    _escribir(pa.Table.from_pandas(df, schema=esquema_tabla, preserve_index=False), os.path.join(destino, ARCHIVO_CRUDO))
+    if esquema:
+        with open(os.path.join(destino, "formulario.json"), "w", encoding="utf-8") as f:
+            json.dump(esquema_formulario(preguntas), f, ensure_ascii=False)
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, default=10000)
+    parser.add_argument("--destino", default=".")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--sin-esquema", action="store_true", help="no escribir formulario.json")
+    parser.add_argument("--csv", action="store_true", help="escribir también datos_formularios.csv")
+    args = parser.parse_args()
+
+    df = escribir_dataset(args.destino, args.filas, args.semilla, esquema=not args.sin_esquema)
+    if args.csv:
+        df.to_csv(os.path.join(args.destino, "datos_formularios.csv"), index=False)
+    print(f"{len(df)} entradas en {os.path.abspath(args.destino)}")
+
+
+if __name__ == "__main__":
+    import sys
+    sys.path.insert(0, RAIZ)
+    main()
@@ -0,0 +1,287 @@
+# rendimiento.py
+"""
+Suite de rendimiento: genera datos sintéticos del formulario 9 (generar_datos.py) y mide
+tiempo y pico de memoria de cada etapa (carga, puntaje, insights, resumen, gráficos,
+Excel) y de cada endpoint de la API con un cliente de pruebas en el mismo proceso.
+
+Cada tamaño corre en un proceso aparte y en un directorio temporal. Los resultados se
+guardan en JSON y, con --base, se comparan contra una corrida anterior: sale con código 1
+si alguna medición empeora más que la tolerancia.
+
+    python benchmarks/rendimiento.py --filas 1000 10000 --guardar base.json
+    python benchmarks/rendimiento.py --filas 1000 10000 --base base.json --tolerancia 0.2
+
+La memoria es la de tracemalloc (asignaciones de Python y NumPy del proceso principal);
+el trabajo que corre en el pool de procesos (Excel de /reporte-aprobados, ZIP) solo
+cuenta en el tiempo.
+"""
+import argparse
+import base64
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TAMAÑOS = [1000, 10000, 100000, 1000000]
+CLAVE = "benchmark"
+
+# Diferencias por debajo de estos mínimos son ruido aunque superen la tolerancia
+MINIMO_SEGUNDOS = 0.005
+MINIMO_MB = 1.0
+
+
+def medir(funcion, repeticiones, memoria=True):
+    """Mediana y mínimo de `repeticiones` corridas y, aparte, el pico de memoria de una más."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    resultado = {"segundos": statistics.median(tiempos), "minimo": min(tiempos)}
+    if memoria:
+        # Corrida aparte: tracemalloc hace más lento el código que mide
+        tracemalloc.start()
+        try:
+            funcion()
+            resultado["memoria_mb"] = tracemalloc.get_traced_memory()[1] / 2**20
+        finally:
+            tracemalloc.stop()
+    return resultado
+
+
+# --- ETAPAS (funciones de la API llamadas directamente) ---
+
+def etapas(datos):
+    """Etapas medidas: nombre -> función sin argumentos. `datos` trae crudo, df y aprobados."""
+    from almacenamiento import leer_crudo
+    from agregados import construir_resumen
+    from backend_api import ARCHIVO_DICCIONARIO, cache_datos, construir_payload_graficos
+    from data_loader import cargar_tabla_puntajes
+    from funciones import escribir_excel_aprobados
+    from insights import bloques_con_insights, cache_insights, generar_insights_lote
+    from nucleo import procesar_datos_completos
+
+    def excel():
+        # Sin la cache de insights: se mide la exportación completa
+        cache_insights.limpiar()
+        with tempfile.TemporaryFile() as destino:
+            escribir_excel_aprobados(bloques_con_insights(datos["aprobados"]), destino)
+
+    def snapshot():
+        cache_datos.invalidar()
+        cache_datos.obtener()
+
+    return {
+        "carga": leer_crudo,
+        "puntaje": lambda: procesar_datos_completos(datos["crudo"], cargar_tabla_puntajes(ARCHIVO_DICCIONARIO)),
+        "insights": lambda: generar_insights_lote(datos["df"]),
+        "resumen": lambda: construir_resumen(datos["df"]),
+        "graficos": lambda: construir_payload_graficos(datos["df"]),
+        "excel": excel,
+        "snapshot": snapshot,
+    }
+
+
+# --- ENDPOINTS (cliente de pruebas sobre la app, sin servidor) ---
+
+def endpoints(datos):
+    """Endpoints medidos: nombre -> (método, ruta, cuerpo JSON)."""
+    auth = base64.b64encode(f"{CLAVE}:{CLAVE}".encode()).decode()
+    nombre = str(datos["df"]["Nombre del Proyecto"].iloc[0])
+    return {
+        "GET /metricas-principales": ("GET", "/metricas-principales", None),
+        "GET /insights-generales": ("GET", "/insights-generales", None),
+        "GET /datos-graficos": ("GET", "/datos-graficos", None),
+        "GET /proyectos?limite=50": ("GET", "/proyectos?limite=50", None),
+        "GET /proyectos": ("GET", "/proyectos", None),
+        "POST /buscar-proyecto": ("POST", "/buscar-proyecto", {"nombre": nombre[:6]}),
+        "GET /reporte-proyecto": ("GET", f"/reporte-proyecto/{nombre}?auth={auth}", None),
+        "GET /reporte-top10": ("GET", f"/reporte-top10?auth={auth}", None),
+        "GET /reporte-aprobados?formato=csv": ("GET", "/reporte-aprobados?formato=csv", None),
+        "GET /reporte-aprobados?formato=ndjson": ("GET", "/reporte-aprobados?formato=ndjson", None),
+        "GET /reporte-aprobados?formato=xlsx": ("GET", "/reporte-aprobados?formato=xlsx", None),
+        "GET /reportes-proyectos.zip": ("GET", f"/reportes-proyectos.zip?auth={auth}", None),
+    }
+
+
+def medir_endpoint(cliente, metodo, ruta, cuerpo, repeticiones, memoria):
+    headers = {"Authorization": "Basic " + base64.b64encode(f"{CLAVE}:{CLAVE}".encode()).decode()}
+
+    def pedir():
+        respuesta = cliente.request(metodo, ruta, json=cuerpo, headers=headers)
+        if respuesta.status_code != 200:
+            raise RuntimeError(f"{metodo} {ruta}: {respuesta.status_code} {respuesta.text[:200]}")
+
+    # La primera petición construye los derivados del snapshot (gráficos, HTML...): se informa aparte
+    inicio = time.perf_counter()
+    pedir()
+    primera = time.perf_counter() - inicio
+    return dict(medir(pedir, repeticiones, memoria), primera=primera)
+
+
+def medir_tamaño(filas, repeticiones, memoria, omitir, semilla):
+    """Corre todas las mediciones de un tamaño en un directorio temporal. Se llama en un proceso aparte."""
+    sys.path.insert(0, RAIZ)
+    os.chdir(RAIZ)
+    os.environ["APP_PASSWORD"] = CLAVE
+    os.environ["SYNC_INTERVALO_MINUTOS"] = "0"
+    # backend_api monta los estáticos con rutas relativas a la raíz del repo
+    import backend_api
+    import visualizaciones  # noqa: F401 (plotly fuera de la medición de gráficos)
+    from fastapi.testclient import TestClient
+    from generar_datos import escribir_dataset
+
+    resultados = {}
+    with tempfile.TemporaryDirectory() as directorio:
+        escribir_dataset(directorio, filas, semilla)
+        # Desde aquí todas las rutas relativas (datos, locks) apuntan al directorio temporal
+        os.chdir(directorio)
+
+        from almacenamiento import leer_crudo
+        from nucleo import procesar_datos_completos
+        from data_loader import cargar_tabla_puntajes
+
+        crudo = leer_crudo()
+        df = procesar_datos_completos(crudo, cargar_tabla_puntajes(backend_api.ARCHIVO_DICCIONARIO))
+        datos = {"crudo": crudo, "df": df, "aprobados": df[df["Aprobado"] == "Sí"]}
+
+        for nombre, funcion in etapas(datos).items():
+            if nombre in omitir:
+                continue
+            print(f"  {filas} {nombre}", file=sys.stderr, flush=True)
+            resultados[nombre] = medir(funcion, repeticiones, memoria)
+
+        cliente = TestClient(backend_api.app)
+        for nombre, (metodo, ruta, cuerpo) in endpoints(datos).items():
+            if nombre in omitir:
+                continue
+            print(f"  {filas} {nombre}", file=sys.stderr, flush=True)
+            resultados[nombre] = medir_endpoint(cliente, metodo, ruta, cuerpo, repeticiones, memoria)
+        os.chdir(RAIZ)
+
+    return {
+        "etapas": resultados,
+        # ru_maxrss está en KB en Linux
+        "rss_max_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def correr_tamaño(filas, args):
+    """Lanza medir_tamaño en un proceso nuevo: caches, pool y memoria no se mezclan entre tamaños."""
+    comando = [
+        sys.executable, os.path.abspath(__file__), "--interno", str(filas),
+        "--repeticiones", str(args.repeticiones), "--semilla", str(args.semilla),
+    ]
+    if args.sin_memoria:
+        comando.append("--sin-memoria")
+    if args.omitir:
+        comando += ["--omitir", *args.omitir]
+    proceso = subprocess.run(comando, cwd=RAIZ, stdout=subprocess.PIPE, text=True)
+    if proceso.returncode != 0:
+        sys.exit(f"Falló la medición con {filas} filas")
+    return json.loads(proceso.stdout)
+
+
+def entorno():
+    import numpy
+    import pandas
+    return {
+        "python": platform.python_version(),
+        "pandas": pandas.__version__,
+        "numpy": numpy.__version__,
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+# --- COMPARACIÓN CON LA BASE ---
+
+def comparar(actual, base, tolerancia):
+    """Filas (tamaño, medición, métrica, valor, valor base, cambio, regresión) de lo que hay en ambas corridas."""
+    filas = []
+    for tamaño, medido in actual["resultados"].items():
+        anterior = base["resultados"].get(tamaño)
+        if anterior is None:
+            continue
+        for nombre, valores in medido["etapas"].items():
+            valores_base = anterior["etapas"].get(nombre)
+            if valores_base is None:
+                continue
+            for metrica, minimo in (("segundos", MINIMO_SEGUNDOS), ("memoria_mb", MINIMO_MB)):
+                if metrica not in valores or metrica not in valores_base:
+                    continue
+                valor, valor_base = valores[metrica], valores_base[metrica]
+                cambio = (valor - valor_base) / valor_base if valor_base else 0.0
+                regresion = cambio > tolerancia and valor - valor_base > minimo
+                filas.append((tamaño, nombre, metrica, valor, valor_base, cambio, regresion))
+    return filas
+
+
+def imprimir(resultados):
+    for tamaño, medido in resultados.items():
+        print(f"\n{int(tamaño):,} filas (RSS máximo {medido['rss_max_mb']:.0f} MB)")
+        for nombre, valores in medido["etapas"].items():
+            memoria = f"{valores['memoria_mb']:9.1f} MB" if "memoria_mb" in valores else ""
+            print(f"  {nombre:38} {valores['segundos'] * 1000:10.1f} ms {memoria}")
+
+
+def imprimir_comparacion(filas, tolerancia):
+    print(f"\nComparación con la base (tolerancia {tolerancia:.0%}):")
+    for tamaño, nombre, metrica, valor, valor_base, cambio, regresion in filas:
+        if regresion or abs(cambio) > tolerancia:
+            marca = "REGRESIÓN" if regresion else ("mejora" if cambio < 0 else "")
+            print(f"  {int(tamaño):>9,} {nombre:38} {metrica:10} {valor_base:10.3f} -> {valor:10.3f} ({cambio:+.0%}) {marca}")
+    regresiones = sum(1 for fila in filas if fila[-1])
+    print(f"  {len(filas)} mediciones comparadas, {regresiones} regresiones")
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, nargs="+", default=[1000, 10000], help=f"tamaños (p. ej. {TAMAÑOS})")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--sin-memoria", action="store_true", help="no medir el pico de memoria (más rápido)")
+    parser.add_argument("--omitir", nargs="+", default=[], help="etapas o endpoints a saltar, p. ej. excel 'GET /reportes-proyectos.zip'")
+    parser.add_argument("--guardar", help="archivo JSON donde guardar los resultados")
+    parser.add_argument("--base", help="resultados anteriores (JSON) contra los que comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="empeoramiento relativo permitido")
+    parser.add_argument("--interno", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.interno is not None:
+        resultado = medir_tamaño(args.interno, args.repeticiones, not args.sin_memoria, set(args.omitir), args.semilla)
+        print(json.dumps(resultado))
+        return
+
+    actual = {
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "entorno": entorno(),
+        "repeticiones": args.repeticiones,
+        "resultados": {str(filas): correr_tamaño(filas, args) for filas in args.filas},
+    }
+    imprimir(actual["resultados"])
+
+    if args.guardar:
+        with open(args.guardar, "w", encoding="utf-8") as f:
+            json.dump(actual, f, ensure_ascii=False, indent=2)
+        print(f"\nResultados guardados en {args.guardar}")
+
+    if args.base:
+        with open(args.base, encoding="utf-8") as f:
+            base = json.load(f)
+        if base.get("entorno", {}).get("plataforma") != actual["entorno"]["plataforma"]:
+            print("\nAviso: la base se midió en otra máquina; las diferencias pueden no ser del código")
+        if imprimir_comparacion(comparar(actual, base, args.tolerancia), args.tolerancia):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# tiempo_importacion.py
+"""
+Presupuesto de arranque del backend: importa backend_api en procesos nuevos, mide
+el tiempo con -X importtime y falla si supera el presupuesto o si algún módulo de
+interfaz (streamlit) se cuela en la cadena de importaciones.
+
+    python benchmarks/tiempo_importacion.py --repeticiones 5 --presupuesto-ms 1000
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROHIBIDOS = ["streamlit"]
+
+
+def medir_importacion(modulo):
+    """Devuelve {módulo: microsegundos acumulados} de una importación en frío."""
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        cwd=RAIZ, capture_output=True, text=True,
+    )
+    if proceso.returncode != 0:
+        sys.exit(f"No se pudo importar {modulo}:\n{proceso.stderr}")
+
+    tiempos = {}
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith("import time:") or "cumulative" in linea:
+            continue
+        # "import time: propio | acumulado | módulo" (el módulo viene indentado según anidación)
+        _, acumulado, nombre = linea.split("|")
+        tiempos[nombre.strip()] = int(acumulado)
+    return tiempos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modulo", default="backend_api")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--presupuesto-ms", type=float,
+                        default=float(os.getenv("PRESUPUESTO_IMPORTACION_MS", "1000")))
+    parser.add_argument("--top", type=int, default=10, help="módulos más caros a mostrar")
+    args = parser.parse_args()
+
+    mediciones = [medir_importacion(args.modulo) for _ in range(args.repeticiones)]
+    totales = [m[args.modulo] / 1000 for m in mediciones]
+    total = statistics.median(totales)
+
+    print(f"import {args.modulo}: mediana {total:.0f} ms (min {min(totales):.0f}, max {max(totales):.0f}, n={len(totales)})")
+    print(f"\n{'módulo':45} {'acumulado ms':>13}")
+    ultima = mediciones[-1]
+    for nombre, micros in sorted(ultima.items(), key=lambda x: -x[1])[1:args.top + 1]:
+        print(f"{nombre:45} {micros / 1000:13.1f}")
+
+    fallas = []
+    prohibidos = sorted({nombre for nombre in ultima if nombre.split(".")[0] in PROHIBIDOS})
+    if prohibidos:
+        fallas.append(f"se importan módulos de interfaz: {', '.join(prohibidos[:5])}")
+    if total > args.presupuesto_ms:
+        fallas.append(f"{total:.0f} ms supera el presupuesto de {args.presupuesto_ms:.0f} ms")
+
+    if fallas:
+        print("\n❌ " + "\n❌ ".join(fallas))
+        sys.exit(1)
+    print(f"\n✅ Dentro del presupuesto ({args.presupuesto_ms:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# bloqueo.py
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def _bloquear(archivo):
+    if fcntl is not None:
+        fcntl.flock(archivo.fileno(), fcntl.LOCK_EX)
+        return
+    # msvcrt.locking se rinde tras ~10 s, así que se reintenta hasta obtenerlo
+    archivo.seek(0)
+    while True:
+        try:
+            msvcrt.locking(archivo.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            time.sleep(0.1)
+
+
+def _desbloquear(archivo):
+    if fcntl is not None:
+        fcntl.flock(archivo.fileno(), fcntl.LOCK_UN)
+    else:
+        archivo.seek(0)
+        msvcrt.locking(archivo.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def intentar_bloqueo(ruta):
+    """
+    Toma el lock de `ruta` sin esperar. Devuelve el archivo abierto (el lock dura lo que
+    dure abierto, o el proceso) o None si otro proceso ya lo tiene.
+    """
+    archivo = open(ruta, "a+b")
+    try:
+        if fcntl is not None:
+            fcntl.flock(archivo.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            archivo.seek(0)
+            msvcrt.locking(archivo.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        archivo.close()
+        return None
+    return archivo
+
+
+class BloqueoArchivo:
+    """
+    Lock exclusivo entre procesos (p. ej. los workers de uvicorn) sobre un archivo.
+
+    Dentro de un proceso también excluye a los demás hilos y es reentrante: el hilo
+    que ya lo tiene puede volver a tomarlo sin bloquearse.
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._lock = threading.RLock()
+        self._nivel = 0
+        self._archivo = None
+
+    def __enter__(self):
+        self._lock.acquire()
+        if self._nivel == 0:
+            try:
+                self._archivo = open(self.ruta, "a+b")
+                _bloquear(self._archivo)
+            except BaseException:
+                if self._archivo is not None:
+                    self._archivo.close()
+                    self._archivo = None
+                self._lock.release()
+                raise
+        self._nivel += 1
+        return self
+
+    def __exit__(self, *exc):
+        self._nivel -= 1
+        if self._nivel == 0:
+            _desbloquear(self._archivo)
+            self._archivo.close()
+            self._archivo = None
+        self._lock.release()
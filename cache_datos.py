@@ -0,0 +1,156 @@
+# cache_datos.py
+import contextlib
+import functools
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+
+def firma_archivo(ruta):
+    """Devuelve (mtime, tamaño) del archivo o None si no existe."""
+    try:
+        info = os.stat(ruta)
+    except FileNotFoundError:
+        return None
+    return (info.st_mtime_ns, info.st_size)
+
+
+def memoizar_por_archivo(funcion):
+    """
+    Cachea `funcion(ruta)` mientras el archivo no cambie (misma firma). No depende de
+    ningún framework: lo usan tanto la API como los dashboards de Streamlit.
+    """
+    cache = {}
+    lock = threading.Lock()
+
+    @functools.wraps(funcion)
+    def envoltura(ruta, *args):
+        clave = (ruta, *args)
+        firma = firma_archivo(ruta)
+        guardado = cache.get(clave)
+        if guardado is not None and guardado[0] == firma:
+            return guardado[1]
+        with lock:
+            guardado = cache.get(clave)
+            if guardado is None or guardado[0] != firma:
+                cache[clave] = guardado = (firma, funcion(ruta, *args))
+            return guardado[1]
+
+    envoltura.clear = cache.clear
+    return envoltura
+
+
+@dataclass(frozen=True)
+class SnapshotDatos:
+    """Versión inmutable del DataFrame procesado que comparten todos los endpoints."""
+    df: pd.DataFrame
+    version: int
+    huella: tuple
+    creado: float
+    derivados: dict = field(default_factory=dict, repr=False, compare=False)
+    _lock_derivados: threading.RLock = field(default_factory=threading.RLock, repr=False, compare=False)
+
+    def derivado(self, nombre, construir):
+        """
+        Artefacto calculado a partir de esta versión de los datos (gráficos, índices,
+        resúmenes...). Se construye una sola vez y vive lo mismo que el snapshot.
+        """
+        if nombre in self.derivados:
+            return self.derivados[nombre]
+        with self._lock_derivados:
+            if nombre not in self.derivados:
+                self.derivados[nombre] = construir(self.df)
+            return self.derivados[nombre]
+
+
+class CacheDatos:
+    """
+    Cache en memoria del DataFrame procesado.
+
+    La validez se decide con la huella (mtime/tamaño) de los archivos fuente: mientras
+    no cambien, todas las peticiones reutilizan el mismo snapshot. Las reconstrucciones
+    se serializan con un lock, de modo que las peticiones que llegan durante una
+    reconstrucción esperan a esa misma construcción en lugar de lanzar la suya.
+
+    Con varios procesos sobre los mismos archivos se pasa `bloqueo`, un lock entre
+    procesos que se toma antes del lock interno en cada reconstrucción. Mientras se
+    tiene nadie más escribe los archivos, así que la huella se toma al terminar de
+    construir (la construcción misma puede haberlos escrito).
+    """
+
+    def __init__(self, construir, rutas, bloqueo=None):
+        self._construir = construir
+        self._rutas = list(rutas)
+        self._bloqueo = bloqueo if bloqueo is not None else contextlib.nullcontext()
+        self._entre_procesos = bloqueo is not None
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._version = 0
+        self._al_publicar = []
+
+    def al_publicar(self, funcion):
+        """Registra `funcion(snapshot)` para preparar derivados de cada versión nueva antes de servirla."""
+        self._al_publicar.append(funcion)
+        return funcion
+
+    def huella(self):
+        return tuple(firma_archivo(ruta) for ruta in self._rutas)
+
+    def obtener(self) -> SnapshotDatos:
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.huella == self.huella():
+            return snapshot
+
+        with self._bloqueo, self._lock:
+            # Otra petición (u otro proceso) pudo reconstruir mientras esperábamos el lock
+            huella = self.huella()
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.huella == huella:
+                return snapshot
+            return self._reconstruir(huella)
+
+    def vigente(self):
+        """Último snapshot publicado (o None), sin revisar los archivos fuente."""
+        return self._snapshot
+
+    def recargar(self) -> SnapshotDatos:
+        """Reconstruye y publica un snapshot nuevo aunque la huella no haya cambiado."""
+        with self._bloqueo, self._lock:
+            return self._reconstruir(self.huella())
+
+    def aplicar(self, transformar) -> SnapshotDatos:
+        """
+        Publica un snapshot derivado del vigente sin reprocesar todo.
+
+        `transformar` recibe el DataFrame vigente (ya al día con los archivos fuente),
+        puede modificar esos archivos y devuelve el DataFrame nuevo.
+        """
+        with self._bloqueo, self._lock:
+            huella = self.huella()
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.huella != huella:
+                snapshot = self._reconstruir(huella)
+            df = transformar(snapshot.df)
+            return self._publicar(df, self.huella())
+
+    def invalidar(self):
+        with self._lock:
+            self._snapshot = None
+
+    def _reconstruir(self, huella) -> SnapshotDatos:
+        df = self._construir()
+        if self._entre_procesos:
+            huella = self.huella()
+        return self._publicar(df, huella)
+
+    def _publicar(self, df, huella) -> SnapshotDatos:
+        self._version += 1
+        snapshot = SnapshotDatos(df=df, version=self._version, huella=huella, creado=time.time())
+        for funcion in self._al_publicar:
+            funcion(snapshot)
+        # La asignación de la referencia es atómica: los lectores ven el snapshot viejo o el nuevo
+        self._snapshot = snapshot
+        return snapshot
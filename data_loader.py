@@ -1,9 +1,27 @@
 # data_loader.py
+import json
+import os
+
 import pandas as pd
-import streamlit as st
 
-@st.cache_data
+from cache_datos import memoizar_por_archivo, firma_archivo
+from metricas import cronometrar
+from puntajes import TablaPuntajes, compilar_entradas
+
+# Esquema del formulario de Gravity Forms (GET /forms/{id}): relaciona preguntas con ids de campo
+ARCHIVO_FORMULARIO = "formulario.json"
+# Diccionario ya compilado por campo y con respuestas normalizadas
+ARCHIVO_COMPILADO = "diccionario_compilado.json"
+# Se incrementa cuando cambia el formato o la normalización; invalida los compilados anteriores
+VERSION_COMPILADO = "1"
+
+@cronometrar("diccionario")
 def cargar_diccionario(path="diccionario.csv"):
+    """Diccionario de respuestas y puntajes; se vuelve a leer solo si el archivo cambia."""
+    return _leer_diccionario(path)
+
+@memoizar_por_archivo
+def _leer_diccionario(path):
     df_dic = pd.read_csv(path)
     mapa = {}
     for _, row in df_dic.iterrows():
@@ -15,3 +33,50 @@ def cargar_diccionario(path="diccionario.csv"):
             mapa[pregunta] = {}
         mapa[pregunta][respuesta] = {"puntaje": puntaje, "segmento": segmento}
     return mapa
+
+def leer_formulario(path=ARCHIVO_FORMULARIO):
+    """Esquema guardado del formulario o None si todavía no se descargó."""
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def guardar_formulario(formulario, path=ARCHIVO_FORMULARIO):
+    """Guarda el esquema solo si cambió: reescribirlo igual forzaría a re-puntuar todo."""
+    if formulario == leer_formulario(path):
+        return False
+    temporal = f"{path}.tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(formulario, f, ensure_ascii=False)
+    os.replace(temporal, path)
+    return True
+
+@cronometrar("tabla_puntajes")
+def cargar_tabla_puntajes(path="diccionario.csv", path_formulario=ARCHIVO_FORMULARIO,
+                          path_compilado=ARCHIVO_COMPILADO):
+    """
+    TablaPuntajes lista para puntuar. Se compila una vez por versión del diccionario y
+    del esquema, se guarda en disco y los demás procesos (o el próximo arranque) la leen
+    de ahí en lugar de recompilar.
+    """
+    return _tabla_puntajes(path, path_formulario, path_compilado, firma_archivo(path_formulario))
+
+@memoizar_por_archivo
+def _tabla_puntajes(path, path_formulario, path_compilado, firma_formulario):
+    origen = json.loads(json.dumps([firma_archivo(path), firma_formulario]))
+    compilado = _leer_compilado(path_compilado)
+    if compilado is None or compilado.get("origen") != origen or compilado.get("version") != VERSION_COMPILADO:
+        compilado = compilar_entradas(_leer_diccionario(path), leer_formulario(path_formulario))
+        compilado.update(version=VERSION_COMPILADO, origen=origen)
+        temporal = f"{path_compilado}.tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(compilado, f, ensure_ascii=False, indent=1)
+        os.replace(temporal, path_compilado)
+    return TablaPuntajes(compilado["entradas"])
+
+def _leer_compilado(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
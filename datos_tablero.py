@@ -0,0 +1,94 @@
+# datos_tablero.py
+"""
+Carga → puntaje → indicadores → gráficos de los dashboards de Streamlit (main.py y
+utils.py), con cache. Streamlit vuelve a correr el script en cada interacción: con estas
+funciones solo se recalcula algo cuando cambia alguno de los archivos de los que sale
+(su firma es parte de la clave), y el TTL acota cuánto vive cada entrada.
+
+El DataFrame y las figuras se comparten entre sesiones (cache_resource) sin copiarse:
+son de solo lectura. Lo chico (indicadores, búsquedas) va en cache_data.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from almacenamiento import ARCHIVO_CRUDO, ARCHIVO_CSV, leer_crudo
+from cache_datos import firma_archivo
+from data_loader import ARCHIVO_FORMULARIO, cargar_tabla_puntajes
+from funciones import segmento_trl
+from puntajes import SEGMENTOS, UMBRAL_APROBACION, puntajes_base
+from visualizaciones import graficos_generales
+
+ARCHIVO_DICCIONARIO = "diccionario.csv"
+
+# Vida máxima de cada entrada de la cache, aunque los archivos no cambien
+TTL = int(os.getenv("STREAMLIT_TTL_MINUTOS", "30")) * 60
+
+
+def huella_datos(ruta_diccionario=ARCHIVO_DICCIONARIO):
+    """
+    Versión de los datos del tablero: la firma de cada archivo del que salen. El CSV
+    cuenta mientras no exista el Parquet (leer_crudo lo migra la primera vez).
+    """
+    return (
+        firma_archivo(ARCHIVO_CRUDO) or firma_archivo(ARCHIVO_CSV),
+        firma_archivo(ruta_diccionario),
+        firma_archivo(ARCHIVO_FORMULARIO),
+    )
+
+
+@st.cache_resource(ttl=TTL, max_entries=2, show_spinner="Procesando formularios...")
+def datos_procesados(ruta_diccionario, huella):
+    """
+    Entradas crudas (las mismas que guarda y sincroniza la API) puntuadas con el
+    diccionario compilado. No modificar: se comparte.
+    """
+    df = leer_crudo()
+    # Se puntúan solo las columnas del formulario, antes de agregar las derivadas
+    puntajes = puntajes_base(df, cargar_tabla_puntajes(ruta_diccionario))
+
+    df["Nombre del Proyecto"] = df["1"]
+    df["Nivel TRL"] = pd.to_numeric(df["14"], errors="coerce")
+    for i, segmento in enumerate(SEGMENTOS):
+        df[f"Puntaje {segmento}"] = puntajes[:, i]
+    df["Aprobado"] = np.where((puntajes >= UMBRAL_APROBACION).any(axis=1), "Sí", "No")
+    df["Segmento TRL"] = df["Nivel TRL"].apply(segmento_trl)
+
+    if "15" in df.columns:
+        df["15"] = df["15"].astype(str)
+        df["Docente Acompañante"] = df["15"].str.strip().str.upper() == "SI"
+    if "17" in df.columns:
+        df["Nivel de Inglés"] = df["17"].astype(str).fillna("No especificado").str.strip().str.capitalize()
+    return df
+
+
+@st.cache_data(ttl=TTL, max_entries=4, show_spinner=False)
+def indicadores(_df, huella):
+    """KPIs de los tableros (`huella` es la clave: el DataFrame no se hashea)."""
+    docente_si = int(_df["Docente Acompañante"].sum()) if "Docente Acompañante" in _df.columns else 0
+    if "Nivel de Inglés" in _df.columns:
+        con_ingles = int((~_df["Nivel de Inglés"].isin(["Básico", "No especificado"])).sum())
+    else:
+        con_ingles = 0
+    return {
+        "formularios": len(_df),
+        "trl_max": _df["Nivel TRL"].max(),
+        "aprobados": int((_df["Aprobado"] == "Sí").sum()),
+        "docente_si": docente_si,
+        "docente_no": len(_df) - docente_si,
+        "con_ingles": con_ingles,
+    }
+
+
+@st.cache_resource(ttl=TTL, max_entries=4, show_spinner="Generando gráficos...")
+def figuras(_df, huella, columna_industria, columna_ingles, columna_ubicacion):
+    """Los siete gráficos de una versión de los datos. Las figuras se comparten: no modificarlas."""
+    return graficos_generales(_df, columna_industria, columna_ingles, columna_ubicacion)
+
+
+@st.cache_data(ttl=TTL, max_entries=100, show_spinner=False)
+def buscar_proyectos(_df, huella, texto):
+    """Filas cuyo nombre contiene `texto` (sin distinguir mayúsculas)."""
+    return _df[_df["Nombre del Proyecto"].str.lower().str.contains(texto.lower(), na=False)]
@@ -0,0 +1,62 @@
+# ejecucion.py
+import asyncio
+import functools
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import anyio
+import anyio.to_thread
+
+from metricas import perfilar
+
+# Hilos simultáneos por tipo de trabajo. Cada tipo tiene su propio cupo, así un
+# reporte pesado no puede ocupar los hilos que necesitan las consultas baratas.
+LIMITES = {
+    "consultas": int(os.getenv("HILOS_CONSULTAS", "8")),
+    "graficos": int(os.getenv("HILOS_GRAFICOS", "2")),
+    "reportes": int(os.getenv("HILOS_REPORTES", "2")),
+}
+
+# Procesos para el trabajo de CPU en Python puro (p. ej. openpyxl), que en un hilo
+# retendría el GIL y frenaría a todas las demás peticiones
+PROCESOS = int(os.getenv("PROCESOS_REPORTES", "2"))
+
+_limitadores = {}
+_procesos = None
+
+
+def limitador(tipo):
+    # Se crean al primer uso: CapacityLimiter necesita un event loop en marcha
+    if tipo not in _limitadores:
+        _limitadores[tipo] = anyio.CapacityLimiter(LIMITES[tipo])
+    return _limitadores[tipo]
+
+
+async def ejecutar(tipo, funcion, *args, **kwargs):
+    """Corre `funcion` en un hilo, respetando el cupo de `tipo`, sin bloquear el event loop."""
+    return await anyio.to_thread.run_sync(
+        functools.partial(perfilar(funcion), *args, **kwargs), limiter=limitador(tipo)
+    )
+
+
+def pool_procesos():
+    global _procesos
+    if _procesos is None:
+        # spawn: hacer fork de un servidor con hilos puede heredar locks tomados
+        _procesos = ProcessPoolExecutor(max_workers=PROCESOS, mp_context=multiprocessing.get_context("spawn"))
+    return _procesos
+
+
+async def ejecutar_en_proceso(tipo, funcion, *args):
+    """Corre `funcion` en el pool de procesos, respetando el cupo de `tipo`. Debe ser importable y sus datos serializables."""
+    async with limitador(tipo):
+        return await asyncio.wrap_future(pool_procesos().submit(funcion, *args))
+
+
+async def iterar_en_hilo(tipo, iterable):
+    """Versión asíncrona de un generador síncrono: cada paso corre en un hilo del cupo de `tipo`."""
+    iterador = iter(iterable)
+    fin = object()
+    while (trozo := await ejecutar(tipo, next, iterador, fin)) is not fin:
+        yield trozo
@@ -1,8 +1,10 @@
 import React, { useState } from "react";
 import {
+  LIMITE_BUSQUEDA,
   buscarProyecto,
   descargarReporteAprobados,
   descargarReporteTop10,
+  descargarReportesProyectos,
 } from "../services/api";
 import ProjectDetailModal from "./ProjectDetailModal";
 import { FiSearch, FiDownload } from "react-icons/fi";
@@ -19,27 +21,38 @@ const ProjectSearch: React.FC<ProjectSearchProps> = ({ password }) => {
   const [searchTerm, setSearchTerm] = useState("");
   const [searchResults, setSearchResults] = useState<ProjectData[]>([]);
   const [isSearching, setIsSearching] = useState(false);
+  // Término de la última búsqueda, total de coincidencias y primera fila de la página mostrada
+  const [searchedTerm, setSearchedTerm] = useState("");
+  const [total, setTotal] = useState(0);
+  const [offset, setOffset] = useState(0);
   const [selectedProject, setSelectedProject] = useState<ProjectData | null>(
     null
   );
   const [isModalOpen, setIsModalOpen] = useState(false);
 
-  const handleSearch = async (e?: React.FormEvent) => {
-    if (e) e.preventDefault();
-    if (!searchTerm.trim()) return;
-
+  const loadPage = async (term: string, newOffset: number) => {
     setIsSearching(true);
     try {
-      const results = await buscarProyecto(searchTerm, password);
-      setSearchResults(results || []);
+      const pagina = await buscarProyecto(term, password, newOffset);
+      setSearchResults(pagina.proyectos || []);
+      setTotal(pagina.total || 0);
+      setOffset(newOffset);
+      setSearchedTerm(term);
     } catch (error) {
       console.error("Error searching:", error);
       setSearchResults([]);
+      setTotal(0);
     } finally {
       setIsSearching(false);
     }
   };
 
+  const handleSearch = async (e?: React.FormEvent) => {
+    if (e) e.preventDefault();
+    if (!searchTerm.trim()) return;
+    await loadPage(searchTerm, 0);
+  };
+
   const handleViewDetails = (project: ProjectData) => {
     setSelectedProject(project);
     setIsModalOpen(true);
@@ -66,6 +79,13 @@ const ProjectSearch: React.FC<ProjectSearchProps> = ({ password }) => {
             <FiDownload />
             Descargar PDF Top 10
           </button>
+          <button
+            onClick={() => descargarReportesProyectos(password)}
+            className="inline-flex items-center justify-center gap-2 px-4 py-2 bg-violet-600 hover:bg-violet-700 text-white rounded-md text-lg transition"
+          >
+            <FiDownload />
+            Descargar Reportes Aprobados (ZIP)
+          </button>
         </div>
       </section>
 
@@ -137,6 +157,30 @@ const ProjectSearch: React.FC<ProjectSearchProps> = ({ password }) => {
               ))}
             </tbody>
           </table>
+          <div className="flex items-center justify-between px-6 py-3 border-t border-gray-200 text-base text-gray-600">
+            <span>
+              Mostrando {offset + 1}–{offset + searchResults.length} de {total}{" "}
+              {total === 1 ? "proyecto" : "proyectos"}
+            </span>
+            {total > LIMITE_BUSQUEDA && (
+              <div className="flex gap-2">
+                <button
+                  onClick={() => loadPage(searchedTerm, Math.max(0, offset - LIMITE_BUSQUEDA))}
+                  disabled={isSearching || offset === 0}
+                  className="px-3 py-1 bg-gray-100 rounded hover:bg-gray-200 disabled:opacity-50"
+                >
+                  Anterior
+                </button>
+                <button
+                  onClick={() => loadPage(searchedTerm, offset + LIMITE_BUSQUEDA)}
+                  disabled={isSearching || offset + searchResults.length >= total}
+                  className="px-3 py-1 bg-gray-100 rounded hover:bg-gray-200 disabled:opacity-50"
+                >
+                  Siguiente
+                </button>
+              </div>
+            )}
+          </div>
         </div>
       )}
 
@@ -61,22 +61,40 @@ export const actualizarDatos = async (password: string) => {
       Authorization: `Basic ${btoa(`multimediafalab:${limpia}`)}`,
     };
 
+    // El backend encola la sincronización y devuelve un trabajo; se consulta hasta que termine
     const response = await axios.post(
       `${apiUrl}/actualizar-datos`,
       {},
       { headers }
     );
-    return response.data;
+    let trabajo = response.data;
+    while (trabajo.estado === "pendiente" || trabajo.estado === "en_curso") {
+      await new Promise((resolve) => setTimeout(resolve, 1000));
+      const estado = await axios.get(`${apiUrl}/actualizar-datos/${trabajo.id}`, {
+        headers,
+      });
+      trabajo = estado.data;
+    }
+    if (trabajo.estado === "error") {
+      throw new Error(trabajo.error);
+    }
+    return trabajo;
   } catch (error) {
     console.error("Error al actualizar los datos:", error);
     throw error;
   }
 };
 
-export const obtenerProyectos = async (password: string) => {
+// Sin parámetros trae todos los proyectos; con { limite, offset, orden, campos, ... } pagina en el servidor
+export const obtenerProyectos = async (
+  password: string,
+  params: Record<string, string | number | string[]> = {}
+) => {
   try {
     const limpia = limpiarContraseña(password);
     const response = await axios.get(`${apiUrl}/proyectos`, {
+      params,
+      paramsSerializer: { indexes: null },
       headers: {
         Authorization: `Basic ${btoa(`multimediafalab:${limpia}`)}`,
       },
@@ -88,22 +106,37 @@ export const obtenerProyectos = async (password: string) => {
   }
 };
 
-export const buscarProyecto = async (nombre: string, password: string) => {
+export interface PaginaBusqueda {
+  proyectos: any[];
+  total: number;
+  offset: number;
+  limite: number;
+}
+
+// Resultados por página de /buscar-proyecto (el backend devuelve como máximo 500)
+export const LIMITE_BUSQUEDA = 50;
+
+export const buscarProyecto = async (
+  nombre: string,
+  password: string,
+  offset = 0,
+  limite = LIMITE_BUSQUEDA
+): Promise<PaginaBusqueda> => {
   try {
     const limpia = limpiarContraseña(password);
     const response = await axios.post(
       `${apiUrl}/buscar-proyecto`,
-      { nombre },
+      { nombre, offset, limite },
       {
         headers: {
           Authorization: `Basic ${btoa(`multimediafalab:${limpia}`)}`,
         },
       }
     );
-    return response.data.proyectos;
+    return response.data;
   } catch (error) {
     console.error("Error al buscar el proyecto:", error);
-    return [];
+    return { proyectos: [], total: 0, offset, limite };
   }
 };
 
@@ -178,3 +211,22 @@ export const descargarReporteTop10 = async (
     alert("No se pudo generar el reporte Top10.");
   }
 };
+
+export const descargarReportesProyectos = async (
+  password: string
+): Promise<void> => {
+  try {
+    const limpia = limpiarContraseña(password);
+    const auth = btoa(`multimediafalab:${limpia}`);
+    // ZIP con el reporte HTML de cada proyecto aprobado y un índice
+    const url = `http://localhost:8000/reportes-proyectos.zip?auth=${encodeURIComponent(auth)}`;
+
+    const win = window.open(url, "_blank");
+    if (!win) {
+      alert("Permite las ventanas emergentes para descargar los reportes.");
+    }
+  } catch (error) {
+    console.error("Error generando los reportes de proyectos:", error);
+    alert("No se pudieron generar los reportes de proyectos.");
+  }
+};
@@ -1,71 +1,140 @@
 # funciones.py
 import pandas as pd
+import csv
 import io
+import json
+import os
 import re
+import tempfile
 from typing import Optional
 from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-
-def generar_excel_aprobados(df: pd.DataFrame) -> io.BytesIO:
-    columnas = [
-        "Nombre del Proyecto", "Aprobado", "Nivel TRL", "Segmento TRL", "Docente Acompañante",
-        "Ubicación", "Nivel de Inglés", "Puntaje TRL 1-3", "Puntaje TRL 4-7", "Puntaje TRL 8-9",
-        "Puntaje Total", "Insights"
-    ]
-
-    # Asegurar que todas las columnas existan
-    for col in columnas:
-        if col not in df.columns:
-            df[col] = ""
-
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Proyectos Aprobados"
-
-    # Estilos
-    header_fill = PatternFill(start_color="6D28D9", end_color="6D28D9", fill_type="solid")
-    header_font = Font(color="FFFFFF", bold=True)
-    center_alignment = Alignment(horizontal="center", vertical="center", wrap_text=False)
-    border_style = Border(
-        left=Side(style="thin"),
-        right=Side(style="thin"),
-        top=Side(style="thin"),
-        bottom=Side(style="thin"),
-    )
-
-    # Escribir encabezados
-    for col_num, col_name in enumerate(columnas, 1):
-        cell = ws.cell(row=1, column=col_num, value=col_name)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = center_alignment
-        cell.border = border_style
-
-    # Escribir datos
-    for row_num, row_data in enumerate(df[columnas].values.tolist(), 2):
-        for col_num, value in enumerate(row_data, 1):
-            # Convertir listas a string plano
-            if isinstance(value, list):
-                value = ", ".join(str(v) for v in value)
-            elif isinstance(value, (dict, tuple)):
-                value = str(value)
-
-            cell = ws.cell(row=row_num, column=col_num, value=value)
-            cell.alignment = Alignment(wrap_text=False)
-            cell.border = border_style
-
-    # (Opcional) Ancho fijo por columna
-    for col_letter in ws.iter_cols(min_row=1, max_row=1):
-        letra = col_letter[0].column_letter
-        ws.column_dimensions[letra].width = 25  # puedes ajustar a tu gusto
-
-    return _guardar_excel(wb)
-
-def _guardar_excel(workbook: Workbook) -> io.BytesIO:
-    output = io.BytesIO()
-    workbook.save(output)
-    output.seek(0)
-    return output
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment, PatternFill, Border, Side, NamedStyle
+from openpyxl.utils import get_column_letter
+from almacenamiento import leer_procesado
+from insights import bloques_con_insights
+from metricas import cronometrar
+
+COLUMNAS_APROBADOS = [
+    "Nombre del Proyecto", "Aprobado", "Nivel TRL", "Segmento TRL", "Docente Acompañante",
+    "Ubicación", "Nivel de Inglés", "Puntaje TRL 1-3", "Puntaje TRL 4-7", "Puntaje TRL 8-9",
+    "Puntaje Total", "Insights"
+]
+
+# Tamaño de los trozos en que se envía un archivo al cliente
+TAMANO_TROZO = 64 * 1024
+
+def _filas_reporte(bloques):
+    """Filas del reporte (listas en el orden de COLUMNAS_APROBADOS) a partir de bloques de DataFrame."""
+    for bloque in bloques:
+        # Asegurar que todas las columnas existan
+        bloque = bloque.reindex(columns=COLUMNAS_APROBADOS, fill_value="")
+        for fila in bloque.astype(object).where(bloque.notna(), None).values.tolist():
+            yield fila
+
+def _valor_plano(value):
+    # Convertir listas a string plano
+    if isinstance(value, list):
+        return ", ".join(str(v) for v in value)
+    if isinstance(value, (dict, tuple)):
+        return str(value)
+    return value
+
+def _estilos_excel(wb: Workbook):
+    borde = Side(style="thin")
+    border_style = Border(left=borde, right=borde, top=borde, bottom=borde)
+
+    encabezado = NamedStyle(name="encabezado")
+    encabezado.fill = PatternFill(start_color="6D28D9", end_color="6D28D9", fill_type="solid")
+    encabezado.font = Font(color="FFFFFF", bold=True)
+    encabezado.alignment = Alignment(horizontal="center", vertical="center", wrap_text=False)
+    encabezado.border = border_style
+
+    celda = NamedStyle(name="celda")
+    celda.alignment = Alignment(wrap_text=False)
+    celda.border = border_style
+
+    # Un solo estilo con nombre por tipo de celda, en vez de objetos de estilo por celda
+    wb.add_named_style(encabezado)
+    wb.add_named_style(celda)
+
+@cronometrar("excel_aprobados")
+def escribir_excel_aprobados(bloques, destino):
+    """
+    Escribe el reporte de aprobados en `destino` (ruta o archivo) en modo write-only:
+    las filas se vuelcan a disco a medida que se generan, así que la memoria no crece
+    con la cantidad de proyectos.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Proyectos Aprobados")
+    _estilos_excel(wb)
+
+    # Ancho fijo por columna (en write-only debe definirse antes de escribir filas)
+    for col_num in range(1, len(COLUMNAS_APROBADOS) + 1):
+        ws.column_dimensions[get_column_letter(col_num)].width = 25
+
+    def fila_con_estilo(valores, estilo):
+        celdas = []
+        for value in valores:
+            cell = WriteOnlyCell(ws, value=_valor_plano(value))
+            cell.style = estilo
+            celdas.append(cell)
+        return celdas
+
+    ws.append(fila_con_estilo(COLUMNAS_APROBADOS, "encabezado"))
+    for fila in _filas_reporte(bloques):
+        ws.append(fila_con_estilo(fila, "celda"))
+
+    wb.save(destino)
+
+def exportar_excel_aprobados():
+    """
+    Escribe el .xlsx de aprobados en un archivo temporal y devuelve su ruta. Lee el
+    snapshot procesado de disco para poder correr en otro proceso sin recibir el DataFrame.
+    """
+    df = leer_procesado()
+    aprobados = df[df["Aprobado"] == "Sí"]
+    with tempfile.NamedTemporaryFile(suffix=".xlsx", delete=False) as temporal:
+        escribir_excel_aprobados(bloques_con_insights(aprobados), temporal)
+    return temporal.name
+
+def iterar_archivo(ruta):
+    """Entrega un archivo en trozos y lo borra al terminar (también si el cliente corta la descarga)."""
+    try:
+        with open(ruta, "rb") as f:
+            while trozo := f.read(TAMANO_TROZO):
+                yield trozo
+    finally:
+        os.remove(ruta)
+
+def iterar_csv_aprobados(bloques):
+    """Reporte de aprobados como CSV, un trozo por bloque de filas."""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    # BOM para que Excel abra bien las tildes
+    buffer.write("\ufeff")
+    escritor.writerow(COLUMNAS_APROBADOS)
+    for fila in _filas_reporte(bloques):
+        escritor.writerow([_valor_plano(value) for value in fila])
+        if buffer.tell() >= TAMANO_TROZO:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+def iterar_ndjson_aprobados(bloques):
+    """Reporte de aprobados como NDJSON: un objeto por proyecto, con los insights como lista."""
+    lineas = []
+    tamano = 0
+    for fila in _filas_reporte(bloques):
+        linea = json.dumps(dict(zip(COLUMNAS_APROBADOS, fila)), ensure_ascii=False) + "\n"
+        lineas.append(linea)
+        tamano += len(linea)
+        if tamano >= TAMANO_TROZO:
+            yield "".join(lineas).encode("utf-8")
+            lineas, tamano = [], 0
+    if lineas:
+        yield "".join(lineas).encode("utf-8")
 
 def normalizar_contraseña(password: str) -> str:
     """
@@ -95,147 +164,3 @@ def segmento_trl(nivel):
     elif 8 <= nivel <= 9:
         return "TRL 8-9"
     return "Desconocido"
-
-def calcular_puntajes_por_segmento(fila, diccionario):
-    puntajes = {"TRL 1-3": 0, "TRL 4-7": 0, "TRL 8-9": 0}
-    for pregunta, respuestas_map in diccionario.items():
-        for columna, respuesta_usuario in fila.items():
-            if respuesta_usuario in respuestas_map:
-                datos = respuestas_map[respuesta_usuario]
-                puntajes[datos["segmento"]] += datos["puntaje"]
-    return puntajes
-
-def analizar_madurez(proyecto, segmento):
-    """Analiza el nivel de madurez del proyecto basado en múltiples factores."""
-    trl = proyecto["Nivel TRL"]
-    docente = proyecto["Docente Acompañante"]
-    puntajes = {
-        "TRL 1-3": proyecto["Puntaje TRL 1-3"],
-        "TRL 4-7": proyecto["Puntaje TRL 4-7"],
-        "TRL 8-9": proyecto["Puntaje TRL 8-9"]
-    }
-    
-    if segmento == "TRL 1-3":
-        if puntajes["TRL 1-3"] >= 40:
-            return "Investigación sólida: Buen fundamento teórico y validación inicial"
-        else:
-            return "Etapa conceptual: Necesita más desarrollo teórico y validación"
-    
-    elif segmento == "TRL 4-7":
-        if puntajes["TRL 4-7"] >= 50:
-            return "Prototipo funcional: Validación técnica en progreso"
-        else:
-            return "Prototipo inicial: Requiere más desarrollo técnico"
-    
-    else:  # TRL 8-9
-        if puntajes["TRL 8-9"] >= 60:
-            return "Listo para implementación: Alta preparación para el mercado"
-        else:
-            return "Casi listo: Necesita ajustes finales para implementación"
-
-def identificar_fortalezas(proyecto):
-    """Identifica las principales fortalezas del proyecto."""
-    fortalezas = []
-    
-    # Fortalezas por puntajes
-    if proyecto["Puntaje TRL 1-3"] >= 40:
-        fortalezas.append("✅ Innovación bien fundamentada con investigación sólida")
-    if proyecto["Puntaje TRL 4-7"] >= 50:
-        fortalezas.append("✅ Desarrollo técnico avanzado y validado")
-    if proyecto["Puntaje TRL 8-9"] >= 50:
-        fortalezas.append("✅ Alto potencial de implementación y escalabilidad")
-    
-    # Otras fortalezas
-    if proyecto["Docente Acompañante"]:
-        fortalezas.append("✅ Excelente acompañamiento académico")
-    if proyecto.get("Nivel de Inglés", "") in ["Avanzado", "Intermedio"]:
-        fortalezas.append("✅ Buena capacidad para documentación internacional")
-    
-    return fortalezas
-
-def identificar_debilidades(proyecto):
-    """Identifica las principales debilidades del proyecto."""
-    debilidades = []
-    
-    # Debilidades por puntajes
-    if proyecto["Puntaje TRL 1-3"] < 30:
-        debilidades.append("⚠️ Fundamentación teórica débil - necesita más investigación")
-    if proyecto["Puntaje TRL 4-7"] < 40:
-        debilidades.append("⚠️ Desarrollo técnico insuficiente - requiere más validación")
-    if proyecto["Puntaje TRL 8-9"] < 40:
-        debilidades.append("⚠️ Preparación para el mercado limitada - necesita más desarrollo")
-    
-    # Otras debilidades
-    if not proyecto["Docente Acompañante"]:
-        debilidades.append("⚠️ Falta acompañamiento docente - recomendar mentoría")
-    if proyecto.get("Nivel de Inglés", "") == "Básico":
-        debilidades.append("⚠️ Limitaciones en inglés - afecta potencial internacional")
-    
-    return debilidades
-
-def generar_recomendaciones(proyecto):
-    """Genera recomendaciones personalizadas para el proyecto."""
-    recomendaciones = []
-    segmento = segmento_trl(proyecto["Nivel TRL"])
-    
-    # Recomendaciones por segmento TRL
-    if segmento == "TRL 1-3":
-        recomendaciones.append("Priorizar investigación y validación conceptual")
-        if proyecto["Puntaje TRL 1-3"] < 30:
-            recomendaciones.append("Realizar más investigación de mercado y técnica")
-    elif segmento == "TRL 4-7":
-        recomendaciones.append("Enfocarse en desarrollo técnico y pruebas")
-        if proyecto["Puntaje TRL 4-7"] < 40:
-            recomendaciones.append("Realizar pruebas técnicas más rigurosas")
-    else:
-        recomendaciones.append("Preparar estrategia de implementación y comercialización")
-        if proyecto["Puntaje TRL 8-9"] < 50:
-            recomendaciones.append("Realizar pruebas piloto con usuarios finales")
-    
-    # Recomendaciones específicas
-    if not proyecto["Docente Acompañante"]:
-        recomendaciones.append("Buscar mentoría docente para fortalecer el proyecto")
-    if proyecto.get("Nivel de Inglés", "") == "Básico":
-        recomendaciones.append("Mejorar documentación en inglés para mayor impacto")
-    
-    return recomendaciones
-
-def evaluar_potencial(proyecto):
-    """Evalúa el potencial general del proyecto."""
-    puntaje_total = sum([
-        proyecto["Puntaje TRL 1-3"],
-        proyecto["Puntaje TRL 4-7"],
-        proyecto["Puntaje TRL 8-9"]
-    ])
-    
-    if puntaje_total >= 120:
-        return "🌟 Excelente potencial: Proyecto bien desarrollado en todas las áreas"
-    elif puntaje_total >= 80:
-        return "✨ Buen potencial: Proyecto sólido con algunas áreas para mejorar"
-    elif puntaje_total >= 50:
-        return "💡 Potencial moderado: Necesita trabajo en varias áreas"
-    else:
-        return "🔍 Potencial limitado: Requiere desarrollo significativo"
-
- # Modificar la función generar_insights para usar todas las columnas necesarias
-
-def generar_insights(proyecto, diccionario=None):
-    """Genera insights personalizados (versión unificada)"""
-    insights = []
-    
-    # Asegurar existencia de campos
-    proyecto["Industria"] = proyecto.get("Industria", "No especificada")
-    proyecto["Ubicación"] = proyecto.get("Ubicación", "No especificada")
-    
-    # Resto de la lógica igual que en main.py
-    segmento = segmento_trl(proyecto["Nivel TRL"])
-    insights.append(analizar_madurez(proyecto, segmento))
-    insights.extend(identificar_fortalezas(proyecto))
-    insights.extend(identificar_debilidades(proyecto))
-    insights.extend(generar_recomendaciones(proyecto))
-    insights.append(evaluar_potencial(proyecto))
-    
-    # Insight adicional de industria
-    insights.append(f"🏭 Sector: {proyecto['Industria']} - Considerar tendencias del mercado relacionadas")
-    
-    return insights
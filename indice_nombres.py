@@ -0,0 +1,161 @@
+# indice_nombres.py
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+# Similitud mínima (Jaccard de trigramas) para sugerir un nombre cuando no hay coincidencias exactas
+SIMILITUD_MINIMA = 0.3
+
+
+def normalizar_nombre(texto):
+    """Minúsculas, sin tildes y con los espacios colapsados: "  Árbol  Ñandú" -> "arbol nandu"."""
+    if not isinstance(texto, str):
+        return ""
+    sin_tildes = "".join(
+        c for c in unicodedata.normalize("NFKD", texto) if not unicodedata.combining(c)
+    )
+    return " ".join(sin_tildes.casefold().split())
+
+
+def trigramas(texto):
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+def _pares(normalizados, posiciones, vocabulario):
+    """Pares (código de trigrama, posición) de las filas indicadas; amplía el vocabulario."""
+    codigos, filas = [], []
+    for pos in posiciones:
+        for tri in trigramas(normalizados[pos]):
+            codigos.append(vocabulario.setdefault(tri, len(vocabulario)))
+            filas.append(pos)
+    return np.array(codigos, dtype=np.int32), np.array(filas, dtype=np.int32)
+
+
+class IndiceNombres:
+    """
+    Índice de nombres de proyecto por trigramas.
+
+    Las posiciones corresponden a las filas del DataFrame del que se construyó. Los
+    postings se guardan como dos arrays ordenados (código de trigrama, posición), de
+    modo que cada trigrama es un slice contiguo y las intersecciones se hacen en NumPy.
+    Es inmutable: `actualizado` devuelve un índice nuevo y deja intacto el anterior,
+    que puede seguir atendiendo las peticiones del snapshot viejo.
+    """
+
+    def __init__(self, nombres, normalizados=None, vocabulario=None, pares=None):
+        self.nombres = list(nombres)
+        self.normalizados = normalizados if normalizados is not None else [normalizar_nombre(n) for n in self.nombres]
+        self._vocabulario = vocabulario if vocabulario is not None else {}
+        if pares is None:
+            pares = _pares(self.normalizados, range(len(self.normalizados)), self._vocabulario)
+        codigos, posiciones = pares
+        orden = np.lexsort((posiciones, codigos))
+        self._posiciones = posiciones[orden]
+        # Los postings del trigrama c son _posiciones[_inicios[c]:_inicios[c + 1]]
+        self._inicios = np.searchsorted(codigos[orden], np.arange(len(self._vocabulario) + 1))
+        self._cantidad_trigramas = np.bincount(self._posiciones, minlength=len(self.nombres))
+
+    def __len__(self):
+        return len(self.nombres)
+
+    def _postings(self, tri):
+        codigo = self._vocabulario.get(tri)
+        if codigo is None:
+            return np.empty(0, dtype=np.int32)
+        return self._posiciones[self._inicios[codigo]:self._inicios[codigo + 1]]
+
+    def actualizado(self, nombres):
+        """Índice para una nueva lista de nombres, re-tokenizando solo las filas que cambiaron."""
+        nombres = list(nombres)
+        if len(nombres) < len(self.nombres):
+            return IndiceNombres(nombres)
+
+        normalizados = list(self.normalizados)
+        cambiadas = []
+        for pos, nombre in enumerate(nombres):
+            if pos >= len(self.nombres) or nombre != self.nombres[pos]:
+                normalizado = normalizar_nombre(nombre)
+                if pos < len(normalizados):
+                    if normalizado == normalizados[pos]:
+                        continue
+                    normalizados[pos] = normalizado
+                else:
+                    normalizados.append(normalizado)
+                cambiadas.append(pos)
+
+        vigentes = ~np.isin(self._posiciones, cambiadas)
+        codigos_actuales = np.repeat(np.arange(len(self._vocabulario), dtype=np.int32), np.diff(self._inicios))
+        vocabulario = dict(self._vocabulario)
+        codigos, posiciones = _pares(normalizados, cambiadas, vocabulario)
+        pares = (
+            np.concatenate([codigos_actuales[vigentes], codigos]),
+            np.concatenate([self._posiciones[vigentes], posiciones]),
+        )
+        return IndiceNombres(nombres, normalizados, vocabulario, pares)
+
+    def _candidatos(self, consulta):
+        """Posiciones cuyo nombre contiene la consulta (ya normalizada), en orden."""
+        if len(consulta) < 3:
+            return [pos for pos, nombre in enumerate(self.normalizados) if consulta in nombre]
+
+        listas = sorted((self._postings(tri) for tri in trigramas(consulta)), key=len)
+        candidatos = listas[0]
+        for lista in listas[1:]:
+            if len(candidatos) == 0:
+                break
+            candidatos = np.intersect1d(candidatos, lista, assume_unique=True)
+        # Compartir los trigramas no garantiza que aparezcan contiguos: se verifica
+        return [pos for pos in candidatos.tolist() if consulta in self.normalizados[pos]]
+
+    def _similares(self, consulta):
+        """Posiciones con suficientes trigramas en común, de más a menos parecidas."""
+        tris = trigramas(consulta)
+        if not tris:
+            return []
+        listas = [self._postings(tri) for tri in tris]
+        posiciones, compartidos = np.unique(np.concatenate(listas), return_counts=True)
+        tamanos = self._cantidad_trigramas[posiciones]
+        similitud = compartidos / (len(tris) + tamanos - compartidos)
+        elegidos = similitud >= SIMILITUD_MINIMA
+        orden = np.lexsort((posiciones[elegidos], -similitud[elegidos]))
+        return posiciones[elegidos][orden].tolist()
+
+    def buscar(self, consulta, difuso=True):
+        """
+        Posiciones que coinciden con la consulta, de la más a la menos relevante.
+
+        Coincide igual que un `contains` sin distinguir mayúsculas, ahora también sin
+        distinguir tildes. Se ordena por: nombre exacto, prefijo, inicio de palabra y
+        luego el resto, y en cada grupo por orden de aparición. Si no hay ninguna
+        coincidencia y `difuso` es True, devuelve nombres parecidos (errores de tipeo).
+        """
+        consulta = normalizar_nombre(consulta)
+        if not consulta:
+            return list(range(len(self.nombres)))
+
+        encontrados = self._candidatos(consulta)
+        if not encontrados:
+            return self._similares(consulta) if difuso else []
+
+        inicio_palabra = f" {consulta}"
+
+        def relevancia(pos):
+            nombre = self.normalizados[pos]
+            if nombre == consulta:
+                return 0
+            if nombre.startswith(consulta):
+                return 1
+            if inicio_palabra in nombre:
+                return 2
+            return 3
+
+        # sorted es estable: dentro de cada grupo se conserva el orden de aparición
+        return sorted(encontrados, key=relevancia)
+
+
+def indice_desde_serie(nombres: pd.Series, anterior=None):
+    """Construye el índice de una columna de nombres, reutilizando `anterior` si existe."""
+    if anterior is None:
+        return IndiceNombres(nombres.tolist())
+    return anterior.actualizado(nombres.tolist())
@@ -0,0 +1,180 @@
+# insights.py
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from metricas import cronometrar
+
+# Cantidad máxima de proyectos con insights en memoria (se descartan los menos usados)
+MAX_INSIGHTS_EN_CACHE = int(os.getenv("MAX_INSIGHTS_EN_CACHE", "20000"))
+
+# Filas por bloque al armar reportes: los insights se calculan bloque a bloque
+FILAS_POR_BLOQUE = 1000
+
+# Columnas de las que dependen los insights de un proyecto
+COLUMNAS_INSIGHTS = [
+    "Nivel TRL", "Puntaje TRL 1-3", "Puntaje TRL 4-7", "Puntaje TRL 8-9",
+    "Docente Acompañante", "Nivel de Inglés", "Industria",
+]
+
+
+class CacheLRU:
+    """Diccionario acotado y seguro entre hilos que descarta primero lo menos usado."""
+
+    def __init__(self, maximo):
+        self.maximo = maximo
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._datos)
+
+    def obtener(self, clave):
+        with self._lock:
+            if clave not in self._datos:
+                return None
+            self._datos.move_to_end(clave)
+            return self._datos[clave]
+
+    def guardar(self, clave, valor):
+        with self._lock:
+            self._datos[clave] = valor
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.maximo:
+                self._datos.popitem(last=False)
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+
+
+cache_insights = CacheLRU(MAX_INSIGHTS_EN_CACHE)
+
+
+def _columna(df, nombre, defecto):
+    if nombre in df.columns:
+        return df[nombre]
+    return pd.Series(defecto, index=df.index, dtype=object)
+
+
+def claves_insights(df: pd.DataFrame):
+    """Clave de cada proyecto: su id más la huella de todo lo que usan los insights."""
+    ids = df["id"] if "id" in df.columns else pd.Series(df.index, index=df.index)
+    columnas = [_columna(df, col, "") for col in COLUMNAS_INSIGHTS]
+    # str() también para NaN: dos NaN deben dar la misma clave
+    return list(zip(ids.astype(str), *(col.astype(str) for col in columnas)))
+
+
+@cronometrar("insights")
+def generar_insights_lote(df: pd.DataFrame):
+    """
+    Insights de cada fila: madurez, fortalezas, debilidades, recomendaciones, potencial
+    y sector. Cada regla se evalúa como máscara sobre todas las filas y las listas se
+    arman al final, en ese orden.
+    """
+    if df.empty:
+        return []
+
+    trl = df["Nivel TRL"].to_numpy()
+    p13 = df["Puntaje TRL 1-3"].to_numpy()
+    p47 = df["Puntaje TRL 4-7"].to_numpy()
+    p89 = df["Puntaje TRL 8-9"].to_numpy()
+    docente = df["Docente Acompañante"].astype(bool).to_numpy()
+    ingles = _columna(df, "Nivel de Inglés", "").to_numpy()
+    industria = _columna(df, "Industria", "No especificada").astype(str).to_numpy()
+
+    seg13 = (trl >= 1) & (trl <= 3)
+    seg47 = (trl >= 4) & (trl <= 7)
+    basico = ingles == "Básico"
+    total = p13 + p47 + p89
+
+    def regla(condicion, texto):
+        return np.where(condicion, texto, None)
+
+    reglas = [
+        # Madurez según el segmento TRL
+        np.select(
+            [seg13 & (p13 >= 40), seg13, seg47 & (p47 >= 50), seg47, p89 >= 60],
+            ["Investigación sólida: Buen fundamento teórico y validación inicial",
+             "Etapa conceptual: Necesita más desarrollo teórico y validación",
+             "Prototipo funcional: Validación técnica en progreso",
+             "Prototipo inicial: Requiere más desarrollo técnico",
+             "Listo para implementación: Alta preparación para el mercado"],
+            default="Casi listo: Necesita ajustes finales para implementación",
+        ).astype(object),
+        # Fortalezas
+        regla(p13 >= 40, "✅ Innovación bien fundamentada con investigación sólida"),
+        regla(p47 >= 50, "✅ Desarrollo técnico avanzado y validado"),
+        regla(p89 >= 50, "✅ Alto potencial de implementación y escalabilidad"),
+        regla(docente, "✅ Excelente acompañamiento académico"),
+        regla(np.isin(ingles, ["Avanzado", "Intermedio"]), "✅ Buena capacidad para documentación internacional"),
+        # Debilidades
+        regla(p13 < 30, "⚠️ Fundamentación teórica débil - necesita más investigación"),
+        regla(p47 < 40, "⚠️ Desarrollo técnico insuficiente - requiere más validación"),
+        regla(p89 < 40, "⚠️ Preparación para el mercado limitada - necesita más desarrollo"),
+        regla(~docente, "⚠️ Falta acompañamiento docente - recomendar mentoría"),
+        regla(basico, "⚠️ Limitaciones en inglés - afecta potencial internacional"),
+        # Recomendaciones
+        np.select(
+            [seg13, seg47],
+            ["Priorizar investigación y validación conceptual", "Enfocarse en desarrollo técnico y pruebas"],
+            default="Preparar estrategia de implementación y comercialización",
+        ).astype(object),
+        np.select(
+            [seg13 & (p13 < 30), seg47 & (p47 < 40), ~seg13 & ~seg47 & (p89 < 50)],
+            ["Realizar más investigación de mercado y técnica",
+             "Realizar pruebas técnicas más rigurosas",
+             "Realizar pruebas piloto con usuarios finales"],
+            default=None,
+        ),
+        regla(~docente, "Buscar mentoría docente para fortalecer el proyecto"),
+        regla(basico, "Mejorar documentación en inglés para mayor impacto"),
+        # Potencial según el puntaje total
+        np.select(
+            [total >= 120, total >= 80, total >= 50],
+            ["🌟 Excelente potencial: Proyecto bien desarrollado en todas las áreas",
+             "✨ Buen potencial: Proyecto sólido con algunas áreas para mejorar",
+             "💡 Potencial moderado: Necesita trabajo en varias áreas"],
+            default="🔍 Potencial limitado: Requiere desarrollo significativo",
+        ).astype(object),
+        # Insight de industria
+        np.char.add(np.char.add("🏭 Sector: ", industria.astype(str)),
+                    " - Considerar tendencias del mercado relacionadas").astype(object),
+    ]
+
+    return [[texto for texto in fila if texto is not None] for fila in zip(*reglas)]
+
+
+def obtener_insights(df: pd.DataFrame):
+    """
+    Insights de las filas de `df`, en orden. Se calculan la primera vez que se piden
+    (en lote para las que falten) y quedan en una cache LRU acotada.
+    """
+    claves = claves_insights(df)
+    resultado = [cache_insights.obtener(clave) for clave in claves]
+    faltantes = [i for i, valor in enumerate(resultado) if valor is None]
+    if faltantes:
+        nuevos = generar_insights_lote(df.iloc[faltantes])
+        for i, insights in zip(faltantes, nuevos):
+            resultado[i] = insights
+            cache_insights.guardar(claves[i], insights)
+    return resultado
+
+
+def con_insights(df: pd.DataFrame) -> pd.DataFrame:
+    """Copia de `df` con la columna Insights para las respuestas que la necesitan."""
+    return df.assign(Insights=obtener_insights(df))
+
+
+def insights_de_proyecto(proyecto: pd.Series):
+    """Insights de un solo proyecto (una fila del DataFrame procesado)."""
+    return obtener_insights(proyecto.to_frame().T)[0]
+
+
+def bloques_con_insights(df: pd.DataFrame, filas_por_bloque=FILAS_POR_BLOQUE):
+    """Recorre `df` en bloques, cada uno con su columna Insights."""
+    for inicio in range(0, len(df), filas_por_bloque):
+        yield con_insights(df.iloc[inicio:inicio + filas_por_bloque])
@@ -5,11 +5,11 @@ import pandas as pd
 
 from config import configurar_pagina
 from estilos import aplicar_estilos
-from auth import obtener_todas_las_entradas
-from funciones import segmento_trl, calcular_puntajes_por_segmento
-from data_loader import cargar_diccionario
+from auth import obtener_todas_las_entradas, ErrorGravityForms
 from kpis import mostrar_kpis
-from visualizaciones import graficos_generales, mostrar_en_pares
+from visualizaciones import mostrar_en_pares
+from almacenamiento import existe_crudo, guardar_crudo
+from datos_tablero import ARCHIVO_DICCIONARIO, huella_datos, datos_procesados, indicadores, figuras, buscar_proyectos
 from reporte import generar_html_reporte
 from streamlit.components.v1 import html, components
 from streamlit.components.v1 import html
@@ -26,108 +26,117 @@ st.subheader("📈 Visualizaciones")
 usuario = "multimediafalab"
 clave_app = st.text_input("🔐 Contraseña de aplicación WordPress", type="password")
 url_formulario = "https://fablab.ucontinental.edu.pe/wp-json/gf/v2/forms/9/entries"
-diccionario = cargar_diccionario("diccionario.csv")
 
 df = None
 
 if st.button("🔄 Actualizar datos desde Gravity Forms"):
     if clave_app:
         with st.spinner("Conectando con el servidor..."):
-            df = obtener_todas_las_entradas(usuario, clave_app, url_formulario)
-            if not df.empty:
-                df.to_csv("datos_formularios.csv", index=False)
-                st.success(f"✅ Se importaron {len(df)} registros y se guardaron en 'datos_formularios.csv'.")
+            try:
+                df = obtener_todas_las_entradas(usuario, clave_app, url_formulario)
+            except ErrorGravityForms as e:
+                st.error(f"❌ {e}")
             else:
-                st.warning("⚠️ No se encontraron entradas.")
+                if not df.empty:
+                    guardar_crudo(df)
+                    st.success(f"✅ Se importaron {len(df)} registros y se guardaron en los datos locales.")
+                else:
+                    st.warning("⚠️ No se encontraron entradas.")
     else:
         st.warning("Por favor, ingresa tu contraseña de aplicación.")
 
-if df is None and os.path.exists("datos_formularios.csv"):
-    df = pd.read_csv("datos_formularios.csv")
-    st.info("📁 Cargando datos desde archivo local 'datos_formularios.csv'")
+if df is None and existe_crudo():
+    st.info("📁 Cargando datos locales")
+
+# --- SECCIONES ---
+# Cada sección es un fragmento: sus widgets vuelven a correr solo esa sección, así que
+# buscar un proyecto o abrir un reporte no re-envía los KPIs ni los siete gráficos.
+MAX_REPORTES_EN_SESION = 20
+
+
+@st.fragment
+def seccion_kpis(df, huella):
+    kpis = indicadores(df, huella)
+    mostrar_kpis(kpis["formularios"], int(kpis["trl_max"]), kpis["aprobados"], kpis["docente_si"], kpis["docente_no"])
+
+
+@st.fragment
+def seccion_graficos(df, huella, columna_industria, columna_ingles, columna_ubicacion):
+    st.subheader("📊 Gráficos")
+    figs = figuras(df, huella, columna_industria, columna_ingles, columna_ubicacion)
+    mostrar_en_pares(*figs)
+
+
+def reporte_html(df_proyecto, nombre_seleccionado, huella):
+    """HTML del reporte, guardado en la sesión por proyecto y versión de los datos."""
+    reportes = st.session_state.setdefault("reportes_html", {})
+    clave = (nombre_seleccionado, huella)
+    if clave not in reportes:
+        puntajes = {
+            "TRL 1-3": df_proyecto["Puntaje TRL 1-3"].values[0],
+            "TRL 4-7": df_proyecto["Puntaje TRL 4-7"].values[0],
+            "TRL 8-9": df_proyecto["Puntaje TRL 8-9"].values[0],
+        }
+        aprobado = df_proyecto["Aprobado"].values[0]
+        if len(reportes) >= MAX_REPORTES_EN_SESION:
+            reportes.pop(next(iter(reportes)))
+        reportes[clave] = generar_html_reporte(nombre_seleccionado, puntajes, aprobado)
+    return reportes[clave]
+
+
+@st.fragment
+def seccion_busqueda(df, huella):
+    # En la sesión queda solo el texto buscado: el filtro sale de la cache con la versión vigente de los datos
+    busqueda = st.session_state.get("busqueda")
+
+    with st.form(key="buscar_proyecto_form"):
+        nombre_input = st.text_input("🔍 Escribe el nombre exacto del proyecto que deseas exportar",
+                                     value=busqueda["texto"] if busqueda else "")
+        buscar = st.form_submit_button("🔎 Buscar proyecto")
+        if buscar:
+            busqueda = st.session_state["busqueda"] = {"texto": nombre_input}
+
+    if busqueda is None:
+        return
+
+    df_filtrado = buscar_proyectos(df, huella, busqueda["texto"])
+    if df_filtrado.empty:
+        st.warning("⚠️ Proyecto no encontrado. Verifica el nombre.")
+        return
+
+    st.success(f"✅ Se encontraron {len(df_filtrado)} proyecto(s) que coinciden con: **{busqueda['texto']}**")
+
+    nombres_unicos = df_filtrado["Nombre del Proyecto"].unique().tolist()
+    nombre_seleccionado = nombres_unicos[0] if len(nombres_unicos) == 1 else st.radio(
+        "Selecciona el proyecto que deseas visualizar:",
+        options=nombres_unicos,
+        key="radio_proyecto"
+    )
+
+    df_proyecto = df_filtrado[df_filtrado["Nombre del Proyecto"] == nombre_seleccionado]
+
+    if st.button("📄 Ver reporte con botón de impresión"):
+        html(reporte_html(df_proyecto, nombre_seleccionado, huella), height=800, scrolling=True)
+
 
 # --- PROCESAMIENTO ---
-if df is not None and not df.empty:
-    df["Nombre del Proyecto"] = df["1"]
-    df["Nivel TRL"] = pd.to_numeric(df["14"], errors="coerce")
-    df["Puntaje TRL 1-3"] = 0.0
-    df["Puntaje TRL 4-7"] = 0.0
-    df["Puntaje TRL 8-9"] = 0.0
-    df["Aprobado"] = "No"
-
-    for idx, row in df.iterrows():
-        puntajes = calcular_puntajes_por_segmento(row, diccionario)
-        for segmento in puntajes:
-            df.loc[idx, f"Puntaje {segmento}"] = puntajes[segmento]
-        if any(p >= 50 for p in puntajes.values()):
-            df.loc[idx, "Aprobado"] = "Sí"
-
-    df["Segmento TRL"] = df["Nivel TRL"].apply(segmento_trl)
+# Con cache por versión de los archivos: las interacciones que no cambian los datos no re-puntúan
+if (df is None or not df.empty) and existe_crudo():
+    huella = huella_datos()
+    df = datos_procesados(ARCHIVO_DICCIONARIO, huella)
 
     # Columnas de interés
-    columna_docente = "15"
     columna_industria = "3"
     columna_ingles = "17"
     columna_ubicacion = "30"
 
-    if columna_docente in df.columns:
-        df[columna_docente] = df[columna_docente].astype(str)
-        df["Docente Acompañante"] = df[columna_docente].str.strip().str.upper() == "SI"
-
-    formularios = len(df)
-    trl_max = int(df["Nivel TRL"].max())
-    aprobados = int((df["Aprobado"] == "Sí").sum())
-    docente_si = int(df["Docente Acompañante"].sum())
-    docente_no = formularios - docente_si
-
-    mostrar_kpis(formularios, trl_max, aprobados, docente_si, docente_no)
+    seccion_kpis(df, huella)
 
     # Vista previa
     st.subheader("📄 Vista previa")
     st.dataframe(df[["1", "Aprobado", "Puntaje TRL 1-3", "Puntaje TRL 4-7", "Puntaje TRL 8-9"]].head())
 
-    # Gráficos
-    st.subheader("📊 Gráficos")
-    figs = graficos_generales(df, columna_industria, columna_ingles, columna_ubicacion)
-    mostrar_en_pares(*figs)
+    seccion_graficos(df, huella, columna_industria, columna_ingles, columna_ubicacion)
 
     # --- BUSCADOR DE PROYECTOS ---
-    with st.form(key="buscar_proyecto_form"):
-        nombre_input = st.text_input("🔍 Escribe el nombre exacto del proyecto que deseas exportar",
-                                     value=st.session_state.get("nombre_busqueda", ""))
-        buscar = st.form_submit_button("🔎 Buscar proyecto")
-        if buscar:
-            st.session_state["nombre_busqueda"] = nombre_input
-            df_filtrado = df[df["Nombre del Proyecto"].str.lower().str.contains(nombre_input.lower(), na=False)]
-            st.session_state["df_filtrado"] = df_filtrado
-            st.session_state["proyecto_nombres"] = df_filtrado["Nombre del Proyecto"].unique().tolist() if not df_filtrado.empty else []
-
-    if "df_filtrado" in st.session_state and st.session_state["df_filtrado"] is not None:
-        df_filtrado = st.session_state["df_filtrado"]
-        nombre_input = st.session_state["nombre_busqueda"]
-
-        if not df_filtrado.empty:
-            st.success(f"✅ Se encontraron {len(df_filtrado)} proyecto(s) que coinciden con: **{nombre_input}**")
-
-
-            nombres_unicos = st.session_state.get("proyecto_nombres", [])
-            nombre_seleccionado = nombres_unicos[0] if len(nombres_unicos) == 1 else st.radio(
-                "Selecciona el proyecto que deseas visualizar:",
-                options=nombres_unicos,
-                key="radio_proyecto"
-            )
-
-            df_proyecto = df_filtrado[df_filtrado["Nombre del Proyecto"] == nombre_seleccionado]
-
-            if st.button("📄 Ver reporte con botón de impresión"):
-                puntajes = {
-                    "TRL 1-3": df_proyecto["Puntaje TRL 1-3"].values[0],
-                    "TRL 4-7": df_proyecto["Puntaje TRL 4-7"].values[0],
-                    "TRL 8-9": df_proyecto["Puntaje TRL 8-9"].values[0],
-                }
-                aprobado = df_proyecto["Aprobado"].values[0]
-                html_out = generar_html_reporte(nombre_seleccionado, puntajes, aprobado)
-                html(html_out, height=800, scrolling=True)
-
-        else:
-            st.warning("⚠️ Proyecto no encontrado. Verifica el nombre.")
+    seccion_busqueda(df, huella)
@@ -0,0 +1,185 @@
+# metricas.py
+"""
+Métricas en formato de texto de Prometheus, sin dependencias: histogramas de duración
+de cada etapa del procesamiento y de cada ruta de la API. Registrar una medición es
+una suma bajo un lock, así que se puede dejar activo en producción.
+
+Para medir una etapa nueva basta con decorar la función con @cronometrar("nombre")
+o envolver el bloque en `with etapa("nombre"):`.
+
+El modo perfil (?profile=1 en la API) usa cProfile: perfilando() activa el perfil para
+el contexto actual y ejecucion.ejecutar perfila cada función que manda a un hilo.
+"""
+import bisect
+import contextlib
+import contextvars
+import cProfile
+import functools
+import io
+import pstats
+import threading
+import time
+
+# Límites superiores (segundos) de los buckets de los histogramas
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histograma:
+    """Histograma acumulativo de Prometheus con una serie por combinación de etiquetas."""
+
+    def __init__(self, nombre, ayuda, etiquetas, buckets=BUCKETS):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valor, *etiquetas):
+        posicion = bisect.bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._series.get(etiquetas)
+            if serie is None:
+                # [conteo por bucket (+Inf al final), suma]
+                serie = self._series[etiquetas] = [[0] * (len(self.buckets) + 1), 0.0]
+            serie[0][posicion] += 1
+            serie[1] += valor
+
+    def exponer(self):
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} histogram"]
+        with self._lock:
+            series = [(etiquetas, list(conteos), suma) for etiquetas, (conteos, suma) in sorted(self._series.items())]
+        for valores, conteos, suma in series:
+            base = [f'{k}="{_escapar(v)}"' for k, v in zip(self.etiquetas, valores)]
+            acumulado = 0
+            for limite, conteo in zip((*self.buckets, "+Inf"), conteos):
+                acumulado += conteo
+                le = limite if limite == "+Inf" else repr(float(limite))
+                etiquetas = ",".join(base + [f'le="{le}"'])
+                lineas.append(f"{self.nombre}_bucket{{{etiquetas}}} {acumulado}")
+            etiquetas = "{" + ",".join(base) + "}" if base else ""
+            lineas.append(f"{self.nombre}_sum{etiquetas} {suma}")
+            lineas.append(f"{self.nombre}_count{etiquetas} {acumulado}")
+        return lineas
+
+
+class Contador:
+    """Contador de Prometheus con una serie por combinación de etiquetas."""
+
+    def __init__(self, nombre, ayuda, etiquetas):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def sumar(self, *etiquetas, valor=1):
+        with self._lock:
+            self._series[etiquetas] = self._series.get(etiquetas, 0) + valor
+
+    def exponer(self):
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} counter"]
+        with self._lock:
+            series = sorted(self._series.items())
+        for valores, total in series:
+            etiquetas = ",".join(f'{k}="{_escapar(v)}"' for k, v in zip(self.etiquetas, valores))
+            lineas.append(f"{self.nombre}{{{etiquetas}}} {total}")
+        return lineas
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+duracion_etapas = Histograma(
+    "trl_etapa_duracion_segundos", "Duración de cada etapa del procesamiento.", ["etapa"]
+)
+errores_etapas = Contador(
+    "trl_etapa_errores_total", "Etapas que terminaron con una excepción.", ["etapa"]
+)
+duracion_peticiones = Histograma(
+    "trl_http_duracion_segundos", "Duración de las peticiones HTTP, hasta el último byte de la respuesta.", ["metodo", "ruta"]
+)
+peticiones = Contador(
+    "trl_http_peticiones_total", "Peticiones HTTP atendidas.", ["metodo", "ruta", "estado"]
+)
+
+METRICAS = [duracion_etapas, errores_etapas, duracion_peticiones, peticiones]
+
+
+@contextlib.contextmanager
+def etapa(nombre):
+    """Registra en duracion_etapas lo que tarda el bloque (también si falla)."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        errores_etapas.sumar(nombre)
+        raise
+    finally:
+        duracion_etapas.observar(time.perf_counter() - inicio, nombre)
+
+
+def cronometrar(nombre):
+    """Decorador: cada llamada a la función se registra como la etapa `nombre`."""
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with etapa(nombre):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+
+def exponer():
+    """Texto para GET /metrics."""
+    lineas = []
+    for metrica in METRICAS:
+        lineas.extend(metrica.exponer())
+    return "\n".join(lineas) + "\n"
+
+
+# --- MODO PERFIL ---
+
+# Perfiles de la petición en curso (None fuera del modo perfil). Se hereda en los hilos de ejecutar()
+_perfiles = contextvars.ContextVar("perfiles", default=None)
+
+
+@contextlib.contextmanager
+def perfilando():
+    """Activa el modo perfil para el contexto actual; devuelve la lista donde se juntan los perfiles."""
+    perfiles = []
+    token = _perfiles.set(perfiles)
+    try:
+        yield perfiles
+    finally:
+        _perfiles.reset(token)
+
+
+def perfilar(funcion):
+    """`funcion` envuelta en cProfile si la petición actual está en modo perfil (si no, la misma)."""
+    perfiles = _perfiles.get()
+    if perfiles is None:
+        return funcion
+
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        # Un Profile por llamada: cProfile solo ve el hilo en el que se activa
+        perfil = cProfile.Profile()
+        try:
+            return perfil.runcall(funcion, *args, **kwargs)
+        finally:
+            perfiles.append(perfil)
+    return envoltura
+
+
+def reporte_perfil(perfiles, duracion, lineas=40):
+    """Resumen de texto (pstats por tiempo acumulado) de los perfiles de una petición."""
+    salida = io.StringIO()
+    salida.write(f"Duración total: {duracion * 1000:.1f} ms\n")
+    if not perfiles:
+        salida.write("La petición no ejecutó trabajo en hilos: no hay nada que perfilar.\n")
+        return salida.getvalue()
+    estadisticas = pstats.Stats(*perfiles, stream=salida)
+    estadisticas.strip_dirs().sort_stats("cumulative").print_stats(lineas)
+    return salida.getvalue()
@@ -0,0 +1,59 @@
+# nucleo.py
+"""
+Procesamiento de las entradas del formulario, sin dependencias de interfaz: lo usan
+la API (FastAPI) y los dashboards de Streamlit. Junto con data_loader (diccionario),
+auth (cliente de Gravity Forms) y puntajes forma el núcleo de la aplicación.
+"""
+import pandas as pd
+
+from funciones import segmento_trl
+from metricas import cronometrar
+from puntajes import SEGMENTOS, puntuar_con_matriz, resultado_puntajes
+
+# Ids de campo del formulario de Gravity Forms -> nombre de columna
+COLUMNAS_FORMULARIO = {
+    "1": "Nombre del Proyecto",
+    "14": "Nivel TRL",
+    "15": "Docente Acompañante",
+    "17": "Nivel de Inglés",
+    "30": "Ubicación",
+    "3": "Industria"
+}
+
+def procesar_datos_completos(df, tabla):
+    """`tabla` es la TablaPuntajes de data_loader.cargar_tabla_puntajes."""
+    return procesar_con_matriz(df, tabla)[0]
+
+
+@cronometrar("puntaje")
+def procesar_con_matriz(df, tabla):
+    """DataFrame procesado y la MatrizRespuestas (respuestas de cada fila) de la que salen sus puntajes."""
+    df = df.rename(columns=COLUMNAS_FORMULARIO)
+
+    df["Nivel TRL"] = pd.to_numeric(df["Nivel TRL"], errors="coerce").fillna(0)
+    df["Segmento TRL"] = df["Nivel TRL"].apply(segmento_trl)
+
+    puntajes, matriz = puntuar_con_matriz(df, tabla)
+    df[puntajes.columns] = puntajes
+
+    df["Docente Acompañante"] = df["Docente Acompañante"].astype(str).str.strip().str.upper() == "SI"
+    df["Nivel de Inglés"] = df["Nivel de Inglés"].fillna("No especificado").str.strip().str.capitalize()
+    df["Puntaje Total"] = df["Puntaje TRL 1-3"] + df["Puntaje TRL 4-7"] + df["Puntaje TRL 8-9"]
+
+    return df, matriz
+
+
+@cronometrar("repuntaje")
+def repuntuar(df, matriz, tabla):
+    """
+    Actualiza (en el mismo `df`) los puntajes de un DataFrame procesado con los pesos
+    de `tabla`, sumando solo la diferencia de las respuestas cuyo puntaje cambió.
+    Devuelve (df, matriz con los pesos nuevos); ValueError si `tabla` tiene respuestas
+    que la matriz no conoce.
+    """
+    matriz, diferencia = matriz.con_pesos(tabla)
+    columnas = [f"Puntaje {segmento}" for segmento in SEGMENTOS]
+    puntajes = resultado_puntajes(df[columnas].to_numpy() + diferencia, df.index)
+    df[puntajes.columns] = puntajes
+    df["Puntaje Total"] = df["Puntaje TRL 1-3"] + df["Puntaje TRL 4-7"] + df["Puntaje TRL 8-9"]
+    return df, matriz
@@ -0,0 +1,366 @@
+# puntajes.py
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+SEGMENTOS = ["TRL 1-3", "TRL 4-7", "TRL 8-9"]
+UMBRAL_APROBACION = 50
+
+# Bonificaciones que se suman a cada segmento
+BONO_INGLES = {"intermedio": 2, "avanzado": 4}
+BONO_DOCENTE = 10
+
+
+def normalizar_respuesta(texto) -> str:
+    """Forma canónica de una respuesta: sin tildes, sin mayúsculas y con espacios simples."""
+    texto = unicodedata.normalize("NFKD", str(texto))
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return " ".join(texto.casefold().split())
+
+
+def campo_de_columna(columna) -> str:
+    """Id de campo de Gravity Forms de una columna: las casillas "40.1", "40.2"... son del campo "40"."""
+    return str(columna).split(".", 1)[0]
+
+
+def campos_del_formulario(formulario):
+    """
+    {pregunta normalizada: (id de campo, {valor normalizado: texto normalizado})} a partir
+    del esquema del formulario (GET /forms/{id}). El segundo dict guarda las opciones
+    cuyo valor guardado difiere del texto que se muestra.
+    """
+    campos = {}
+    for campo in (formulario or {}).get("fields", []):
+        valores = {}
+        for opcion in campo.get("choices") or []:
+            texto = normalizar_respuesta(opcion.get("text", ""))
+            valor = normalizar_respuesta(opcion.get("value", ""))
+            if valor and valor != texto:
+                valores[valor] = texto
+        campos[normalizar_respuesta(campo.get("label", ""))] = (str(campo["id"]), valores)
+    return campos
+
+
+def compilar_entradas(diccionario, formulario=None):
+    """
+    Pasa {pregunta: {respuesta: {puntaje, segmento}}} a una lista de entradas
+    [campo, respuesta normalizada, segmento, puntaje]. Las preguntas que no están en el
+    esquema del formulario (o si no hay esquema) quedan con campo "" y, como antes,
+    puntúan en cualquier columna.
+    """
+    campos = campos_del_formulario(formulario)
+    entradas, asignados, sin_campo = [], {}, []
+    for pregunta, respuestas_map in diccionario.items():
+        campo, valores = campos.get(normalizar_respuesta(pregunta), ("", {}))
+        if campo:
+            asignados[campo] = pregunta
+        else:
+            sin_campo.append(pregunta)
+        for respuesta, datos in respuestas_map.items():
+            texto = normalizar_respuesta(respuesta)
+            claves = [texto] + [valor for valor, t in valores.items() if t == texto]
+            for clave in claves:
+                entradas.append([campo, clave, datos["segmento"], float(datos["puntaje"])])
+    return {"campos": asignados, "sin_campo": sin_campo, "entradas": entradas}
+
+
+class TablaPuntajes:
+    """
+    Diccionario compilado para puntuar con operaciones vectorizadas.
+
+    Por cada campo del formulario hay un índice hash de respuestas normalizadas y una
+    matriz (respuestas + 1) x segmentos con lo que suma cada una; la última fila vale
+    cero y recibe las celdas sin coincidencia. El campo "" reúne las respuestas de
+    preguntas sin campo conocido, que se buscan en todas las columnas.
+    """
+
+    def __init__(self, entradas):
+        aportes = {}
+        for campo, respuesta, segmento, puntaje in entradas:
+            # Una misma respuesta puede puntuar en varias preguntas: se acumula igual que antes
+            fila = aportes.setdefault(campo, {}).setdefault(respuesta, np.zeros(len(SEGMENTOS)))
+            fila[SEGMENTOS.index(segmento)] += puntaje
+
+        self.por_campo = {}
+        for campo, respuestas in aportes.items():
+            matriz = np.zeros((len(respuestas) + 1, len(SEGMENTOS)))
+            matriz[:-1] = np.vstack(list(respuestas.values()))
+            self.por_campo[campo] = (pd.Index(list(respuestas.keys()), dtype=object), matriz)
+
+    def puntua(self, columna) -> bool:
+        return "" in self.por_campo or campo_de_columna(columna) in self.por_campo
+
+    def aportes_columna(self, columna: pd.Series) -> np.ndarray:
+        # Se normaliza cada valor distinto una sola vez y luego es una búsqueda hash por celda
+        codigos, unicos = pd.factorize(columna, use_na_sentinel=True)
+        normalizados = [normalizar_respuesta(valor) for valor in unicos]
+        total = np.zeros((len(columna), len(SEGMENTOS)))
+        for campo in {campo_de_columna(columna.name), ""}:
+            if campo not in self.por_campo:
+                continue
+            respuestas, matriz = self.por_campo[campo]
+            # Las celdas vacías (código -1) caen en la última fila, que vale cero
+            posiciones = np.append(respuestas.get_indexer(normalizados), -1)
+            total += matriz[posiciones[codigos]]
+        return total
+
+
+def compilar_diccionario(diccionario, formulario=None) -> TablaPuntajes:
+    """Convierte {pregunta: {respuesta: {puntaje, segmento}}} en una TablaPuntajes."""
+    return TablaPuntajes(compilar_entradas(diccionario, formulario)["entradas"])
+
+
+def puntajes_base(df: pd.DataFrame, tabla: TablaPuntajes) -> np.ndarray:
+    """Suma, por fila y segmento, lo que aportan todas las celdas que coinciden con el diccionario."""
+    totales = np.zeros((len(df), len(SEGMENTOS)))
+    for columna in df.columns:
+        serie = df[columna]
+        # Las respuestas del diccionario son texto; una columna numérica nunca coincide
+        if pd.api.types.is_numeric_dtype(serie.dtype) or not tabla.puntua(columna):
+            continue
+        totales += tabla.aportes_columna(serie)
+    return totales
+
+
+def indicadores_bonos(df: pd.DataFrame) -> np.ndarray:
+    """
+    Matriz filas x 3 con 1 donde corresponde cada bonificación: inglés intermedio,
+    inglés avanzado y docente acompañante. Acepta la columna de docente cruda ("Si")
+    o ya procesada (booleana).
+    """
+    indicadores = np.zeros((len(df), 3))
+
+    if "Nivel de Inglés" in df.columns:
+        ingles = df["Nivel de Inglés"].astype(str).str.strip().str.lower()
+        es_intermedio = ingles.str.contains("intermedio", regex=False).to_numpy()
+        es_avanzado = ingles.str.contains("avanzado", regex=False).to_numpy()
+        indicadores[:, 0] = es_intermedio
+        indicadores[:, 1] = es_avanzado & ~es_intermedio
+
+    if "Docente Acompañante" in df.columns:
+        docente = df["Docente Acompañante"]
+        if pd.api.types.is_bool_dtype(docente.dtype):
+            indicadores[:, 2] = docente.to_numpy()
+        else:
+            indicadores[:, 2] = docente.astype(str).str.strip().str.lower().to_numpy() == "si"
+
+    return indicadores
+
+
+def valores_bonos(intermedio=BONO_INGLES["intermedio"], avanzado=BONO_INGLES["avanzado"], docente=BONO_DOCENTE):
+    """Vector de puntos de cada columna de indicadores_bonos."""
+    return np.array([intermedio, avanzado, docente], dtype=float)
+
+
+def bonificaciones(df: pd.DataFrame) -> np.ndarray:
+    """Puntos extra por nivel de inglés y docente acompañante."""
+    return indicadores_bonos(df) @ valores_bonos()
+
+
+# Filas por bloque al multiplicar la matriz dispersa como densa: acota la memoria temporal
+FILAS_POR_BLOQUE = 16384
+
+
+class MatrizRespuestas:
+    """
+    Matriz dispersa (CSR) filas x respuestas de la TablaPuntajes: cuántas veces aparece
+    cada respuesta en cada fila. Guarda también las bonificaciones de cada fila y los
+    pesos (respuestas x segmentos) con que se puntuó, de modo que
+    puntajes = conteos @ pesos + bonos @ valores_bonos. Con ella:
+
+    - el detalle de un proyecto es el slice de su fila (qué respuestas sumaron cuánto);
+    - otro juego de pesos se evalúa sin volver a leer las respuestas (simulacion.py);
+    - si cambia el puntaje de algunas respuestas basta sumar la diferencia de esas columnas.
+
+    Las respuestas de la fila i son indices[indptr[i]:indptr[i + 1]], con sus conteos.
+    """
+
+    def __init__(self, claves, indptr, indices, conteos, bonos, pesos):
+        # Una columna por (campo, respuesta normalizada)
+        self.claves = [tuple(clave) for clave in claves]
+        self.indptr = indptr
+        self.indices = indices
+        self.conteos = conteos
+        self.bonos = bonos
+        self.pesos = pesos
+        self._columnas = {clave: j for j, clave in enumerate(self.claves)}
+
+    @classmethod
+    def desde_dataframe(cls, df: pd.DataFrame, tabla: TablaPuntajes, excluir=()):
+        """Matriz de las columnas de `df` que puntúa puntajes_base (salvo las de `excluir`)."""
+        claves, inicios = [], {}
+        for campo, (respuestas, _) in tabla.por_campo.items():
+            inicios[campo] = len(claves)
+            claves += [(campo, respuesta) for respuesta in respuestas]
+
+        filas, columnas = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.int64)]
+        for columna in df.columns:
+            serie = df[columna]
+            if columna in excluir or pd.api.types.is_numeric_dtype(serie.dtype) or not tabla.puntua(columna):
+                continue
+            codigos, unicos = pd.factorize(serie, use_na_sentinel=True)
+            normalizados = [normalizar_respuesta(valor) for valor in unicos]
+            for campo in {campo_de_columna(columna), ""}:
+                if campo not in tabla.por_campo:
+                    continue
+                respuestas, _ = tabla.por_campo[campo]
+                posiciones = np.append(respuestas.get_indexer(normalizados), -1)[codigos]
+                coincide = posiciones >= 0
+                filas.append(np.flatnonzero(coincide))
+                columnas.append(inicios[campo] + posiciones[coincide])
+
+        # Ordenadas por fila y columna; la misma respuesta en varias columnas de una fila se suma
+        ancho = max(len(claves), 1)
+        celdas, conteos = np.unique(np.concatenate(filas) * ancho + np.concatenate(columnas), return_counts=True)
+        indptr = np.zeros(len(df) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(celdas // ancho, minlength=len(df)), out=indptr[1:])
+        matriz = cls(claves, indptr, (celdas % ancho).astype(np.int32), conteos.astype(np.float32),
+                     indicadores_bonos(df), None)
+        matriz.pesos = matriz.pesos_de(tabla)
+        return matriz
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    def pesos_de(self, tabla: TablaPuntajes) -> np.ndarray:
+        """
+        Matriz respuestas x segmentos con lo que suma cada columna según `tabla`. Las
+        respuestas que `tabla` no tiene valen cero; las que solo tiene `tabla` no se
+        pueden evaluar con esta matriz (ValueError).
+        """
+        pesos = np.zeros((len(self.claves), len(SEGMENTOS)))
+        for campo, (respuestas, matriz) in tabla.por_campo.items():
+            for i, respuesta in enumerate(respuestas):
+                j = self._columnas.get((campo, respuesta))
+                if j is None:
+                    if matriz[i].any():
+                        raise ValueError(f"La respuesta '{respuesta}' no está en el diccionario actual")
+                    continue
+                pesos[j] = matriz[i]
+        return pesos
+
+    def densa(self, inicio, fin):
+        """Filas inicio:fin como matriz densa, para multiplicarlas por bloques."""
+        fin = min(fin, len(self))
+        a, b = self.indptr[inicio], self.indptr[fin]
+        filas = np.repeat(np.arange(fin - inicio), np.diff(self.indptr[inicio:fin + 1]))
+        densa = np.zeros((fin - inicio, len(self.claves)))
+        densa[filas, self.indices[a:b]] = self.conteos[a:b]
+        return densa
+
+    def puntajes(self, pesos=None) -> np.ndarray:
+        """conteos @ pesos (por defecto, los de la matriz): puntajes sin bonificaciones."""
+        pesos = self.pesos if pesos is None else pesos
+        resultado = np.empty((len(self), pesos.shape[1]))
+        for inicio in range(0, len(self), FILAS_POR_BLOQUE):
+            resultado[inicio:inicio + FILAS_POR_BLOQUE] = self.densa(inicio, inicio + FILAS_POR_BLOQUE) @ pesos
+        return resultado
+
+    def fila(self, posicion):
+        """(columnas, conteos) de las respuestas de una fila: el slice CSR."""
+        a, b = self.indptr[posicion], self.indptr[posicion + 1]
+        return self.indices[a:b], self.conteos[a:b]
+
+    def aportes(self, posicion):
+        """[(clave, veces, puntos por segmento)] de las respuestas que suman algo en la fila."""
+        columnas, conteos = self.fila(posicion)
+        puntos = conteos[:, None] * self.pesos[columnas]
+        return [
+            (self.claves[j], veces, fila)
+            for j, veces, fila in zip(columnas.tolist(), conteos.tolist(), puntos)
+            if fila.any()
+        ]
+
+    def con_pesos(self, tabla: TablaPuntajes):
+        """
+        (matriz con los pesos de `tabla`, diferencia de puntajes filas x segmentos). Solo
+        suman las celdas de las columnas cuyo peso cambió. ValueError si `tabla` tiene
+        respuestas que la matriz no conoce (hay que volver a leer las entradas).
+        """
+        pesos = self.pesos_de(tabla)
+        cambio = pesos - self.pesos
+        diferencia = np.zeros((len(self), len(SEGMENTOS)))
+        cambiadas = cambio.any(axis=1)
+        if cambiadas.any():
+            celdas = np.flatnonzero(cambiadas[self.indices])
+            filas = np.searchsorted(self.indptr, celdas, side="right") - 1
+            aporte = self.conteos[celdas, None] * cambio[self.indices[celdas]]
+            for s in range(len(SEGMENTOS)):
+                diferencia[:, s] = np.bincount(filas, weights=aporte[:, s], minlength=len(self))
+        matriz = MatrizRespuestas(self.claves, self.indptr, self.indices, self.conteos, self.bonos, pesos)
+        return matriz, diferencia
+
+    def seleccionar(self, filas):
+        """Matriz con las `filas` indicadas (posiciones), en ese orden."""
+        filas = np.asarray(filas, dtype=np.int64)
+        inicios = self.indptr[filas]
+        largos = self.indptr[filas + 1] - inicios
+        indptr = np.zeros(len(filas) + 1, dtype=np.int64)
+        np.cumsum(largos, out=indptr[1:])
+        # Posición de cada celda en los arrays originales: inicio de su fila + desplazamiento
+        celdas = np.repeat(inicios - indptr[:-1], largos) + np.arange(indptr[-1])
+        return MatrizRespuestas(self.claves, indptr, self.indices[celdas], self.conteos[celdas],
+                                self.bonos[filas], self.pesos)
+
+    def combinar(self, nuevas, posiciones, filas):
+        """
+        Upsert de filas, como sincronizacion.combinar_entradas: la matriz resultante
+        tiene `filas` filas, la fila k de `nuevas` va a posiciones[k] (reemplaza a la que
+        había o se agrega al final) y el resto son las de esta matriz.
+        """
+        if nuevas.claves != self.claves:
+            raise ValueError("Las matrices se armaron con diccionarios distintos")
+        fuente = np.arange(filas)
+        sin_fila = fuente >= len(self)
+        fuente[posiciones] = len(self) + np.arange(len(posiciones))
+        sin_fila[posiciones] = False
+        if sin_fila.any():
+            raise ValueError("Hay filas agregadas sin una fila nueva que las ocupe")
+
+        juntas = MatrizRespuestas(
+            self.claves,
+            np.concatenate([self.indptr, self.indptr[-1] + nuevas.indptr[1:]]),
+            np.concatenate([self.indices, nuevas.indices]),
+            np.concatenate([self.conteos, nuevas.conteos]),
+            np.concatenate([self.bonos, nuevas.bonos]),
+            nuevas.pesos,
+        )
+        return juntas.seleccionar(fuente)
+
+
+def etiquetas_respuestas(diccionario, formulario=None):
+    """
+    {(campo, respuesta normalizada): (pregunta, respuesta)} con los textos de
+    diccionario.csv, para mostrar las columnas de una MatrizRespuestas.
+    """
+    campos = campos_del_formulario(formulario)
+    etiquetas = {}
+    for pregunta, respuestas_map in diccionario.items():
+        campo, valores = campos.get(normalizar_respuesta(pregunta), ("", {}))
+        for respuesta in respuestas_map:
+            texto = normalizar_respuesta(respuesta)
+            for clave in [texto] + [valor for valor, t in valores.items() if t == texto]:
+                etiquetas.setdefault((campo, clave), (pregunta, respuesta))
+    return etiquetas
+
+
+def resultado_puntajes(puntajes: np.ndarray, index) -> pd.DataFrame:
+    """Columnas de puntaje por segmento y Aprobado a partir de la matriz filas x segmentos."""
+    resultado = pd.DataFrame(
+        puntajes, index=index, columns=[f"Puntaje {segmento}" for segmento in SEGMENTOS]
+    )
+    resultado["Aprobado"] = np.where((puntajes >= UMBRAL_APROBACION).any(axis=1), "Sí", "No")
+    return resultado
+
+
+def puntuar_con_matriz(df: pd.DataFrame, tabla: TablaPuntajes):
+    """Puntajes por segmento (con bonificaciones) y Aprobado, y la MatrizRespuestas de la que salen."""
+    matriz = MatrizRespuestas.desde_dataframe(df, tabla)
+    puntajes = matriz.puntajes() + (matriz.bonos @ valores_bonos())[:, None]
+    return resultado_puntajes(puntajes, df.index), matriz
+
+
+def puntuar_dataframe(df: pd.DataFrame, tabla: TablaPuntajes) -> pd.DataFrame:
+    """Devuelve los puntajes por segmento (con bonificaciones) y la columna Aprobado."""
+    return puntuar_con_matriz(df, tabla)[0]
@@ -0,0 +1,182 @@
+# reportes_html.py
+"""
+Reportes HTML de proyectos (plantillas de templates/reports). No depende de la API:
+lo usan los endpoints y los procesos del pool que arman el ZIP con todos los reportes.
+"""
+import os
+import re
+import unicodedata
+import zipfile
+from collections import deque
+from datetime import datetime
+
+from jinja2 import Environment, FileSystemLoader
+
+from ejecucion import PROCESOS, pool_procesos
+from insights import insights_de_proyecto, obtener_insights
+
+DIRECTORIO_PLANTILLAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+PLANTILLA_PROYECTO = "reports/reporte_template.html"
+PLANTILLA_TOP10 = "reports/reporte_top10.html"
+PLANTILLA_INDICE = "reports/indice_reportes.html"
+# Hoja de estilos que se copia dentro del ZIP para que los reportes se vean sin el servidor
+HOJA_ESTILOS = "css/template.css"
+
+# Proyectos que renderiza cada tarea del pool al armar el ZIP
+PROYECTOS_POR_LOTE = 50
+
+_entorno = None
+
+
+def entorno():
+    # Misma configuración que Jinja2Templates (autoescape), sin depender de Starlette
+    global _entorno
+    if _entorno is None:
+        _entorno = Environment(loader=FileSystemLoader(DIRECTORIO_PLANTILLAS), autoescape=True)
+    return _entorno
+
+
+def fecha_reporte(marca=None):
+    """Fecha que muestran los reportes: la del timestamp `marca` (p. ej. la versión de los datos) o ahora."""
+    fecha = datetime.now() if marca is None else datetime.fromtimestamp(marca)
+    return fecha.strftime("%d/%m/%Y %H:%M")
+
+
+def renderizar(plantilla, contexto, url_for):
+    """HTML (bytes) de `plantilla`; `url_for(nombre, path=...)` resuelve los recursos estáticos."""
+    contexto = dict(contexto, url_for=url_for)
+    contexto.setdefault("fecha_generacion", fecha_reporte())
+    return entorno().get_template(plantilla).render(contexto).encode("utf-8")
+
+
+def contexto_reporte_proyecto(proyecto, insights=None):
+    if insights is None:
+        insights = insights_de_proyecto(proyecto)
+
+    return {
+        "nombre_proyecto": proyecto["Nombre del Proyecto"],
+        "aprobado": proyecto["Aprobado"],
+        "nivel_trl": proyecto["Nivel TRL"],
+        "segmento_trl": proyecto["Segmento TRL"],
+        "docente_acompanante": "Sí" if proyecto["Docente Acompañante"] else "No",
+        "ubicacion": proyecto.get("Ubicación", "No especificada"),
+        "nivel_ingles": proyecto.get("Nivel de Inglés", "No especificado"),
+        "trl_1_3": proyecto["Puntaje TRL 1-3"],
+        "trl_4_7": proyecto["Puntaje TRL 4-7"],
+        "trl_8_9": proyecto["Puntaje TRL 8-9"],
+        "insights": insights
+    }
+
+
+def contexto_top10(df):
+    # nlargest con keep="first" desempata por orden de aparición, como un sort estable
+    top10 = df.nlargest(10, "Puntaje Total", keep="first")
+
+    proyectos_contexto = []
+    for proyecto, insights in zip(top10.to_dict("records"), obtener_insights(top10)):
+        contexto = contexto_reporte_proyecto(proyecto, insights)
+        contexto["puntaje_total"] = proyecto["Puntaje Total"]
+        proyectos_contexto.append(contexto)
+    return {"proyectos": proyectos_contexto}
+
+
+# --- ZIP CON LOS REPORTES DE VARIOS PROYECTOS ---
+
+def url_en_zip(nombre, path=""):
+    # Dentro del ZIP los recursos van en rutas relativas a los reportes
+    return f"{nombre}/{path}"
+
+
+def nombre_archivo(numero, nombre_proyecto):
+    """Nombre de archivo seguro y único dentro del ZIP: 0001_nombre_del_proyecto.html"""
+    texto = unicodedata.normalize("NFKD", str(nombre_proyecto))
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    texto = re.sub(r"[^A-Za-z0-9]+", "_", texto).strip("_")[:60] or "proyecto"
+    return f"{numero:04d}_{texto}.html"
+
+
+def renderizar_lote(proyectos, archivos, fecha_generacion, aportes=None):
+    """
+    Reportes de un bloque de proyectos, con sus insights en lote. `aportes` es el detalle
+    del puntaje de cada proyecto (opcional). Corre en el pool de procesos.
+    """
+    insights = obtener_insights(proyectos)
+    aportes = aportes or [None] * len(proyectos)
+    return [
+        (archivo, renderizar(
+            PLANTILLA_PROYECTO,
+            dict(contexto_reporte_proyecto(proyecto, ins), aportes=apo, fecha_generacion=fecha_generacion),
+            url_en_zip,
+        ))
+        for archivo, proyecto, ins, apo in zip(archivos, proyectos.to_dict("records"), insights, aportes)
+    ]
+
+
+class _SalidaZip:
+    """Destino no posicionable para ZipFile: junta lo escrito hasta que se envía."""
+
+    def __init__(self):
+        self._trozos = []
+
+    def write(self, datos):
+        self._trozos.append(bytes(datos))
+        return len(datos)
+
+    def flush(self):
+        pass
+
+    def vaciar(self):
+        datos = b"".join(self._trozos)
+        self._trozos.clear()
+        return datos
+
+
+def iterar_zip_reportes(df, aportes=None, proyectos_por_lote=PROYECTOS_POR_LOTE):
+    """
+    ZIP (por trozos) con un HTML por fila de `df`, un index.html y la hoja de estilos.
+    Los lotes se renderizan en paralelo en el pool de procesos; como mucho hay dos por
+    proceso en curso, así que la memoria no depende de cuántos proyectos se exporten.
+    `aportes(inicio, fin)`, si se pasa, da el detalle del puntaje de las filas inicio:fin.
+    """
+    fecha_generacion = fecha_reporte()
+    archivos = [nombre_archivo(i + 1, nombre) for i, nombre in enumerate(df["Nombre del Proyecto"])]
+    pendientes = deque()
+    salida = _SalidaZip()
+
+    def enviar(inicio):
+        fin = inicio + proyectos_por_lote
+        pendientes.append(pool_procesos().submit(
+            renderizar_lote, df.iloc[inicio:fin], archivos[inicio:fin], fecha_generacion,
+            aportes(inicio, fin) if aportes else None,
+        ))
+
+    lotes = iter(range(0, len(df), proyectos_por_lote))
+    with zipfile.ZipFile(salida, "w", compression=zipfile.ZIP_DEFLATED) as zip_salida:
+        for inicio in lotes:
+            enviar(inicio)
+            if len(pendientes) >= 2 * PROCESOS:
+                break
+        while pendientes:
+            # Se escriben en orden; mientras tanto los procesos siguen con los lotes siguientes
+            for archivo, html in pendientes.popleft().result():
+                zip_salida.writestr(archivo, html)
+            inicio = next(lotes, None)
+            if inicio is not None:
+                enviar(inicio)
+            yield salida.vaciar()
+
+        indice = [
+            {
+                "archivo": archivo,
+                "nombre_proyecto": proyecto["Nombre del Proyecto"],
+                "segmento_trl": proyecto["Segmento TRL"],
+                "puntaje_total": proyecto["Puntaje Total"],
+                "aprobado": proyecto["Aprobado"],
+            }
+            for archivo, proyecto in zip(archivos, df[["Nombre del Proyecto", "Segmento TRL", "Puntaje Total", "Aprobado"]].to_dict("records"))
+        ]
+        zip_salida.writestr("index.html", renderizar(
+            PLANTILLA_INDICE, {"proyectos": indice, "fecha_generacion": fecha_generacion}, url_en_zip
+        ))
+        zip_salida.write(os.path.join(DIRECTORIO_PLANTILLAS, "static", HOJA_ESTILOS), f"static/{HOJA_ESTILOS}")
+    yield salida.vaciar()
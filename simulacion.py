@@ -0,0 +1,118 @@
+# simulacion.py
+"""
+Simulador de puntajes: "¿cuántos proyectos aprueban si cambiamos X?". Cada escenario
+puede cambiar pesos de diccionario.csv, el umbral de aprobación y las bonificaciones.
+Todos se evalúan juntos sobre la MatrizRespuestas del snapshot, sin volver a puntuar:
+un producto de matrices por bloque de proyectos y el umbral y los bonos de cada
+escenario aplicados por broadcasting.
+"""
+import numpy as np
+
+from metricas import cronometrar
+from puntajes import (
+    BONO_DOCENTE, BONO_INGLES, FILAS_POR_BLOQUE, SEGMENTOS, UMBRAL_APROBACION, TablaPuntajes,
+    compilar_entradas, normalizar_respuesta, valores_bonos,
+)
+
+ESCENARIO_ACTUAL = {
+    "nombre": "actual",
+    "umbral": UMBRAL_APROBACION,
+    "bono_ingles_intermedio": BONO_INGLES["intermedio"],
+    "bono_ingles_avanzado": BONO_INGLES["avanzado"],
+    "bono_docente": BONO_DOCENTE,
+    "pesos": [],
+}
+
+
+def tabla_con_cambios(diccionario, formulario, cambios):
+    """
+    TablaPuntajes del diccionario con los `cambios` aplicados: cada uno es
+    {pregunta, respuesta, puntaje, segmento (opcional)} de una fila existente.
+    """
+    diccionario = {pregunta: {r: dict(datos) for r, datos in respuestas.items()}
+                   for pregunta, respuestas in diccionario.items()}
+    preguntas = {normalizar_respuesta(pregunta): pregunta for pregunta in diccionario}
+    for cambio in cambios:
+        pregunta = preguntas.get(normalizar_respuesta(cambio["pregunta"]))
+        if pregunta is None:
+            raise ValueError(f"Pregunta no encontrada en el diccionario: {cambio['pregunta']}")
+        respuestas = {normalizar_respuesta(r): r for r in diccionario[pregunta]}
+        respuesta = respuestas.get(normalizar_respuesta(cambio["respuesta"]))
+        if respuesta is None:
+            raise ValueError(f"Respuesta no encontrada para '{pregunta}': {cambio['respuesta']}")
+
+        datos = diccionario[pregunta][respuesta]
+        datos["puntaje"] = cambio["puntaje"]
+        if cambio.get("segmento"):
+            if cambio["segmento"] not in SEGMENTOS:
+                raise ValueError(f"Segmento inválido: usa {', '.join(SEGMENTOS)}")
+            datos["segmento"] = cambio["segmento"]
+    return TablaPuntajes(compilar_entradas(diccionario, formulario)["entradas"])
+
+
+@cronometrar("simulacion")
+def evaluar(matriz, pesos, bonos, umbrales):
+    """
+    Evalúa K escenarios de una vez. `pesos` es K x respuestas x segmentos, `bonos`
+    K x 3 y `umbrales` K. Devuelve (aprobados: filas x K, por segmento: K x segmentos).
+    """
+    cantidad = len(pesos)
+    # Un solo producto para todos los escenarios: respuestas x (K * segmentos)
+    pesos = np.asarray(pesos).transpose(1, 0, 2).reshape(len(matriz.claves), cantidad * len(SEGMENTOS))
+    bonos = np.asarray(bonos).T
+    umbrales = np.asarray(umbrales, dtype=float)[None, :, None]
+
+    aprobados = np.empty((len(matriz), cantidad), dtype=bool)
+    por_segmento = np.zeros((cantidad, len(SEGMENTOS)), dtype=np.int64)
+    for inicio in range(0, len(matriz), FILAS_POR_BLOQUE):
+        fin = inicio + FILAS_POR_BLOQUE
+        puntajes = (matriz.densa(inicio, fin) @ pesos).reshape(-1, cantidad, len(SEGMENTOS))
+        puntajes += (matriz.bonos[inicio:fin] @ bonos)[:, :, None]
+        pasa = puntajes >= umbrales
+        aprobados[inicio:fin] = pasa.any(axis=2)
+        por_segmento += pasa.sum(axis=0)
+    return aprobados, por_segmento
+
+
+def simular(matriz, df, diccionario, formulario, escenarios, max_proyectos=20):
+    """
+    Aprobados del escenario actual y de cada escenario pedido, con los proyectos que
+    pasan a aprobar y los que dejan de hacerlo (hasta `max_proyectos` de cada uno).
+    `df` es el DataFrame del que salió `matriz` (para los nombres).
+    """
+    escenarios = [ESCENARIO_ACTUAL] + [{**ESCENARIO_ACTUAL, "nombre": None, **e} for e in escenarios]
+    pesos, bonos, umbrales = [], [], []
+    pesos_actuales = matriz.pesos
+    for escenario in escenarios:
+        # Sin cambios de pesos no hace falta recompilar el diccionario
+        cambios = escenario["pesos"]
+        pesos.append(matriz.pesos_de(tabla_con_cambios(diccionario, formulario, cambios)) if cambios else pesos_actuales)
+        bonos.append(valores_bonos(
+            escenario["bono_ingles_intermedio"], escenario["bono_ingles_avanzado"], escenario["bono_docente"]
+        ))
+        umbrales.append(escenario["umbral"])
+
+    aprobados, por_segmento = evaluar(matriz, pesos, bonos, umbrales)
+    identificacion = df[[c for c in ("id", "Nombre del Proyecto") if c in df.columns]]
+
+    def proyectos(mascara):
+        posiciones = np.flatnonzero(mascara)
+        seleccion = identificacion.iloc[posiciones[:max_proyectos]]
+        return {
+            "total": len(posiciones),
+            "proyectos": seleccion.astype(object).where(seleccion.notna(), None).to_dict(orient="records"),
+        }
+
+    resultados = []
+    for k, escenario in enumerate(escenarios):
+        resultado = {
+            "nombre": escenario["nombre"] or f"escenario {k}",
+            "aprobados": int(aprobados[:, k].sum()),
+            "por_segmento": dict(zip(SEGMENTOS, por_segmento[k].tolist())),
+        }
+        if k:
+            resultado["diferencia"] = resultado["aprobados"] - resultados[0]["aprobados"]
+            resultado["pasan"] = proyectos(aprobados[:, k] & ~aprobados[:, 0])
+            resultado["dejan_de_aprobar"] = proyectos(~aprobados[:, k] & aprobados[:, 0])
+        resultados.append(resultado)
+    return {"proyectos": len(matriz), "actual": resultados[0], "escenarios": resultados[1:]}
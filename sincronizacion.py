@@ -0,0 +1,260 @@
+# sincronizacion.py
+import json
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from bloqueo import BloqueoArchivo, intentar_bloqueo
+
+ARCHIVO_MARCA = "sync_estado.json"
+# Estado de los trabajos de sincronización, compartido entre workers
+ARCHIVO_TRABAJOS = "sync_trabajos.json"
+# Lo tiene el worker que ejecuta la sincronización periódica
+ARCHIVO_LIDER = "sincronizador.lock"
+MAX_TRABAJOS_GUARDADOS = 50
+# Veces que se duplica como máximo la espera tras fallos seguidos (después manda espera_maxima)
+MAX_DUPLICACIONES = 32
+
+
+def leer_marca(ruta=ARCHIVO_MARCA):
+    """Última marca de sincronización guardada o None si nunca se sincronizó."""
+    if not os.path.exists(ruta):
+        return None
+    with open(ruta, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def guardar_marca(marca, ruta=ARCHIVO_MARCA):
+    escribir_json(marca, ruta)
+
+
+def escribir_json(datos, ruta):
+    """Escritura atómica: se escribe a un temporal y se reemplaza, así nadie lee un JSON a medias."""
+    temporal = f"{ruta}.tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(datos, f)
+    os.replace(temporal, ruta)
+
+
+def calcular_marca(df):
+    """
+    Marca de agua: el date_updated más reciente, el mayor id de entrada y los ids que
+    comparten ese date_updated (la API filtra con >=, así que vuelven a llegar).
+    """
+    if df.empty or "date_updated" not in df.columns:
+        return None
+    fechas = df["date_updated"].astype(str)
+    ultima = fechas[df["date_updated"].notna()].max()
+    ids = pd.to_numeric(df["id"], errors="coerce")
+    return {
+        "date_updated": str(ultima),
+        "id": int(ids.max()) if ids.notna().any() else None,
+        "ids_en_marca": sorted(df.loc[fechas == ultima, "id"].astype(str).unique().tolist()),
+    }
+
+
+def descartar_ya_vistas(nuevas, marca):
+    """Quita las entradas que ya estaban integradas en la marca anterior."""
+    if nuevas.empty:
+        return nuevas
+    ya_vistas = (
+        (nuevas["date_updated"].astype(str) == marca["date_updated"])
+        & nuevas["id"].astype(str).isin(marca.get("ids_en_marca", []))
+    )
+    return nuevas[~ya_vistas]
+
+
+def combinar_entradas(existentes, nuevas):
+    """
+    Upsert por id de entrada: las filas que ya existían se reemplazan en su misma
+    posición y las nuevas se agregan al final.
+    """
+    if existentes.empty:
+        return nuevas.reset_index(drop=True)
+    if nuevas.empty:
+        return existentes
+
+    nuevas = nuevas.drop_duplicates(subset="id", keep="last")
+    columnas = existentes.columns.union(nuevas.columns, sort=False)
+    # object después de reindexar: las columnas que faltan en un lado llegan como float
+    base = existentes.set_index(existentes["id"].astype(str)).reindex(columns=columnas).astype(object)
+    cambios = nuevas.set_index(nuevas["id"].astype(str)).reindex(columns=columnas).astype(object)
+
+    comunes = cambios.index.intersection(base.index)
+    base.loc[comunes] = cambios.loc[comunes]
+    agregadas = cambios.loc[~cambios.index.isin(base.index)]
+
+    combinadas = pd.concat([base, agregadas]).reset_index(drop=True)
+    # Devolver a cada columna el tipo que tenía antes del upsert
+    return combinadas.infer_objects()
+
+
+# --- SINCRONIZACIÓN EN SEGUNDO PLANO ---
+
+def _ahora():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+class Sincronizador:
+    """
+    Ejecuta las sincronizaciones en un hilo de fondo, fuera de las peticiones.
+
+    `tareas` es {modo: función} y cada función devuelve un mensaje. Los trabajos se
+    encolan con `encolar` y, si `intervalo` > 0, cada `intervalo` segundos (± `jitter`)
+    se encola solo uno incremental. Tras cada fallo la espera se duplica, hasta
+    `espera_maxima`. Con varios workers solo el que tiene ARCHIVO_LIDER sincroniza
+    periódicamente. Cada trabajo queda en ARCHIVO_TRABAJOS para que cualquier worker
+    pueda informar su estado.
+    """
+
+    def __init__(self, tareas, intervalo=0, jitter=0.1, espera_maxima=3600,
+                 ruta_trabajos=ARCHIVO_TRABAJOS, ruta_lider=ARCHIVO_LIDER):
+        self.tareas = tareas
+        self.intervalo = intervalo
+        self.jitter = jitter
+        self.espera_maxima = espera_maxima
+        self._ruta_trabajos = ruta_trabajos
+        self._ruta_lider = ruta_lider
+        self._bloqueo = BloqueoArchivo(f"{ruta_trabajos}.lock")
+        self._cola = queue.Queue()
+        self._pendientes = {}  # modo -> id del trabajo encolado que todavía no empezó
+        self._lock = threading.Lock()
+        self._lock_hilo = threading.Lock()
+        self._parar = threading.Event()
+        self._hilo = None
+        self._lider = None
+        self.fallos = 0
+        self.proxima = None
+
+    # --- ciclo de vida ---
+
+    def iniciar(self):
+        with self._lock_hilo:
+            if self._hilo is not None:
+                return
+            self._parar.clear()
+            self._hilo = threading.Thread(target=self._bucle, name="sincronizador", daemon=True)
+            self._hilo.start()
+
+    def detener(self, timeout=5):
+        self._parar.set()
+        self._cola.put(None)
+        if self._hilo is not None:
+            self._hilo.join(timeout)
+            self._hilo = None
+        if self._lider is not None:
+            self._lider.close()
+            self._lider = None
+
+    def es_lider(self):
+        if self._lider is None:
+            self._lider = intentar_bloqueo(self._ruta_lider)
+        return self._lider is not None
+
+    # --- trabajos ---
+
+    def encolar(self, modo, origen="manual"):
+        """Encola un trabajo y lo devuelve. Si ya hay uno igual esperando, devuelve ese."""
+        if modo not in self.tareas:
+            raise ValueError(f"Modo de sincronización desconocido: {modo}")
+        with self._lock:
+            if modo in self._pendientes:
+                return self.trabajo(self._pendientes[modo])
+            trabajo = {"id": uuid.uuid4().hex, "modo": modo, "origen": origen,
+                       "estado": "pendiente", "creado": _ahora()}
+            self._pendientes[modo] = trabajo["id"]
+            self._guardar(trabajo)
+            self._cola.put(trabajo)
+        self.iniciar()
+        return trabajo
+
+    def trabajo(self, id_trabajo):
+        return self._leer()["trabajos"].get(id_trabajo)
+
+    def estado(self):
+        """Última sincronización terminada (de cualquier worker) y la programación de este."""
+        datos = self._leer()
+        return {
+            "ultima": datos.get("ultima"),
+            "intervalo_segundos": self.intervalo,
+            "proxima": self.proxima,
+            "fallos_consecutivos": self.fallos,
+            "en_curso": [t for t in datos["trabajos"].values() if t["estado"] == "en_curso"],
+        }
+
+    def ejecutar(self, trabajo):
+        with self._lock:
+            if self._pendientes.get(trabajo["modo"]) == trabajo["id"]:
+                del self._pendientes[trabajo["modo"]]
+        trabajo = dict(trabajo, estado="en_curso", inicio=_ahora())
+        self._guardar(trabajo)
+        inicio = time.perf_counter()
+        try:
+            trabajo["mensaje"] = self.tareas[trabajo["modo"]]()
+            trabajo["estado"] = "ok"
+            self.fallos = 0
+        except Exception as e:
+            trabajo["estado"] = "error"
+            trabajo["error"] = str(e) or type(e).__name__
+            self.fallos += 1
+        trabajo["fin"] = _ahora()
+        trabajo["duracion_segundos"] = round(time.perf_counter() - inicio, 3)
+        self._guardar(trabajo, terminado=True)
+        return trabajo
+
+    def espera(self):
+        """Segundos hasta la próxima sincronización periódica: backoff tras fallos y jitter."""
+        # Exponente acotado: tras ~1024 fallos seguidos 2 ** fallos ya no cabe en un float
+        espera = min(self.intervalo * 2 ** min(self.fallos, MAX_DUPLICACIONES), max(self.intervalo, self.espera_maxima))
+        return espera * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _bucle(self):
+        siguiente = time.monotonic() + self._programar() if self.intervalo > 0 else None
+        while not self._parar.is_set():
+            timeout = None if siguiente is None else max(0.0, siguiente - time.monotonic())
+            try:
+                trabajo = self._cola.get(timeout=timeout)
+            except queue.Empty:
+                trabajo = None
+            if self._parar.is_set():
+                break
+            if trabajo is not None:
+                self.ejecutar(trabajo)
+                continue
+            # Venció el intervalo: sincroniza solo el worker líder
+            if self.es_lider():
+                self.ejecutar({"id": uuid.uuid4().hex, "modo": "incremental", "origen": "programado",
+                               "creado": _ahora()})
+            siguiente = time.monotonic() + self._programar()
+
+    def _programar(self):
+        espera = self.espera()
+        self.proxima = datetime.fromtimestamp(time.time() + espera, timezone.utc).isoformat(timespec="seconds")
+        return espera
+
+    # --- estado compartido en disco ---
+
+    def _leer(self):
+        try:
+            with open(self._ruta_trabajos, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {"trabajos": {}, "ultima": None}
+
+    def _guardar(self, trabajo, terminado=False):
+        with self._bloqueo:
+            datos = self._leer()
+            trabajos = datos["trabajos"]
+            trabajos.pop(trabajo["id"], None)
+            trabajos[trabajo["id"]] = trabajo
+            for id_viejo in list(trabajos)[:-MAX_TRABAJOS_GUARDADOS]:
+                del trabajos[id_viejo]
+            if terminado:
+                datos["ultima"] = trabajo
+            escribir_json(datos, self._ruta_trabajos)
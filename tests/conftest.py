@@ -0,0 +1,43 @@
+# conftest.py
+import os
+import shutil
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.join(RAIZ, "benchmarks"))
+
+# Sin sincronización periódica ni base SQL: las pruebas llaman a cada paso a mano
+os.environ.setdefault("APP_PASSWORD", "prueba")
+os.environ["SYNC_INTERVALO_MINUTOS"] = "0"
+os.environ["BASE_DATOS"] = ""
+
+from gravity_forms_falso import GravityFormsFalso  # noqa: E402
+
+
+@pytest.fixture
+def gravity_forms():
+    falso = GravityFormsFalso().iniciar()
+    yield falso
+    falso.detener()
+
+
+@pytest.fixture
+def api(gravity_forms, tmp_path, monkeypatch):
+    """backend_api apuntando al Gravity Forms falso, con los datos en un directorio temporal."""
+    import backend_api
+
+    monkeypatch.setattr(backend_api, "URL_FORMULARIO_GF", gravity_forms.url_formulario)
+    monkeypatch.setattr(backend_api, "URL_ENTRADAS_GF", gravity_forms.url_entradas)
+    shutil.copy(os.path.join(RAIZ, "diccionario.csv"), tmp_path)
+    monkeypatch.chdir(tmp_path)
+    backend_api.cache_datos.invalidar()
+    yield backend_api
+    backend_api.cache_datos.invalidar()
+
+
+def como_gravity_forms(df):
+    # La API devuelve todos los valores como texto y los vacíos como ""
+    return df.where(df.notna(), "").astype(str).to_dict(orient="records")
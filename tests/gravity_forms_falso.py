@@ -0,0 +1,78 @@
+# gravity_forms_falso.py
+"""
+Servidor local que imita lo que la app usa de la API REST v2 de Gravity Forms:
+GET /forms/9 (esquema) y GET /forms/9/entries con search (field_filters con >=),
+sorting y paging, devolviendo total_count como la API real.
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class GravityFormsFalso:
+    """`entradas` (lista de dicts con valores de texto) y `formulario` se pueden cambiar entre llamadas."""
+
+    def __init__(self, entradas=None, formulario=None):
+        self.entradas = list(entradas or [])
+        self.formulario = formulario or {"id": "9", "title": "Formulario", "fields": []}
+        # Parámetros de cada GET /entries recibido, para revisar qué pidió la app
+        self.consultas = []
+        self._servidor = ThreadingHTTPServer(("127.0.0.1", 0), self._manejador())
+        self.url_formulario = f"http://127.0.0.1:{self._servidor.server_address[1]}/forms/9"
+        self.url_entradas = f"{self.url_formulario}/entries"
+
+    def iniciar(self):
+        threading.Thread(target=self._servidor.serve_forever, daemon=True).start()
+        return self
+
+    def detener(self):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+    def pagina(self, params):
+        entradas = list(self.entradas)
+        if "search" in params:
+            for filtro in json.loads(params["search"]).get("field_filters", []):
+                if filtro.get("operator", "=") == ">=":
+                    entradas = [e for e in entradas if str(e.get(filtro["key"], "")) >= filtro["value"]]
+                else:
+                    entradas = [e for e in entradas if str(e.get(filtro["key"], "")) == filtro["value"]]
+        if "sorting[key]" in params:
+            entradas.sort(
+                key=lambda e: str(e.get(params["sorting[key]"], "")),
+                reverse=params.get("sorting[direction]", "DESC") == "DESC",
+            )
+        tamano = int(params.get("paging[page_size]", 10))
+        actual = int(params.get("paging[current_page]", 1))
+        return {
+            "total_count": len(entradas),
+            "entries": entradas[(actual - 1) * tamano:actual * tamano],
+        }
+
+    def _manejador(self):
+        falso = self
+
+        class Manejador(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = {k: v[0] for k, v in parse_qs(url.query).items()}
+                if url.path == "/forms/9":
+                    cuerpo = falso.formulario
+                elif url.path == "/forms/9/entries":
+                    falso.consultas.append(params)
+                    cuerpo = falso.pagina(params)
+                else:
+                    self.send_error(404)
+                    return
+                datos = json.dumps(cuerpo).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(datos)))
+                self.end_headers()
+                self.wfile.write(datos)
+
+        return Manejador
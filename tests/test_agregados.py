@@ -0,0 +1,84 @@
+# test_agregados.py
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from agregados import construir_resumen
+from conftest import RAIZ
+from data_loader import cargar_tabla_puntajes
+from generar_datos import generar_entradas
+from nucleo import procesar_datos_completos
+
+
+def kpis_con_bucles(df):
+    """Los KPIs como los calculaban antes /metricas-principales e /insights-generales."""
+    top_proyectos_trl = {}
+    for segmento in ["TRL 1-3", "TRL 4-7", "TRL 8-9"]:
+        filtro = df[df["Segmento TRL"] == segmento]
+        if not filtro.empty:
+            top_proyectos_trl[segmento] = filtro.loc[filtro["Puntaje Total"].idxmax()]["Nombre del Proyecto"]
+
+    top_rows = df.nlargest(3, "Puntaje Total")[["Nombre del Proyecto", "Puntaje Total"]]
+    return {
+        "formularios": len(df),
+        "trl_max": int(df["Nivel TRL"].max()),
+        "aprobados": int((df["Aprobado"] == "Sí").sum()),
+        "docente_si": int(df["Docente Acompañante"].sum()),
+        "docente_no": len(df) - int(df["Docente Acompañante"].sum()),
+        "puntaje_maximo": round(df["Puntaje Total"].max(), 1),
+        "top_proyectos_trl": top_proyectos_trl,
+        "nivel_ingles_mas_comun": df["Nivel de Inglés"].mode().iloc[0],
+        "distribucion_trl": {str(k): int(v) for k, v in df["Segmento TRL"].value_counts().to_dict().items()},
+        "promedios": {
+            "TRL 1-3": round(df["Puntaje TRL 1-3"].mean(), 1),
+            "TRL 4-7": round(df["Puntaje TRL 4-7"].mean(), 1),
+            "TRL 8-9": round(df["Puntaje TRL 8-9"].mean(), 1),
+            "Total": round(df["Puntaje Total"].mean(), 1),
+        },
+        "top_proyectos": [
+            {"Nombre del Proyecto": str(row["Nombre del Proyecto"]), "Puntaje Total": round(float(row["Puntaje Total"]), 1)}
+            for _, row in top_rows.iterrows()
+        ],
+    }
+
+
+def comparar(df):
+    esperado = kpis_con_bucles(df)
+    obtenido = construir_resumen(df)
+    assert {k: obtenido[k] for k in esperado} == esperado
+    # Mismo orden de la distribución (el JSON la muestra así)
+    assert list(obtenido["distribucion_trl"]) == list(esperado["distribucion_trl"])
+
+
+def test_resumen_igual_a_los_bucles(tmp_path, monkeypatch):
+    shutil.copy(os.path.join(RAIZ, "diccionario.csv"), tmp_path)
+    monkeypatch.chdir(tmp_path)
+    df = procesar_datos_completos(generar_entradas(500, semilla=4), cargar_tabla_puntajes())
+    comparar(df)
+    comparar(df.iloc[:1].reset_index(drop=True))
+
+
+def test_resumen_con_empates():
+    puntajes = [40.0, 55.5, 55.5, 12.0, 55.5, 30.0, 30.0]
+    df = pd.DataFrame({
+        "Nombre del Proyecto": [f"P{i}" for i in range(len(puntajes))],
+        "Segmento TRL": ["TRL 4-7", "TRL 1-3", "TRL 4-7", "Desconocido", "TRL 1-3", "TRL 8-9", "TRL 8-9"],
+        "Nivel TRL": [5.0, 2.0, 6.0, 0.0, 3.0, 8.0, 9.0],
+        "Nivel de Inglés": ["Básico", "Intermedio", "Intermedio", "Básico", "No especificado", "Avanzado", "Avanzado"],
+        "Docente Acompañante": [True, False, True, False, False, True, False],
+        "Aprobado": ["No", "Sí", "Sí", "No", "Sí", "No", "No"],
+        "Puntaje TRL 1-3": [10.0, 30.5, 20.5, 4.0, 25.5, 10.0, 10.0],
+        "Puntaje TRL 4-7": [20.0, 15.0, 25.0, 4.0, 20.0, 10.0, 10.0],
+        "Puntaje TRL 8-9": [10.0, 10.0, 10.0, 4.0, 10.0, 10.0, 10.0],
+        "Puntaje Total": puntajes,
+    })
+    comparar(df)
+
+
+@pytest.mark.parametrize("semilla", [5, 6])
+def test_resumen_igual_con_otras_semillas(tmp_path, monkeypatch, semilla):
+    shutil.copy(os.path.join(RAIZ, "diccionario.csv"), tmp_path)
+    monkeypatch.chdir(tmp_path)
+    comparar(procesar_datos_completos(generar_entradas(200, semilla=semilla), cargar_tabla_puntajes()))
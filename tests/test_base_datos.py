@@ -0,0 +1,112 @@
+# test_base_datos.py
+import base64
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from base_datos import BaseDatos
+from conftest import como_gravity_forms
+from generar_datos import esquema_formulario, generar_entradas
+
+CREDENCIALES = base64.b64encode(f"admin:{os.environ['APP_PASSWORD']}".encode()).decode()
+
+# Filtros, orden y página de /proyectos
+CONSULTAS_PROYECTOS = [
+    {},
+    {"limite": 25},
+    {"limite": 25, "offset": 50, "orden": "-Puntaje Total"},
+    {"limite": 40, "orden": "Nivel TRL"},
+    {"orden": "-Nivel TRL", "segmento": ["TRL 4-7", "TRL 8-9"]},
+    {"limite": 10, "offset": 5, "orden": "Industria", "aprobado": "Sí"},
+    {"orden": "-Industria", "industria": ["Salud", "Energía"], "campos": "Nombre del Proyecto,Industria"},
+    {"limite": 30, "puntaje": "Puntaje TRL 1-3", "puntaje_min": 20, "orden": "-Puntaje TRL 1-3"},
+    {"puntaje_min": 40, "puntaje_max": 80, "aprobado": "No", "orden": "Puntaje TRL 8-9"},
+    {"limite": 15, "offset": 1000, "orden": "-Puntaje Total"},
+    {"segmento": ["Desconocido"], "orden": "Nombre del Proyecto"},
+]
+
+# Nombres con y sin tildes, exactos, prefijos, palabras del medio y sin coincidencias
+CONSULTAS_NOMBRE = [
+    {"nombre": "ñandu"},
+    {"nombre": "ROBOT ARBOL", "limite": 20, "offset": 10},
+    {"nombre": "EcoAgua 5"},
+    {"nombre": "solar 1", "limite": 5},
+    {"nombre": "médico 2", "limite": 500},
+    {"nombre": "gua"},
+    {"nombre": "zzzz"},
+    {"nombre": "Biofiltr"},
+    {"nombre": "solar"},
+    {"nombre": "Solar Andino", "limite": 3, "offset": 1},
+]
+
+
+@pytest.fixture
+def cliente(api, gravity_forms, tmp_path, monkeypatch):
+    gravity_forms.formulario = esquema_formulario()
+    entradas = generar_entradas(400, semilla=7)
+    # Nombres repetidos y que empiezan con la palabra que otros tienen en el medio
+    entradas.loc[::37, "1"] = "Solar Andino"
+    gravity_forms.entradas = como_gravity_forms(entradas)
+    api.recargar_completo()
+    api.cache_datos.obtener()
+    # La base se carga aquí y no en el hilo de programar_base, para que ya esté al día
+    base = BaseDatos(str(tmp_path / "datos.sqlite3"))
+    base.reemplazar(api.leer_crudo(), api.leer_procesado(), api.version_datos())
+    monkeypatch.setattr(api, "base_sql", base)
+    return TestClient(api.app)
+
+
+def con_y_sin_base(api, monkeypatch, pedir):
+    """Respuesta de `pedir()` resuelta por la base SQL y por el DataFrame."""
+    # Si la base no estuviera en la versión del snapshot, ambas saldrían del DataFrame
+    assert api.base_sql.version() == api.version_en_disco(api.cache_datos.obtener())
+    con_base = pedir()
+    with monkeypatch.context() as m:
+        m.setattr(api, "base_sql", None)
+        sin_base = pedir()
+    assert con_base.status_code == sin_base.status_code
+    return con_base.json(), sin_base.json()
+
+
+def comparar_consultas(api, cliente, monkeypatch):
+    headers = {"Authorization": f"Basic {CREDENCIALES}"}
+    for params in CONSULTAS_PROYECTOS:
+        con_base, sin_base = con_y_sin_base(
+            api, monkeypatch, lambda: cliente.get("/proyectos", params=params, headers=headers)
+        )
+        assert con_base == sin_base, params
+    for cuerpo in CONSULTAS_NOMBRE:
+        con_base, sin_base = con_y_sin_base(
+            api, monkeypatch, lambda: cliente.post("/buscar-proyecto", json=cuerpo, headers=headers)
+        )
+        assert con_base == sin_base, cuerpo
+
+
+def test_consultas_sql_iguales_al_dataframe(api, cliente, monkeypatch):
+    comparar_consultas(api, cliente, monkeypatch)
+
+
+def test_consultas_sql_tras_sincronizar(api, cliente, gravity_forms, monkeypatch):
+    # Cambian nombres y puntajes de algunas entradas y llegan otras: la base se actualiza por upsert
+    modificadas = generar_entradas(60, semilla=8)
+    modificadas["id"] = [str(i) for i in range(1, 31)] + [str(i) for i in range(401, 431)]
+    modificadas["date_updated"] = "2025-03-01 08:00:00"
+    por_id = {e["id"]: e for e in gravity_forms.entradas}
+    por_id.update({e["id"]: e for e in como_gravity_forms(modificadas)})
+    gravity_forms.entradas = list(por_id.values())
+
+    version = api.base_sql.version()
+    assert api.sincronizar_incremental() == 60
+    assert api.base_sql.version() == version + 1
+    comparar_consultas(api, cliente, monkeypatch)
+
+
+def test_listar_usa_la_base(api, cliente):
+    snapshot = api.cache_datos.obtener()
+    posiciones, total = api.consultar_base(snapshot, "listar", None, "Sí", None, "Puntaje Total",
+                                           None, None, "-Puntaje Total", 10, 0)
+    esperadas, total_df = api.posiciones_proyectos(snapshot.df, 10, 0, "-Puntaje Total", None, "Sí", None,
+                                                   "Puntaje Total", None, None)
+    assert total == total_df > 0
+    assert posiciones.tolist() == esperadas.tolist()
@@ -0,0 +1,79 @@
+# test_puntajes.py
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import RAIZ
+from data_loader import cargar_diccionario, cargar_tabla_puntajes
+from funciones import segmento_trl
+from generar_datos import generar_entradas
+from nucleo import procesar_datos_completos
+
+COLUMNAS = ["Puntaje TRL 1-3", "Puntaje TRL 4-7", "Puntaje TRL 8-9", "Aprobado", "Puntaje Total"]
+
+
+def puntuar_fila_por_fila(df, diccionario):
+    """El puntaje de antes del motor compilado: cada pregunta contra cada celda de cada fila."""
+    df = df.rename(columns={
+        "1": "Nombre del Proyecto", "14": "Nivel TRL", "15": "Docente Acompañante",
+        "17": "Nivel de Inglés", "30": "Ubicación", "3": "Industria",
+    })
+    df["Nivel TRL"] = pd.to_numeric(df["Nivel TRL"], errors="coerce").fillna(0)
+    df["Segmento TRL"] = df["Nivel TRL"].apply(segmento_trl)
+    for segmento in ["TRL 1-3", "TRL 4-7", "TRL 8-9"]:
+        df[f"Puntaje {segmento}"] = 0.0
+    df["Aprobado"] = "No"
+
+    for idx, row in df.iterrows():
+        puntajes = {"TRL 1-3": 0, "TRL 4-7": 0, "TRL 8-9": 0}
+        for respuestas_map in diccionario.values():
+            for respuesta_usuario in row.values:
+                if respuesta_usuario in respuestas_map:
+                    datos = respuestas_map[respuesta_usuario]
+                    puntajes[datos["segmento"]] += datos["puntaje"]
+        extra = 0
+        nivel_ingles = str(row.get("Nivel de Inglés", "")).strip().lower()
+        if "intermedio" in nivel_ingles:
+            extra += 2
+        elif "avanzado" in nivel_ingles:
+            extra += 4
+        if str(row.get("Docente Acompañante", "")).strip().lower() == "si":
+            extra += 10
+        for segmento in puntajes:
+            df.at[idx, f"Puntaje {segmento}"] = puntajes[segmento] + extra
+        if any((puntajes[seg] + extra) >= 50 for seg in puntajes):
+            df.at[idx, "Aprobado"] = "Sí"
+
+    df["Puntaje Total"] = df["Puntaje TRL 1-3"] + df["Puntaje TRL 4-7"] + df["Puntaje TRL 8-9"]
+    return df
+
+
+@pytest.fixture
+def directorio(tmp_path, monkeypatch):
+    # Sin formulario.json: el diccionario puntúa en cualquier columna, como antes
+    shutil.copy(os.path.join(RAIZ, "diccionario.csv"), tmp_path)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_puntaje_compilado_igual_al_de_cada_fila(directorio):
+    df = generar_entradas(400, semilla=3)
+    df.loc[:9, "17"] = ["Intermedio", "Avanzado", "Básico", None, "intermedio alto",
+                        "Avanzado", None, "Intermedio", "Básico", "Avanzado"]
+    df.loc[:9, "15"] = ["Si", "SI", " si ", "No", None, "Si", "No", "Si", None, "si"]
+
+    esperado = puntuar_fila_por_fila(df.copy(), cargar_diccionario())
+    obtenido = procesar_datos_completos(df.copy(), cargar_tabla_puntajes())
+
+    pd.testing.assert_frame_equal(obtenido[COLUMNAS], esperado[COLUMNAS], check_dtype=False)
+    assert (esperado["Aprobado"] == "Sí").any() and (esperado["Aprobado"] == "No").any()
+
+
+def test_puntaje_sin_entradas(directorio):
+    df = generar_entradas(5, semilla=1).iloc[:0]
+    obtenido = procesar_datos_completos(df, cargar_tabla_puntajes())
+    assert obtenido.empty
+    assert np.isin(COLUMNAS, obtenido.columns).all()
@@ -0,0 +1,128 @@
+# test_sincronizacion.py
+import pandas as pd
+
+from conftest import como_gravity_forms
+from generar_datos import esquema_formulario, generar_entradas
+from sincronizacion import Sincronizador, calcular_marca, combinar_entradas, descartar_ya_vistas
+
+
+def entradas(filas):
+    return pd.DataFrame(filas).astype(object)
+
+
+def test_calcular_marca():
+    df = entradas([
+        {"id": "1", "date_updated": "2024-01-01 10:00:00"},
+        {"id": "7", "date_updated": "2024-03-01 10:00:00"},
+        {"id": "3", "date_updated": "2024-03-01 10:00:00"},
+        {"id": "12", "date_updated": None},
+    ])
+    assert calcular_marca(df) == {
+        "date_updated": "2024-03-01 10:00:00",
+        "id": 12,
+        "ids_en_marca": ["3", "7"],
+    }
+
+
+def test_calcular_marca_sin_entradas():
+    assert calcular_marca(pd.DataFrame()) is None
+    assert calcular_marca(entradas([{"id": "1"}])) is None
+
+
+def test_descartar_ya_vistas():
+    marca = {"date_updated": "2024-03-01 10:00:00", "id": 7, "ids_en_marca": ["3", "7"]}
+    # La API filtra con >=: las de la marca vuelven a llegar junto con las nuevas
+    nuevas = entradas([
+        {"id": "3", "date_updated": "2024-03-01 10:00:00"},
+        {"id": "7", "date_updated": "2024-03-01 10:00:00"},
+        {"id": "8", "date_updated": "2024-03-01 10:00:00"},
+        {"id": "3", "date_updated": "2024-03-02 09:00:00"},
+    ])
+    restantes = descartar_ya_vistas(nuevas, marca)
+    assert restantes[["id", "date_updated"]].values.tolist() == [
+        ["8", "2024-03-01 10:00:00"],
+        ["3", "2024-03-02 09:00:00"],
+    ]
+
+
+def test_combinar_entradas_reemplaza_y_agrega():
+    existentes = entradas([
+        {"id": "1", "1": "a"},
+        {"id": "2", "1": "b"},
+        {"id": "3", "1": "c"},
+    ])
+    nuevas = entradas([
+        {"id": "2", "1": "b2", "40": "x"},
+        {"id": "4", "1": "d"},
+        {"id": "2", "1": "b3"},
+    ])
+    combinadas = combinar_entradas(existentes, nuevas)
+    # La última versión de cada id, en su misma posición; las nuevas al final
+    assert combinadas["id"].tolist() == ["1", "2", "3", "4"]
+    assert combinadas["1"].tolist() == ["a", "b3", "c", "d"]
+    assert combinadas.columns.tolist() == ["id", "1", "40"]
+
+
+def test_combinar_entradas_vacias():
+    existentes = entradas([{"id": "1", "1": "a"}])
+    assert combinar_entradas(existentes, pd.DataFrame()) is existentes
+    assert combinar_entradas(pd.DataFrame(), existentes)["id"].tolist() == ["1"]
+
+
+def test_espera_tras_muchos_fallos(tmp_path):
+    sincronizador = Sincronizador(
+        {}, intervalo=15 * 60.0, jitter=0, espera_maxima=7200,
+        ruta_trabajos=str(tmp_path / "trabajos.json"), ruta_lider=str(tmp_path / "lider.lock"),
+    )
+    for fallos, espera in [(0, 900), (2, 3600), (3, 7200), (1100, 7200)]:
+        sincronizador.fallos = fallos
+        assert sincronizador.espera() == espera
+
+
+def test_trabajos_guardados(tmp_path):
+    ruta = tmp_path / "trabajos.json"
+    sincronizador = Sincronizador(
+        {"incremental": lambda: "listo"}, ruta_trabajos=str(ruta), ruta_lider=str(tmp_path / "lider.lock"),
+    )
+    sincronizador.ejecutar({"id": "a1", "modo": "incremental", "origen": "prueba", "estado": "pendiente"})
+    assert sincronizador.trabajo("a1")["estado"] == "ok"
+    assert sincronizador.estado()["ultima"]["mensaje"] == "listo"
+    assert sorted(p.name for p in tmp_path.iterdir() if p.suffix != ".lock") == ["trabajos.json"]
+
+
+def test_incremental_igual_a_completa(api, gravity_forms):
+    gravity_forms.formulario = esquema_formulario()
+    originales = generar_entradas(300, semilla=1)
+    gravity_forms.entradas = como_gravity_forms(originales)
+    api.recargar_completo()
+    marca = api.leer_marca()
+
+    # Cambian algunas respuestas y llegan entradas nuevas, varias con el mismo date_updated
+    modificadas = generar_entradas(40, semilla=2)
+    modificadas["id"] = [str(i) for i in range(1, 21)] + [str(i) for i in range(301, 321)]
+    modificadas["date_updated"] = ["2025-02-01 09:00:00"] * 20 + ["2025-02-01 09:30:00"] * 20
+    por_id = {e["id"]: e for e in gravity_forms.entradas}
+    por_id.update({e["id"]: e for e in como_gravity_forms(modificadas)})
+    gravity_forms.entradas = list(por_id.values())
+
+    consultas = len(gravity_forms.consultas)
+    assert api.sincronizar_incremental() == 40
+    # Solo se pidió lo posterior a la marca
+    pedido = gravity_forms.consultas[consultas]
+    assert marca["date_updated"] in pedido["search"]
+    assert pedido["sorting[key]"] == "date_updated"
+    incremental = api.obtener_datos().copy()
+
+    # Volver a sincronizar sin cambios: las de la marca se descartan
+    assert api.sincronizar_incremental() == 0
+
+    api.recargar_completo()
+    completa = api.obtener_datos()
+
+    def ordenar(df):
+        return df.sort_values("id", key=lambda ids: ids.astype(int)).reset_index(drop=True)
+
+    assert len(incremental) == 320
+    pd.testing.assert_frame_equal(
+        ordenar(incremental)[completa.columns], ordenar(completa), check_dtype=False
+    )
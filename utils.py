@@ -5,19 +5,15 @@ import plotly.express as px
 import streamlit.components.v1 as components
 from urllib.parse import quote
 import os
-from estilos import css_global
-from utils import (
-    cargar_diccionario,
-    obtener_todas_las_entradas,
-    calcular_puntajes_por_segmento,
-    segmento_trl,
-    generar_html_reporte,
-    generar_graficos
-)
+from estilos import aplicar_estilos
+from auth import obtener_todas_las_entradas, ErrorGravityForms
+from reporte import generar_html_reporte
+from almacenamiento import existe_crudo, guardar_crudo
+from datos_tablero import ARCHIVO_DICCIONARIO, huella_datos, datos_procesados, indicadores, figuras, buscar_proyectos
 
 # --- CONFIGURACIÓN Y ESTILOS ---
 st.set_page_config(page_title="Dashboard TRL", layout="wide")
-st.markdown(css_global, unsafe_allow_html=True)
+aplicar_estilos()
 
 # --- TÍTULO PRINCIPAL ---
 st.title("📊 Dashboard de Evaluación TRL")
@@ -26,44 +22,34 @@ st.title("📊 Dashboard de Evaluación TRL")
 usuario = "multimediafalab"
 clave_app = st.text_input("🔐 Contraseña de aplicación WordPress", type="password")
 url_formulario = "https://fablab.ucontinental.edu.pe/wp-json/gf/v2/forms/9/entries"
-diccionario = cargar_diccionario("diccionario.csv")
 
 # --- ACTUALIZACIÓN DE DATOS ---
 df = None
 if st.button("🔄 Actualizar datos desde Gravity Forms"):
     if clave_app:
         with st.spinner("Conectando con el servidor..."):
-            df = obtener_todas_las_entradas(usuario, clave_app, url_formulario)
-            if not df.empty:
-                df.to_csv("datos_formularios.csv", index=False)
-                st.success(f"✅ Se importaron {len(df)} registros y se guardaron en 'datos_formularios.csv'.")
+            try:
+                df = obtener_todas_las_entradas(usuario, clave_app, url_formulario)
+            except ErrorGravityForms as e:
+                st.error(f"❌ {e}")
             else:
-                st.warning("⚠️ No se encontraron entradas.")
+                if not df.empty:
+                    guardar_crudo(df)
+                    st.success(f"✅ Se importaron {len(df)} registros y se guardaron en los datos locales.")
+                else:
+                    st.warning("⚠️ No se encontraron entradas.")
     else:
         st.warning("Por favor, ingresa tu contraseña de aplicación.")
 
 # --- CARGA LOCAL ---
-if df is None and os.path.exists("datos_formularios.csv"):
-    df = pd.read_csv("datos_formularios.csv")
-    st.info("📁 Cargando datos desde archivo local 'datos_formularios.csv'")
+if df is None and existe_crudo():
+    st.info("📁 Cargando datos locales")
 
 # --- PROCESAMIENTO DE DATOS ---
-if df is not None and not df.empty:
-    df["Nombre del Proyecto"] = df["1"]
-    df["Nivel TRL"] = pd.to_numeric(df["14"], errors="coerce")
-
-    for segmento in ["TRL 1-3", "TRL 4-7", "TRL 8-9"]:
-        df[f"Puntaje {segmento}"] = 0.0
-    df["Aprobado"] = "No"
-
-    for idx, row in df.iterrows():
-        puntajes = calcular_puntajes_por_segmento(row, diccionario)
-        for segmento in puntajes:
-            df.loc[idx, f"Puntaje {segmento}"] = puntajes[segmento]
-        if any(p >= 50 for p in puntajes.values()):
-            df.loc[idx, "Aprobado"] = "Sí"
-
-    df["Segmento TRL"] = df["Nivel TRL"].apply(segmento_trl)
+# Con cache por versión de los archivos: las interacciones que no cambian los datos no re-puntúan
+if (df is None or not df.empty) and existe_crudo():
+    huella = huella_datos()
+    df = datos_procesados(ARCHIVO_DICCIONARIO, huella)
 
     # --- VISTA PREVIA ---
     st.subheader("📄 Vista previa")
@@ -72,36 +58,18 @@ if df is not None and not df.empty:
     # --- KPIs ---
     st.subheader("📌 Indicadores clave")
 
-    # Asignación de columnas para docente e inglés
-    columna_docente = "15"
-    columna_ingles = "17"
-
-    if columna_docente in df.columns:
-        df[columna_docente] = df[columna_docente].astype(str)
-        df["Docente Acompañante"] = df[columna_docente].str.strip().str.upper() == "SI"
-        docentes_presentes = df["Docente Acompañante"].sum()
-        docentes_faltantes = len(df) - docentes_presentes
-    else:
-        docentes_presentes = docentes_faltantes = 0
-
-    if columna_ingles in df.columns:
-        df[columna_ingles] = df[columna_ingles].astype(str)
-        df["Nivel de Inglés"] = df[columna_ingles].fillna("No especificado").str.strip().str.capitalize()
-        proyectos_con_ingles = (df["Nivel de Inglés"] != "Básico") & (df["Nivel de Inglés"] != "No especificado")
-        num_proyectos_ingles = proyectos_con_ingles.sum()
-    else:
-        num_proyectos_ingles = 0
+    kpis = indicadores(df, huella)
 
     col1, col2, col3, col4, col5 = st.columns(5)
-    col1.metric("Formularios", len(df))
-    col2.metric("TRL más alto", df["Nivel TRL"].max())
-    col3.metric("Proyectos aprobados", (df["Aprobado"] == "Sí").sum())
-    col4.metric("Con docente", docentes_presentes)
-    col5.metric("Con inglés medio/avanzado", num_proyectos_ingles)
+    col1.metric("Formularios", kpis["formularios"])
+    col2.metric("TRL más alto", kpis["trl_max"])
+    col3.metric("Proyectos aprobados", kpis["aprobados"])
+    col4.metric("Con docente", kpis["docente_si"])
+    col5.metric("Con inglés medio/avanzado", kpis["con_ingles"])
 
     # --- GRÁFICOS ---
     st.subheader("📈 Visualizaciones")
-    fig1, fig2, fig3, fig4 = generar_graficos(df)
+    fig1, fig2, fig3, fig4, *_ = figuras(df, huella, "3", "Nivel de Inglés", "30")
 
     colg1, colg2 = st.columns(2)
     with colg1:
@@ -118,7 +86,7 @@ if df is not None and not df.empty:
     # --- BÚSQUEDA Y REPORTE ---
     nombre_busqueda = st.text_input("🔎 Buscar proyecto para reporte")
     if nombre_busqueda:
-        df_filtrado = df[df["Nombre del Proyecto"].str.lower().str.contains(nombre_busqueda.lower(), na=False)]
+        df_filtrado = buscar_proyectos(df, huella, nombre_busqueda)
         if not df_filtrado.empty:
             nombres_unicos = df_filtrado["Nombre del Proyecto"].unique()
             nombre_seleccionado = nombres_unicos[0] if len(nombres_unicos) == 1 else st.radio("Selecciona el proyecto:", options=nombres_unicos)
@@ -1,8 +1,11 @@
 import plotly.express as px
+import numpy as np
 import pandas as pd
 from plotly.subplots import make_subplots
 import plotly.graph_objects as go
 
+from metricas import cronometrar
+
 def crear_layout(titulo):
     return dict(
         title={
@@ -30,6 +33,37 @@ def crear_layout(titulo):
         )
     )
 
+SEGMENTOS = ["TRL 1-3", "TRL 4-7", "TRL 8-9"]
+
+def conteo_aprobados_por_segmento(df):
+    """Proyectos aprobados que superan el umbral en cada segmento, de mayor a menor."""
+    aprobado_segmento = df[[f"Puntaje {s}" for s in SEGMENTOS]].to_numpy() >= 50
+    aprobado_segmento &= (df["Aprobado"] == "Sí").to_numpy()[:, None]
+
+    # Mismo orden que value_counts sobre los registros fila a fila: por cantidad y, en empates, por aparición
+    aparicion = aprobado_segmento.argmax(axis=0) * len(SEGMENTOS) + np.arange(len(SEGMENTOS))
+    conteo = pd.DataFrame({
+        "Segmento TRL": SEGMENTOS,
+        "Aprobados": aprobado_segmento.sum(axis=0),
+        "_aparicion": aparicion,
+    })
+    conteo = conteo[conteo["Aprobados"] > 0].sort_values("_aparicion")
+    return conteo.sort_values("Aprobados", ascending=False, kind="stable").drop(columns="_aparicion").reset_index(drop=True)
+
+def conteo_aprobacion_por_segmento(df):
+    """Cantidad de proyectos con y sin puntaje aprobatorio en cada segmento."""
+    aprobado_segmento = df[[f"Puntaje {s}" for s in SEGMENTOS]].to_numpy() >= 50
+    # La leyenda conserva el orden de aparición: primero el estado del primer proyecto
+    estados = ["No", "Sí"] if len(df) and not aprobado_segmento[0, 0] else ["Sí", "No"]
+    conteos = {"Sí": aprobado_segmento.sum(axis=0), "No": (~aprobado_segmento).sum(axis=0)}
+    conteo = pd.DataFrame({
+        "Segmento TRL": np.tile(SEGMENTOS, len(estados)),
+        "Aprobado": np.repeat(estados, len(SEGMENTOS)),
+        "Proyectos": np.concatenate([conteos[estado] for estado in estados]),
+    })
+    return conteo[conteo["Proyectos"] > 0]
+
+@cronometrar("graficos")
 def graficos_generales(df, columna_industria, columna_ingles, columna_ubicacion):
     colors = {
         "Sí": "#27ae60",
@@ -41,14 +75,7 @@ def graficos_generales(df, columna_industria, columna_ingles, columna_ubicacion)
     }
 
     # Gráfico 1
-    registros = []
-    for _, row in df[df["Aprobado"] == "Sí"].iterrows():
-        for segmento in ["TRL 1-3", "TRL 4-7", "TRL 8-9"]:
-            if row[f"Puntaje {segmento}"] >= 50:
-                registros.append({"Segmento TRL": segmento})
-    df_aprobados = pd.DataFrame(registros)
-    conteo_aprobados = df_aprobados["Segmento TRL"].value_counts().reset_index()
-    conteo_aprobados.columns = ["Segmento TRL", "Aprobados"]
+    conteo_aprobados = conteo_aprobados_por_segmento(df)
 
     fig1 = px.bar(
         conteo_aprobados,
@@ -67,22 +94,15 @@ def graficos_generales(df, columna_industria, columna_ingles, columna_ubicacion)
     fig1.update_xaxes(tickangle=-30)
 
     # Gráfico 2
-    fig2 = px.pie(df, names="Aprobado", hole=0.4, color="Aprobado", color_discrete_map={"Sí": colors["Sí"], "No": colors["No"]}, template="plotly_white")
+    conteo_estado = df["Aprobado"].value_counts(sort=False).reset_index()
+    conteo_estado.columns = ["Aprobado", "Proyectos"]
+    fig2 = px.pie(conteo_estado, names="Aprobado", values="Proyectos", hole=0.4, color="Aprobado", color_discrete_map={"Sí": colors["Sí"], "No": colors["No"]}, template="plotly_white")
     fig2.update_traces(textinfo="percent+label", pull=[0.05, 0], textfont_size=14)
     fig2.update_layout(**crear_layout("✅ Proyectos Aprobados"), showlegend=False, height=600)
 
     # Gráfico 3
-    registros = []
-    for _, row in df.iterrows():
-        for segmento in ["TRL 1-3", "TRL 4-7", "TRL 8-9"]:
-            aprobado = "Sí" if row[f"Puntaje {segmento}"] >= 50 else "No"
-            registros.append({
-                "Segmento TRL": segmento,
-                "Aprobado": aprobado
-            })
-    df_segmentos = pd.DataFrame(registros)
-    fig3 = px.histogram(df_segmentos, x="Segmento TRL", color="Aprobado", barmode="group", color_discrete_map={"Sí": colors["Sí"], "No": colors["No"]}, template="plotly_white")
-    fig3.update_traces()
+    conteo_segmentos = conteo_aprobacion_por_segmento(df)
+    fig3 = px.bar(conteo_segmentos, x="Segmento TRL", y="Proyectos", color="Aprobado", barmode="group", color_discrete_map={"Sí": colors["Sí"], "No": colors["No"]}, template="plotly_white")
     fig3.update_layout(**crear_layout("📈 Aprobación por Segmento TRL"), xaxis_title="Segmento TRL", yaxis_title="Número de Proyectos", height=600)
     fig3.update_xaxes(tickangle=-30)
 
@@ -93,8 +113,8 @@ def graficos_generales(df, columna_industria, columna_ingles, columna_ubicacion)
 
     # Gráfico 5
     if columna_industria in df.columns:
-        df["Industria"] = df[columna_industria].fillna("No especificada").astype(str).str.strip()
-        conteo_industria = df["Industria"].value_counts().reset_index()
+        industria = df[columna_industria].fillna("No especificada").astype(str).str.strip()
+        conteo_industria = industria.value_counts().reset_index()
         conteo_industria.columns = ["Industria", "Cantidad"]
         fig5 = px.bar(conteo_industria, x="Cantidad", y="Industria", orientation="h", color="Industria", template="plotly_white")
         fig5.update_layout(**crear_layout("🏭 Proyectos por Industria"), height=600, showlegend=False)
@@ -103,8 +123,8 @@ def graficos_generales(df, columna_industria, columna_ingles, columna_ubicacion)
 
     # Gráfico 6
     if columna_ingles in df.columns:
-        df["Nivel de Inglés"] = df[columna_ingles].fillna("No especificado").str.strip().str.capitalize()
-        conteo_ingles = df["Nivel de Inglés"].value_counts().reset_index()
+        nivel_ingles = df[columna_ingles].fillna("No especificado").str.strip().str.capitalize()
+        conteo_ingles = nivel_ingles.value_counts().reset_index()
         conteo_ingles.columns = ["Nivel", "Cantidad"]
         fig6 = px.bar(conteo_ingles, x="Nivel", y="Cantidad", color="Nivel", template="plotly_white")
         fig6.update_layout(**crear_layout("🌍 Nivel de Inglés"), height=600, showlegend=False)
@@ -114,8 +134,8 @@ def graficos_generales(df, columna_industria, columna_ingles, columna_ubicacion)
 
     # Gráfico 7
     if columna_ubicacion in df.columns:
-        df["Ubicación"] = df[columna_ubicacion].astype(str).str.strip().str.capitalize().replace({"Nan": "No especificada", "": "No especificada"})
-        conteo_ubicacion = df["Ubicación"].value_counts().reset_index()
+        ubicacion = df[columna_ubicacion].astype(str).str.strip().str.capitalize().replace({"Nan": "No especificada", "": "No especificada"})
+        conteo_ubicacion = ubicacion.value_counts().reset_index()
         conteo_ubicacion.columns = ["Ubicación", "Cantidad"]
         fig7 = px.pie(conteo_ubicacion, names="Ubicación", values="Cantidad", hole=0.3, color_discrete_sequence=colors["Ubicación"], template="plotly_white")
         fig7.update_traces(textinfo="percent+label", textfont_size=14)
@@ -124,3 +144,15 @@ def graficos_generales(df, columna_industria, columna_ingles, columna_ubicacion)
         fig7 = None
 
     return fig1, fig2, fig3, fig4, fig5, fig6, fig7
+
+def mostrar_en_pares(*figuras):
+    """Muestra las figuras en Streamlit de a dos por fila (se omiten las que son None)."""
+    # Importado aquí: la API usa este módulo sin depender de Streamlit
+    import streamlit as st
+
+    figuras = [fig for fig in figuras if fig is not None]
+    for i in range(0, len(figuras), 2):
+        columnas = st.columns(2)
+        for columna, fig in zip(columnas, figuras[i:i + 2]):
+            with columna:
+                st.plotly_chart(fig, use_container_width=True)